@@ -0,0 +1,42 @@
+import threading
+from typing import Callable
+
+from github import Github
+
+
+class GithubClientPool:
+    """Hands each thread its own PyGithub client for every token.
+
+    A PyGithub client keeps the request it is about to send on its one persistent connection, so threads
+    sharing a client can send each other's requests. Clients are created by create_client on the first
+    call from each thread. Objects fetched through a client send their requests through it too, so a thread
+    should fetch the objects it works on itself rather than be handed those of another thread.
+    """
+
+    def __init__(self, tokens: list[str], create_client: Callable[[str], Github]) -> None:
+        self.tokens = tokens
+        self.create_client = create_client
+        self.__local = threading.local()
+        self.__all_clients: list[Github] = []
+        self.__lock = threading.Lock()
+
+    def get(self, token: str) -> Github:
+        """The client of the token for the calling thread."""
+        clients: dict[str, Github] = self.__local.__dict__.setdefault("clients", {})
+        if token not in clients:
+            clients[token] = self.create_client(token)
+            with self.__lock:
+                self.__all_clients.append(clients[token])
+        return clients[token]
+
+    def clients(self) -> dict[str, Github]:
+        """The clients of the calling thread by token."""
+        return {token: self.get(token) for token in self.tokens}
+
+    def close(self) -> None:
+        """Closes the clients of every thread."""
+        with self.__lock:
+            for client in self.__all_clients:
+                client.close()
+            self.__all_clients.clear()
+            self.__local = threading.local()
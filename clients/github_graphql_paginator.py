@@ -0,0 +1,185 @@
+import asyncio
+from contextlib import closing
+from functools import reduce
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+from gql import Client
+from gql.client import AsyncClientSession
+from graphql import DocumentNode
+
+T = TypeVar("T")
+
+
+class GithubGraphQLPaginator:
+    """Streams the nodes of a paginated GraphQL connection over a single client session.
+
+    Every page of a job is requested over the same connected session, so the aiohttp
+    session, event loop and TLS connection are set up once per job instead of once per page.
+
+    The client is held connected for the duration of an iteration, so other queries must not
+    be executed on the same client until the iteration has finished.
+    """
+
+    def __init__(self, client: Client, page_size: int = 100) -> None:
+        self.client = client
+        self.page_size = page_size
+
+    @staticmethod
+    def get_nodes(connection: dict[str, Any]) -> list[dict[str, Any]]:
+        if connection.get("nodes") is not None:
+            return connection["nodes"]
+        return [edge["node"] for edge in connection.get("edges") or []]
+
+    async def paginate_connections(
+        self,
+        session: AsyncClientSession,
+        query: DocumentNode,
+        connection_path: list[str],
+        variable_values: dict[str, Any] | None = None,
+        cursor_variable: str = "after_cursor",
+        page_size_variable: str | None = "page_size",
+        start_cursor: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yields each page of the connection found at connection_path in the response, pageInfo included.
+
+        Args:
+            session: A connected gql session to execute each page on.
+            query: The query to page through; it must select pageInfo { hasNextPage endCursor } on the connection.
+            connection_path: The keys leading from the response root to the connection, e.g. ["organization", "teams"].
+            variable_values: Any query variables other than the cursor and page size.
+            cursor_variable: The name of the query variable holding the after cursor.
+            page_size_variable: The name of the query variable holding the page size, None if the query fixes it.
+            start_cursor: The cursor to resume after, None to start from the first page.
+        """
+        variables = dict(variable_values or {})
+        if page_size_variable:
+            variables[page_size_variable] = self.page_size
+        after_cursor = start_cursor
+
+        while True:
+            data = await session.execute(query, variable_values={**variables, cursor_variable: after_cursor})
+            connection = reduce(lambda value, key: value[key], connection_path, data)
+            yield connection
+
+            if not connection["pageInfo"]["hasNextPage"]:
+                return
+            after_cursor = connection["pageInfo"]["endCursor"]
+
+    async def paginate_pages(self, session: AsyncClientSession, query: DocumentNode, connection_path: list[str],
+                             variable_values: dict[str, Any] | None = None,
+                             **kwargs) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yields the nodes of each page of the connection, see paginate_connections for the arguments."""
+        async for connection in self.paginate_connections(session, query, connection_path, variable_values, **kwargs):
+            yield self.get_nodes(connection)
+
+    async def paginate(self, session: AsyncClientSession, query: DocumentNode, connection_path: list[str],
+                       variable_values: dict[str, Any] | None = None, **kwargs) -> AsyncIterator[dict[str, Any]]:
+        """Yields the nodes of the connection one by one, see paginate_pages for the arguments."""
+        async for nodes in self.paginate_pages(session, query, connection_path, variable_values, **kwargs):
+            for node in nodes:
+                yield node
+
+    async def paginate_connections_concurrently(
+        self,
+        session: AsyncClientSession,
+        connections: list[tuple[DocumentNode, list[str], dict[str, Any] | None]],
+        max_concurrency: int | None = None,
+        **kwargs
+    ) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        """Pages through several connections at once over the session and yields each page as it arrives,
+        with the index of the connection it belongs to.
+
+        Args:
+            session: A connected gql session to execute each page on.
+            connections: The query, connection path and variables of each connection to page through.
+            max_concurrency: The most connections paged at once, None to page them all at once.
+            kwargs: The cursor and page size options of paginate_connections, shared by all connections.
+        """
+        # A page is only fetched once there is room for it, so at most one page per connection is held
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(connections))
+        finished = object()
+        semaphore = asyncio.Semaphore(max_concurrency or len(connections) or 1)
+
+        async def produce(index: int, query: DocumentNode, connection_path: list[str],
+                          variable_values: dict[str, Any] | None):
+            try:
+                async with semaphore:
+                    async for connection in self.paginate_connections(
+                            session, query, connection_path, variable_values, **kwargs):
+                        await queue.put((index, connection))
+            except Exception as exception:  # pylint: disable=W0718
+                await queue.put(exception)
+                return
+            await queue.put(finished)
+
+        tasks = [asyncio.create_task(produce(index, *connection)) for index, connection in enumerate(connections)]
+        try:
+            unfinished = len(tasks)
+            while unfinished:
+                item = await queue.get()
+                if item is finished:
+                    unfinished -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _iterate_on_session(self, open_iterator: Callable[[AsyncClientSession], AsyncIterator]) -> Iterator:
+        """Drives the async iterator open_iterator returns for a connected session from synchronous code,
+        on a private event loop, closing the session once it is exhausted or the iterator is discarded.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            session = loop.run_until_complete(self.client.connect_async())
+            items = open_iterator(session)
+            try:
+                while True:
+                    try:
+                        yield loop.run_until_complete(anext(items))
+                    except StopAsyncIteration:
+                        break
+            finally:
+                loop.run_until_complete(items.aclose())
+                loop.run_until_complete(self.client.close_async())
+        finally:
+            loop.close()
+
+    def run(self, open_coroutine: Callable[[AsyncClientSession], Awaitable[T]]) -> T:
+        """Runs the coroutine open_coroutine returns for a connected session from synchronous code, on a
+        private event loop, closing the session once it has finished.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            session = loop.run_until_complete(self.client.connect_async())
+            try:
+                return loop.run_until_complete(open_coroutine(session))
+            finally:
+                loop.run_until_complete(self.client.close_async())
+        finally:
+            loop.close()
+
+    def iterate_connections(self, query: DocumentNode, connection_path: list[str],
+                            variable_values: dict[str, Any] | None = None, **kwargs) -> Iterator[dict[str, Any]]:
+        """A synchronous version of paginate_connections which opens one session on a private event loop for
+        the whole iteration and closes it once the connection is exhausted or the iterator is discarded.
+        """
+        return self._iterate_on_session(
+            lambda session: self.paginate_connections(session, query, connection_path, variable_values, **kwargs))
+
+    def iterate_connections_concurrently(self, connections: list[tuple[DocumentNode, list[str], dict[str, Any] | None]],
+                                         max_concurrency: int | None = None,
+                                         **kwargs) -> Iterator[tuple[int, dict[str, Any]]]:
+        """A synchronous version of paginate_connections_concurrently, see iterate_connections."""
+        return self._iterate_on_session(
+            lambda session: self.paginate_connections_concurrently(session, connections, max_concurrency, **kwargs))
+
+    def iterate(self, query: DocumentNode, connection_path: list[str],
+                variable_values: dict[str, Any] | None = None, **kwargs) -> Iterator[dict[str, Any]]:
+        """Yields the nodes of the connection one by one over a single session, see iterate_connections."""
+        with closing(self.iterate_connections(query, connection_path, variable_values, **kwargs)) as connections:
+            for connection in connections:
+                yield from self.get_nodes(connection)
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class GithubObjectCache:
+    """A thread safe cache of PyGithub objects such as Organization, Team and Repository handles.
+
+    Entries expire ttl_seconds after they were fetched and the least recently used entry is evicted
+    once more than max_size are held. Threads asking for the same missing key wait for the first one
+    to fetch it rather than fetching it again.
+    """
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 600) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__loading: dict[Hashable, threading.Lock] = {}
+        self.__lock = threading.Lock()
+
+    def __lookup(self, key: Hashable) -> Any:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return _MISSING
+            if time.monotonic() >= entry[0]:
+                del self.__entries[key]
+                return _MISSING
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get(self, key: Hashable, load: Callable[[], T]) -> T:
+        """Returns the cached object for the key, calling load to fetch it if it is missing or expired."""
+        value = self.__lookup(key)
+        if value is not _MISSING:
+            return value
+
+        with self.__lock:
+            key_lock = self.__loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # Another thread may have fetched it while this one waited
+                value = self.__lookup(key)
+                if value is not _MISSING:
+                    return value
+                value = load()
+                with self.__lock:
+                    self.misses += 1
+                    self.__entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                    self.__entries.move_to_end(key)
+                    while len(self.__entries) > self.max_size:
+                        self.__entries.popitem(last=False)
+            return value
+        finally:
+            # Dropped even when load raises, unless a later caller already replaced it
+            with self.__lock:
+                if self.__loading.get(key) is key_lock:
+                    del self.__loading[key]
+
+    def invalidate(self, key: Hashable) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,122 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import copy
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator
+
+from graphql import (DocumentNode, FieldNode, OperationDefinitionNode,
+                     OperationType, parse)
+
+from config.logging_config import logging
+
+RATE_LIMIT_FIELD: FieldNode = parse("{ rateLimit { cost remaining resetAt } }").definitions[0].selection_set.selections[0]
+
+_query_label: ContextVar[str | None] = ContextVar("github_query_label", default=None)
+
+
+@contextmanager
+def query_label(label: str) -> Iterator[None]:
+    """Attributes the queries sent within the block to label, unless an enclosing block already named them,
+    so the queries of nested calls count towards the outermost method."""
+    if _query_label.get() is not None:
+        yield
+        return
+    token = _query_label.set(label)
+    try:
+        yield
+    finally:
+        _query_label.reset(token)
+
+
+def get_query_label(document: DocumentNode) -> str:
+    """The label of the enclosing query_label block, or the root fields of the query outside of one."""
+    label = _query_label.get()
+    if label is not None:
+        return label
+    fields = [
+        selection.name.value
+        for definition in document.definitions if isinstance(definition, OperationDefinitionNode)
+        for selection in definition.selection_set.selections if isinstance(selection, FieldNode)
+    ]
+    return f"query {{ {' '.join(fields)} }}"
+
+
+@lru_cache(maxsize=256)
+def with_rate_limit_field(document: DocumentNode) -> tuple[DocumentNode, bool]:
+    """Adds rateLimit { cost remaining resetAt } to the query operations of the document that do not select
+    rateLimit already. Returns the document to send and whether the field was added."""
+    definitions = []
+    added = False
+    for definition in document.definitions:
+        if isinstance(definition, OperationDefinitionNode) and definition.operation == OperationType.QUERY and not any(
+                isinstance(selection, FieldNode) and (selection.alias or selection.name).value == "rateLimit"
+                for selection in definition.selection_set.selections):
+            selection_set = copy(definition.selection_set)
+            selection_set.selections = (*selection_set.selections, RATE_LIMIT_FIELD)
+            definition = copy(definition)
+            definition.selection_set = selection_set
+            added = True
+        definitions.append(definition)
+    if not added:
+        return document, False
+    document = copy(document)
+    document.definitions = tuple(definitions)
+    return document, True
+
+
+@dataclass
+class QueryCostStats:
+    calls: int = 0
+    failures: int = 0
+    cost: int = 0
+    seconds: float = 0.0
+
+
+class GithubQueryCostTracker:
+    """Adds up the GraphQL rate limit cost, latency and number of requests of each labelled method, so the
+    methods that spend the most of the hourly GraphQL budget can be found and tuned."""
+    __process_tracker: "GithubQueryCostTracker | None" = None
+    __process_tracker_lock = threading.Lock()
+
+    @classmethod
+    def for_process(cls) -> "GithubQueryCostTracker":
+        """The tracker shared by every service of the process, whose summary is logged once when it exits."""
+        with cls.__process_tracker_lock:
+            if cls.__process_tracker is None:
+                cls.__process_tracker = cls()
+                atexit.register(cls.__process_tracker.log_summary)
+            return cls.__process_tracker
+
+    def __init__(self) -> None:
+        self.stats: dict[str, QueryCostStats] = {}
+        self.__lock = threading.Lock()
+
+    def record(self, label: str, cost: int | None, seconds: float, failed: bool = False) -> None:
+        with self.__lock:
+            stats = self.stats.setdefault(label, QueryCostStats())
+            stats.calls += 1
+            stats.failures += int(failed)
+            stats.cost += cost or 0
+            stats.seconds += seconds
+
+    def summary(self) -> str:
+        with self.__lock:
+            rows = sorted(self.stats.items(), key=lambda item: (-item[1].cost, item[0]))
+        width = max([len("method"), *(len(label) for label, _ in rows)])
+        lines = [f"{'method':<{width}}  {'calls':>7}  {'failed':>6}  {'cost':>7}  {'seconds':>9}"]
+        lines += [
+            f"{label:<{width}}  {stats.calls:>7}  {stats.failures:>6}  {stats.cost:>7}  {stats.seconds:>9.2f}"
+            for label, stats in rows
+        ]
+        total = QueryCostStats(*(sum(getattr(stats, field) for _, stats in rows)
+                                 for field in ["calls", "failures", "cost", "seconds"]))
+        lines.append(
+            f"{'total':<{width}}  {total.calls:>7}  {total.failures:>6}  {total.cost:>7}  {total.seconds:>9.2f}")
+        return "\n".join(lines)
+
+    def log_summary(self) -> None:
+        if self.stats:
+            logging.info(f"GitHub GraphQL usage by method:\n{self.summary()}")
@@ -0,0 +1,309 @@
+import asyncio
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from time import sleep
+from typing import Any, Mapping
+from urllib.parse import urlparse
+
+from gql import Client
+from gql.client import AsyncClientSession
+from gql.transport.aiohttp import AIOHTTPTransport
+from graphql import DocumentNode, ExecutionResult
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from clients.github_query_cost_tracker import (GithubQueryCostTracker,
+                                               get_query_label,
+                                               with_rate_limit_field)
+from config.logging_config import logging
+
+
+@dataclass
+class RateLimitBudget:
+    limit: int
+    remaining: int
+    reset: float
+    next_slot: float = 0.0
+
+
+class GithubRateLimitScheduler:
+    """Paces requests against the GitHub rate limit of each resource (core, graphql, search).
+
+    The budget of a resource is taken from the X-RateLimit-* headers or the GraphQL rateLimit object of
+    the latest response. While more than pace_below of the budget is left requests run freely, below
+    that the remaining budget is spread evenly over the time left until the reset, and once only the
+    reserved requests are left callers wait for the reset instead of running into the limit.
+
+    Resources that no response has reported on yet are not paced.
+    """
+
+    def __init__(self, reserved_requests: int = 50, pace_below: float = 0.5, reset_buffer_seconds: int = 5) -> None:
+        self.reserved_requests = reserved_requests
+        self.pace_below = pace_below
+        self.reset_buffer_seconds = reset_buffer_seconds
+        self.budgets: dict[str, RateLimitBudget] = {}
+        self.__lock = threading.Lock()
+
+    def update_from_headers(self, headers: Mapping[str, str] | None, resource: str = "core") -> None:
+        headers = CaseInsensitiveDict(headers or {})
+        if "x-ratelimit-remaining" not in headers or "x-ratelimit-reset" not in headers:
+            return
+        remaining = int(float(headers["x-ratelimit-remaining"]))
+        self.update(
+            headers.get("x-ratelimit-resource", resource),
+            int(float(headers.get("x-ratelimit-limit", remaining))),
+            remaining,
+            float(headers["x-ratelimit-reset"])
+        )
+
+    def update_from_graphql(self, rate_limit: dict[str, Any] | None) -> None:
+        if not rate_limit or "remaining" not in rate_limit or "resetAt" not in rate_limit:
+            return
+        remaining = int(rate_limit["remaining"])
+        self.update(
+            "graphql",
+            int(rate_limit.get("limit", remaining)),
+            remaining,
+            datetime.fromisoformat(rate_limit["resetAt"]).timestamp()
+        )
+
+    def update(self, resource: str, limit: int, remaining: int, reset: float) -> None:
+        with self.__lock:
+            budget = self.budgets.get(resource)
+            if budget is None or budget.reset != reset:
+                self.budgets[resource] = RateLimitBudget(limit, remaining, reset)
+                return
+            # Within a window the budget only goes down, so a late response cannot raise it again
+            budget.limit, budget.remaining = limit, min(budget.remaining, remaining)
+
+    def seconds_until_reset(self, resource: str) -> float | None:
+        budget = self.budgets.get(resource)
+        if budget is None:
+            return None
+        return max(budget.reset - time.time(), 0)
+
+    def claim(self, resource: str, cost: int = 1) -> float:
+        """Claims cost points of the budget of the resource and returns the seconds to wait before spending them."""
+        with self.__lock:
+            budget = self.budgets.get(resource)
+            if budget is None:
+                return 0.0
+
+            now = time.time()
+            if now >= budget.reset:
+                # The window has reset, run freely until a response reports the new budget
+                del self.budgets[resource]
+                return 0.0
+
+            if cost == 0:
+                # A claim of nothing takes no pacing slot, it only holds the caller back while the reserve is all
+                # that is left
+                if budget.remaining <= self.reserved_requests:
+                    return budget.reset - now + self.reset_buffer_seconds
+                return 0.0
+
+            if budget.remaining - cost < self.reserved_requests:
+                return budget.reset - now + self.reset_buffer_seconds
+
+            interval = 0.0
+            if budget.remaining < budget.limit * self.pace_below:
+                interval = (budget.reset - now) * cost / (budget.remaining - self.reserved_requests)
+            start = max(now, budget.next_slot)
+            budget.next_slot = start + interval
+            budget.remaining -= cost
+            return start - now
+
+    def acquire(self, resource: str, cost: int = 1) -> None:
+        delay = self.claim(resource, cost)
+        if delay > 0:
+            self.__log_delay(resource, delay)
+            sleep(delay)
+
+    async def acquire_async(self, resource: str, cost: int = 1) -> None:
+        delay = self.claim(resource, cost)
+        if delay > 0:
+            self.__log_delay(resource, delay)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def __log_delay(resource: str, delay: float) -> None:
+        if delay >= 60:
+            logging.info(f"GitHub {resource} rate limit budget is exhausted, waiting {int(delay)}s for it to reset")
+        else:
+            logging.debug(f"Pacing GitHub {resource} request by {delay:.2f}s")
+
+
+class GithubTokenPool:
+    """A pool of GitHub personal access tokens with a rate limit budget tracked per token.
+
+    The tokens are used as given for the whole run, so tokens that expire during it, such as GitHub App
+    installation tokens, are not supported.
+
+    Each request is given the token with the most remaining budget for its resource, tokens nothing
+    is known about yet are treated as having a full budget and tokens with equal budgets are handed
+    out in turn, so throughput grows with the number of tokens in the pool.
+    """
+
+    def __init__(self, tokens: list[str], **scheduler_kwargs) -> None:
+        if not tokens:
+            raise ValueError("At least one GitHub token is required")
+        self.tokens = list(dict.fromkeys(tokens))
+        self.schedulers = {token: GithubRateLimitScheduler(**scheduler_kwargs) for token in self.tokens}
+        self.__next_index = 0
+        self.__lock = threading.Lock()
+
+    def __remaining(self, token: str, resource: str) -> float:
+        budget = self.schedulers[token].budgets.get(resource)
+        if budget is None or budget.reset <= time.time():
+            return math.inf
+        return budget.remaining
+
+    def pick(self, resource: str) -> str:
+        with self.__lock:
+            # Rotate the starting token so tokens with equal budgets are used round-robin
+            ordered = self.tokens[self.__next_index:] + self.tokens[:self.__next_index]
+            self.__next_index = (self.__next_index + 1) % len(self.tokens)
+        return max(ordered, key=lambda token: self.__remaining(token, resource))
+
+    def acquire(self, resource: str, cost: int = 1) -> str:
+        """Picks a token for the resource, waits until its budget allows the request and returns it."""
+        token = self.pick(resource)
+        self.schedulers[token].acquire(resource, cost)
+        return token
+
+    async def acquire_async(self, resource: str, cost: int = 1) -> str:
+        token = self.pick(resource)
+        await self.schedulers[token].acquire_async(resource, cost)
+        return token
+
+    def update_from_headers(self, token: str, headers: Mapping[str, str] | None, resource: str = "core") -> None:
+        self.schedulers[token].update_from_headers(headers, resource)
+
+    def update_from_graphql(self, token: str, rate_limit: dict | None) -> None:
+        self.schedulers[token].update_from_graphql(rate_limit)
+
+    def seconds_until_reset(self, resource: str) -> float | None:
+        """The time until the first token with a known budget for the resource resets."""
+        seconds = [
+            scheduler.seconds_until_reset(resource) for scheduler in self.schedulers.values()
+            if scheduler.seconds_until_reset(resource) is not None
+        ]
+        return min(seconds) if seconds else None
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """A requests adapter that sends every request with the token of a GithubTokenPool that has the
+    most budget left, paces it with that token's scheduler and feeds it the rate limit headers of the response."""
+
+    def __init__(self, token_pool: GithubTokenPool | None = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.token_pool = token_pool
+
+    @staticmethod
+    def _get_resource(request: PreparedRequest) -> str:
+        path = urlparse(request.url).path
+        if path.startswith("/search/"):
+            return "search"
+        if path == "/graphql":
+            return "graphql"
+        return "core"
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:  # pylint: disable=W0221
+        if self.token_pool is None:
+            return self._send(request, **kwargs)
+        resource = self._get_resource(request)
+        token = self.token_pool.acquire(resource)
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = self._send(request, **kwargs)
+        self.token_pool.update_from_headers(token, response.headers, resource)
+        return response
+
+    def _send(self, request: PreparedRequest, **kwargs) -> Response:
+        """Sends the request once its token is set, subclasses extend this rather than send."""
+        return super().send(request, **kwargs)
+
+
+class RateLimitedAIOHTTPTransport(AIOHTTPTransport):  # pylint: disable=W0223
+    """An AIOHTTPTransport that sends every GraphQL request with the token of a GithubTokenPool that has
+    the most budget left, paces it with that token's scheduler and feeds it the rate limit headers and
+    rateLimit object of the response.
+
+    The rateLimit field is added to every query that does not select it and removed from the result
+    again, and with a cost tracker the cost and latency of each request are recorded against the
+    method that sent it.
+    """
+
+    # Added to stop TypeError on instantiation. See https://github.com/python/cpython/blob/d2340ef25721b6a72d45d4508c672c4be38c67d3/Objects/typeobject.c#L4444
+    def __new__(cls, *_, **__):
+        return super(RateLimitedAIOHTTPTransport, cls).__new__(cls)
+
+    def __init__(self, *args, token_pool: GithubTokenPool,
+                 cost_tracker: GithubQueryCostTracker | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_pool = token_pool
+        self.cost_tracker = cost_tracker
+
+    async def execute(  # pylint: disable=W0221
+        self,
+        document: DocumentNode,
+        variable_values: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+        extra_args: dict[str, Any] | None = None,
+        upload_files: bool = False,
+        token: str | None = None,
+    ) -> ExecutionResult:
+        """Sends the query with the given token, which RateLimitedClientSession acquires before the execute
+        timeout starts, or with a token acquired here when none is given."""
+        if token is None:
+            token = await self.token_pool.acquire_async("graphql")
+        extra_args = dict(extra_args or {})
+        extra_args["headers"] = {**extra_args.get("headers", {}), "Authorization": f"Bearer {token}"}
+        label = get_query_label(document)
+        document, added_rate_limit = with_rate_limit_field(document)
+        started = time.monotonic()
+        result = None
+        try:
+            result = await super().execute(document, variable_values, operation_name, extra_args, upload_files)
+        finally:
+            self.token_pool.update_from_headers(token, getattr(self, "response_headers", None), "graphql")
+            self.__record_cost(label, result, time.monotonic() - started)
+        if result.data:
+            rate_limit = result.data.pop("rateLimit", None) if added_rate_limit else result.data.get("rateLimit")
+            self.token_pool.update_from_graphql(token, rate_limit)
+        return result
+
+    def __record_cost(self, label: str, result: ExecutionResult | None, seconds: float) -> None:
+        if self.cost_tracker is None:
+            return
+        rate_limit = (result.data or {}).get("rateLimit") if result else None
+        self.cost_tracker.record(
+            label, rate_limit.get("cost") if rate_limit else None, seconds, failed=result is None or bool(result.errors))
+
+
+class RateLimitedClientSession(AsyncClientSession):
+    """A gql session that waits for the GraphQL budget of its RateLimitedAIOHTTPTransport's token pool before
+    gql starts the execute timeout, so pacing and waiting for a rate limit reset never time a query out."""
+
+    async def _execute(self, document: DocumentNode, *args, **kwargs) -> ExecutionResult:
+        if isinstance(self.transport, RateLimitedAIOHTTPTransport) and kwargs.get("token") is None:
+            kwargs["token"] = await self.transport.token_pool.acquire_async("graphql")
+        return await super()._execute(document, *args, **kwargs)
+
+
+class RateLimitedClient(Client):
+    """A gql Client whose sessions are RateLimitedClientSessions, for the synchronous execute as well as
+    connect_async."""
+
+    # Added to stop TypeError on instantiation. See https://github.com/python/cpython/blob/d2340ef25721b6a72d45d4508c672c4be38c67d3/Objects/typeobject.c#L4444
+    def __new__(cls, *_, **__):
+        return super(RateLimitedClient, cls).__new__(cls)
+
+    async def connect_async(self, reconnecting=False, **kwargs) -> AsyncClientSession:
+        session = await super().connect_async(reconnecting, **kwargs)
+        if not reconnecting:
+            self.session = session = RateLimitedClientSession(client=self)  # pylint: disable=W0201
+        return session
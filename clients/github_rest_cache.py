@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from clients.github_rate_limit_scheduler import (GithubTokenPool,
+                                                 RateLimitedAdapter)
+from config.logging_config import logging
+
+
+class GithubRestCache:
+    """An on-disk cache of GitHub REST responses that carry an ETag or Last-Modified validator.
+
+    Each entry is stored as a metadata file and a body file named after a hash of the request. Entries
+    are evicted least recently used first once the total size of the cache goes over max_size_bytes.
+    """
+    METADATA_SUFFIX = ".json"
+    BODY_SUFFIX = ".body"
+    VARY_HEADERS = ["Accept", "Authorization", "X-GitHub-Api-Version"]
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = 100 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.__lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.__size_bytes = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+
+    def key_for(self, request: PreparedRequest) -> str:
+        # The Authorization header is part of the key so responses are never shared between tokens,
+        # it is hashed with the rest of the key and never written to disk
+        vary = [request.headers.get(header, "") for header in self.VARY_HEADERS]
+        return hashlib.sha256("\n".join([request.method, request.url, *vary]).encode("utf-8")).hexdigest()
+
+    def __paths(self, key: str) -> tuple[str, str]:
+        return (os.path.join(self.cache_dir, key + self.METADATA_SUFFIX),
+                os.path.join(self.cache_dir, key + self.BODY_SUFFIX))
+
+    def get(self, key: str) -> tuple[dict, bytes] | None:
+        metadata_path, body_path = self.__paths(key)
+        with self.__lock:
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as file:
+                    metadata = json.load(file)
+                with open(body_path, "rb") as file:
+                    body = file.read()
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+            # Reading an entry makes it the most recently used
+            os.utime(metadata_path)
+            os.utime(body_path)
+        return metadata, body
+
+    def set(self, key: str, response: Response) -> None:
+        metadata_path, body_path = self.__paths(key)
+        metadata = json.dumps({
+            "url": response.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+        }).encode("utf-8")
+        with self.__lock:
+            self.__size_bytes -= self.__remove(metadata_path, body_path)
+            with open(metadata_path, "wb") as file:
+                file.write(metadata)
+            with open(body_path, "wb") as file:
+                file.write(response.content)
+            self.__size_bytes += len(metadata) + len(response.content)
+            self.__evict()
+
+    @staticmethod
+    def __remove(*paths: str) -> int:
+        removed_bytes = 0
+        for path in paths:
+            try:
+                removed_bytes += os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+        return removed_bytes
+
+    def __evict(self) -> None:
+        if self.__size_bytes <= self.max_size_bytes:
+            return
+        entries = [
+            (os.path.getmtime(os.path.join(self.cache_dir, name)), name.removesuffix(self.METADATA_SUFFIX))
+            for name in os.listdir(self.cache_dir) if name.endswith(self.METADATA_SUFFIX)
+        ]
+        for _, key in sorted(entries):
+            if self.__size_bytes <= self.max_size_bytes:
+                break
+            self.__size_bytes -= self.__remove(*self.__paths(key))
+
+
+class ConditionalRequestAdapter(RateLimitedAdapter):
+    """A requests adapter that revalidates cached GET responses with If-None-Match and If-Modified-Since.
+
+    A 304 Not Modified answer from GitHub does not count against the core rate limit, so unchanged
+    resources are served from the cache for free.
+    """
+
+    def __init__(self, cache: GithubRestCache, token_pool: GithubTokenPool | None = None, **kwargs) -> None:
+        super().__init__(token_pool, **kwargs)
+        self.cache = cache
+
+    def _send(self, request: PreparedRequest, **kwargs) -> Response:
+        if request.method != "GET" or kwargs.get("stream"):
+            return super()._send(request, **kwargs)
+
+        key = self.cache.key_for(request)
+        cached = self.cache.get(key)
+        if cached:
+            cached_headers = CaseInsensitiveDict(cached[0]["headers"])
+            if "ETag" in cached_headers:
+                request.headers.setdefault("If-None-Match", cached_headers["ETag"])
+            if "Last-Modified" in cached_headers:
+                request.headers.setdefault("If-Modified-Since", cached_headers["Last-Modified"])
+
+        response = super()._send(request, **kwargs)
+
+        if response.status_code == 304 and cached:
+            logging.debug(f"Serving {request.url} from the REST cache")
+            return self.__build_cached_response(request, response, *cached)
+        if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            self.cache.set(key, response)
+        return response
+
+    @staticmethod
+    def __build_cached_response(request: PreparedRequest, not_modified: Response, metadata: dict,
+                                body: bytes) -> Response:
+        response = Response()
+        response.request = request
+        response.url = metadata["url"]
+        response.status_code = metadata["status_code"]
+        response.reason = metadata["reason"]
+        response.headers = CaseInsensitiveDict(metadata["headers"])
+        # Keep the fresh rate limit and validator headers from the 304 answer
+        response.headers.update({
+            header: value for header, value in not_modified.headers.items()
+            if header.lower().startswith("x-ratelimit-") or header.lower() in ("date", "etag", "last-modified")
+        })
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.connection = getattr(not_modified, "connection", None)
+        response.elapsed = not_modified.elapsed
+        response._content = body  # pylint: disable=W0212
+        response.from_cache = True
+        return response
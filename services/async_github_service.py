@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any
+
+from gql.client import AsyncClientSession
+
+from clients.github_query_cost_tracker import query_label
+from config.logging_config import logging
+from services.github_graphql_queries import GITHUB_GRAPHQL_QUERIES
+from services.github_service import GithubService
+
+
+class AsyncGithubService:
+    """Async versions of the paginated GraphQL methods of a GithubService, all run over one connected session.
+
+    The session is opened on entering the service and closed on leaving it, so independent queries can be
+    awaited together with asyncio.gather and share the session's connection pool rather than each opening
+    its own event loop, aiohttp session and TLS connection:
+
+    >>> async with AsyncGithubService(github_service) as async_github_service:
+    ...     team_names, repository_names = await asyncio.gather(
+    ...         async_github_service.get_team_names(), async_github_service.get_org_repo_names())
+
+    The GithubService's GraphQL client is held connected meanwhile, so its synchronous GraphQL methods must
+    not be called until the async service is closed.
+    """
+
+    def __init__(self, github_service: GithubService) -> None:
+        self.github_service = github_service
+        self.organisation_name = github_service.organisation_name
+        self.__session: AsyncClientSession | None = None
+
+    async def __aenter__(self) -> "AsyncGithubService":
+        self.__session = await self.github_service.github_client_gql_api.connect_async()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.__session = None
+        await self.github_service.github_client_gql_api.close_async()
+
+    async def __get_nodes(self, label: str, query_name: str, connection_path: list[str],
+                          variable_values: dict[str, Any]) -> list[dict[str, Any]]:
+        if self.__session is None:
+            raise RuntimeError("AsyncGithubService must be entered with async with before it is used")
+        with query_label(label):
+            return [
+                node async for node in self.github_service.github_graphql_paginator.paginate(
+                    self.__session, GITHUB_GRAPHQL_QUERIES[query_name], connection_path, variable_values)
+            ]
+
+    async def get_team_names(self) -> list[str]:
+        teams = await self.__get_nodes(
+            "get_team_names", "team_names", ["organization", "teams"], {"organisation_name": self.organisation_name})
+        return [team["slug"] for team in teams]
+
+    async def get_team_repository_names(self, team_name: str) -> list[str]:
+        repositories = await self.__get_nodes(
+            "get_team_repository_names", "team_repositories", ["organization", "team", "repositories"],
+            {"organisation_name": self.organisation_name, "team_name": team_name})
+        return [repository["name"] for repository in repositories]
+
+    async def get_team_user_names(self, team_name: str) -> list[str]:
+        members = await self.__get_nodes(
+            "get_team_user_names", "team_user_names", ["organization", "team", "members"],
+            {"organisation_name": self.organisation_name, "team_name": team_name})
+        return [member["login"] for member in members]
+
+    async def get_team_user_names_by_team(self) -> dict[str, list[str]]:
+        """Maps every team of the organisation to its members' logins, paging at most
+        GITHUB_GQL_MAX_CONCURRENT_BATCHES teams at a time."""
+        team_names = await self.get_team_names()
+        logging.info(f"Getting the members of {len(team_names)} teams in {self.organisation_name}")
+        semaphore = asyncio.Semaphore(self.github_service.GITHUB_GQL_MAX_CONCURRENT_BATCHES)
+
+        async def get_team_user_names(team_name: str) -> list[str]:
+            async with semaphore:
+                return await self.get_team_user_names(team_name)
+
+        members = await asyncio.gather(*(get_team_user_names(team_name) for team_name in team_names))
+        return dict(zip(team_names, members))
+
+    async def get_org_repo_names(self) -> list[str]:
+        repositories = await self.__get_nodes(
+            "get_org_repo_names", "org_repository_names", ["organization", "repositories"],
+            {"organisation_name": self.organisation_name})
+        return [repository["name"] for repository in repositories if not repository["isDisabled"]]
+
+    async def get_active_repositories(self) -> list[str]:
+        repositories = await self.__get_nodes(
+            "get_active_repositories", "unlocked_unarchived_repositories", ["organization", "repositories"],
+            {"organisation_name": self.organisation_name})
+        return [repository["name"] for repository in repositories if not repository["isDisabled"]]
+
+    async def check_circleci_config_in_repos(self) -> list[str]:
+        repositories = await self.__get_nodes(
+            "check_circleci_config_in_repos", "circleci_config_check", ["organization", "repositories"],
+            {"organisation_name": self.organisation_name})
+        return [repository["name"] for repository in repositories if repository["object"]]
+
+    async def get_github_member_list(self) -> list[dict[str, str | None]]:
+        members = await self.__get_nodes(
+            "get_github_member_list", "organization_members_with_emails", ["organization", "membersWithRole"],
+            {"org": self.organisation_name})
+        return [
+            {
+                "username": member["login"],
+                "email": (member["organizationVerifiedDomainEmails"] or [None])[0]
+            }
+            for member in members
+        ]
@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+
+class AuditLogStore:
+    """A local SQLite copy of the organisation audit log entries the GithubService reports on.
+
+    Entries are kept with their action, actor, user and creation time indexed so reports are answered
+    locally, and the sync state of each organisation records the query and cursor to resume from so
+    each run only fetches the entries logged since the previous one.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        self.database_path = database_path
+        self.__lock = threading.Lock()
+        with self.__connect() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS audit_log_entries (
+                    id TEXT PRIMARY KEY,
+                    organisation TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    actor_login TEXT,
+                    user_login TEXT,
+                    created_at TEXT NOT NULL,
+                    entry TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS audit_log_entries_action
+                    ON audit_log_entries (organisation, action, created_at);
+                CREATE INDEX IF NOT EXISTS audit_log_entries_actor
+                    ON audit_log_entries (organisation, actor_login, created_at);
+                CREATE INDEX IF NOT EXISTS audit_log_entries_user
+                    ON audit_log_entries (organisation, user_login, created_at);
+                CREATE INDEX IF NOT EXISTS audit_log_entries_created_at
+                    ON audit_log_entries (organisation, created_at);
+                CREATE TABLE IF NOT EXISTS audit_log_sync_state (
+                    organisation TEXT PRIMARY KEY,
+                    covered_since TEXT NOT NULL,
+                    query_string TEXT NOT NULL,
+                    end_cursor TEXT,
+                    last_created_at TEXT,
+                    synced_at TEXT NOT NULL
+                );
+            """)
+
+    def __connect(self) -> closing:
+        return closing(sqlite3.connect(self.database_path))
+
+    def get_sync_state(self, organisation: str) -> dict[str, str | None] | None:
+        with self.__connect() as connection:
+            row = connection.execute(
+                "SELECT covered_since, query_string, end_cursor, last_created_at"
+                " FROM audit_log_sync_state WHERE organisation = ?",
+                (organisation,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["covered_since", "query_string", "end_cursor", "last_created_at"], row))
+
+    def save_page(self, organisation: str, entries: list[dict[str, Any]], covered_since: str,
+                  query_string: str, end_cursor: str | None) -> int:
+        """Stores a page of entries and the cursor it ended on in one transaction, so an interrupted
+        sync resumes from the last page stored. Entries already stored are skipped, the number of new
+        entries is returned.
+        """
+        rows = [
+            (entry["id"], organisation, entry["action"], entry.get("actorLogin"), entry.get("userLogin"),
+             entry["createdAt"], json.dumps(entry))
+            for entry in entries if entry
+        ]
+        with self.__lock, self.__connect() as connection:
+            # The connection commits the page and its sync state together, or neither
+            with connection:
+                previous_changes = connection.total_changes
+                connection.executemany("INSERT OR IGNORE INTO audit_log_entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                new_entries = connection.total_changes - previous_changes
+                last_created_at = max((row[5] for row in rows), default=None)
+                connection.execute(
+                    """
+                    INSERT INTO audit_log_sync_state VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (organisation) DO UPDATE SET
+                        covered_since = excluded.covered_since,
+                        query_string = excluded.query_string,
+                        end_cursor = CASE
+                            WHEN excluded.end_cursor IS NOT NULL THEN excluded.end_cursor
+                            WHEN query_string = excluded.query_string THEN end_cursor
+                        END,
+                        last_created_at = MAX(COALESCE(excluded.last_created_at, last_created_at),
+                                              COALESCE(last_created_at, excluded.last_created_at)),
+                        synced_at = excluded.synced_at
+                    """,
+                    (organisation, covered_since, query_string, end_cursor, last_created_at,
+                     datetime.now(timezone.utc).isoformat())
+                )
+        return new_entries
+
+    def get_entries(self, organisation: str, actions: list[str], since_date: str, until_date: str,
+                    actor: str | None = None) -> list[dict[str, Any]]:
+        """The stored entries with one of the actions created from since_date up to and including until_date,
+        newest first like the audit log itself. Dates are given as YYYY-MM-DD like in an audit log search.
+        """
+        sql = (
+            "SELECT entry FROM audit_log_entries WHERE organisation = ?"
+            f" AND action IN ({', '.join('?' for _ in actions)}) AND created_at >= ? AND created_at < ?"
+        )
+        day_after_until_date = (date.fromisoformat(until_date) + timedelta(days=1)).isoformat()
+        parameters = [organisation, *actions, since_date, day_after_until_date]
+        if actor is not None:
+            sql += " AND actor_login = ?"
+            parameters.append(actor)
+        with self.__connect() as connection:
+            rows = connection.execute(sql + " ORDER BY created_at DESC, id DESC", parameters).fetchall()
+        return [json.loads(entry) for (entry,) in rows]
@@ -0,0 +1,37 @@
+import pandas as pd
+
+USAGE_COLUMNS = {
+    "organizationName": "string",
+    "repositoryName": "string",
+    "product": "string",
+    "sku": "string",
+    "unitType": "string",
+    "quantity": "float64",
+}
+MINUTES_BY_REPOSITORY_COLUMNS = ["organisation", "repository", "sku", "minutes"]
+
+
+def usage_items_to_frame(usage_items: list[dict]) -> pd.DataFrame:
+    """Loads the usageItems of an enterprise billing usage report into a typed frame of the columns
+    needed to aggregate them."""
+    frame = pd.DataFrame(usage_items, columns=list(USAGE_COLUMNS))
+    return frame.astype(USAGE_COLUMNS)
+
+
+def aggregate_gha_minutes(usage: pd.DataFrame, billable_repositories: dict[str, list[str]]) -> pd.DataFrame:
+    """Sums the GitHub Actions minutes of the usage per organisation, repository and SKU, keeping only the
+    repositories listed as billable under their organisation.
+
+    The usage is filtered, matched against an index of the billable repositories and grouped in whole
+    column operations, so the cost grows with the number of usage items rather than items times repositories.
+    """
+    billable_index = pd.MultiIndex.from_tuples(
+        [(organisation, repository) for organisation, repositories in billable_repositories.items()
+         for repository in repositories],
+        names=["organizationName", "repositoryName"]
+    )
+    minutes = usage[(usage["product"] == "actions") & (usage["unitType"] == "Minutes")]
+    minutes = minutes[pd.MultiIndex.from_frame(minutes[["organizationName", "repositoryName"]]).isin(billable_index)]
+    aggregated = minutes.groupby(["organizationName", "repositoryName", "sku"], as_index=False)["quantity"].sum()
+    aggregated.columns = MINUTES_BY_REPOSITORY_COLUMNS
+    return aggregated
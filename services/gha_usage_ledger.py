@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import closing
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+
+class GhaUsageLedger:
+    """A local SQLite ledger of the GitHub Actions minutes of an enterprise, per day, organisation, repository
+    and SKU, with running totals per month.
+
+    The enterprise billing usage report is ingested a day at a time and the time each day was last ingested
+    is recorded. As usage is reported late, a day is fetched again on every run until it has been ingested
+    a settle period after it ended, each ingestion replacing the day's minutes, so each run only fetches the
+    last few days and the month to date minutes are read from the totals without downloading the month's
+    report.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        self.database_path = database_path
+        self.__lock = threading.Lock()
+        with self.__connect() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS gha_usage (
+                    enterprise TEXT NOT NULL,
+                    usage_date TEXT NOT NULL,
+                    organisation TEXT NOT NULL,
+                    repository TEXT NOT NULL,
+                    sku TEXT NOT NULL,
+                    minutes REAL NOT NULL,
+                    PRIMARY KEY (enterprise, usage_date, organisation, repository, sku)
+                );
+                CREATE TABLE IF NOT EXISTS gha_usage_totals (
+                    enterprise TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    organisation TEXT NOT NULL,
+                    repository TEXT NOT NULL,
+                    sku TEXT NOT NULL,
+                    minutes REAL NOT NULL,
+                    PRIMARY KEY (enterprise, month, organisation, repository, sku)
+                );
+                CREATE TABLE IF NOT EXISTS gha_usage_ingested_days (
+                    enterprise TEXT NOT NULL,
+                    usage_date TEXT NOT NULL,
+                    ingested_at TEXT NOT NULL,
+                    PRIMARY KEY (enterprise, usage_date)
+                );
+            """)
+
+    def __connect(self) -> closing:
+        return closing(sqlite3.connect(self.database_path))
+
+    def get_ingested_days(self, enterprise: str, since: date, until: date) -> dict[date, datetime]:
+        """The days between since and until that are ingested, with the time each was last ingested."""
+        with self.__connect() as connection:
+            rows = connection.execute(
+                "SELECT usage_date, ingested_at FROM gha_usage_ingested_days"
+                " WHERE enterprise = ? AND usage_date >= ? AND usage_date <= ?",
+                (enterprise, since.isoformat(), until.isoformat())
+            ).fetchall()
+        return {date.fromisoformat(usage_date): datetime.fromisoformat(ingested_at) for usage_date, ingested_at in rows}
+
+    def get_unsettled_days(self, enterprise: str, now: datetime, settle_period: timedelta) -> list[date]:
+        """The days of the month of now, up to and including today, that were not ingested at least
+        settle_period after they ended, so may still be missing usage that GitHub reported late.
+        """
+        month_start = now.date().replace(day=1)
+        ingested_days = self.get_ingested_days(enterprise, month_start, now.date())
+        unsettled_days = []
+        day = month_start
+        while day <= now.date():
+            day_end = datetime.combine(day + timedelta(days=1), time.min, timezone.utc)
+            if day not in ingested_days or ingested_days[day] < day_end + settle_period:
+                unsettled_days.append(day)
+            day += timedelta(days=1)
+        return unsettled_days
+
+    def ingest(self, enterprise: str, usage_date: date, usage_items: list[dict[str, Any]]) -> float:
+        """Replaces the Actions minutes of a day in the ledger with those of its latest usage report, brings
+        the month's totals up to date and records when the day was ingested, all in one transaction.
+        Returns the minutes of the day.
+        """
+        minutes: dict[tuple[str, str, str], float] = defaultdict(float)
+        for item in usage_items:
+            if item.get("product") == "actions" and item.get("unitType") == "Minutes":
+                minutes[(item.get("organizationName") or "", item.get("repositoryName") or "",
+                         item.get("sku") or "")] += item["quantity"]
+        month_start = usage_date.replace(day=1)
+        next_month_start = (month_start + timedelta(days=31)).replace(day=1)
+        with self.__lock, self.__connect() as connection:
+            # The connection commits the day's minutes, the month's totals and the ingestion time together, or
+            # none of them
+            with connection:
+                connection.execute(
+                    "DELETE FROM gha_usage WHERE enterprise = ? AND usage_date = ?",
+                    (enterprise, usage_date.isoformat())
+                )
+                connection.executemany(
+                    "INSERT INTO gha_usage VALUES (?, ?, ?, ?, ?, ?)",
+                    [(enterprise, usage_date.isoformat(), *key, quantity) for key, quantity in minutes.items()]
+                )
+                connection.execute(
+                    "DELETE FROM gha_usage_totals WHERE enterprise = ? AND month = ?",
+                    (enterprise, month_start.strftime("%Y-%m"))
+                )
+                connection.execute(
+                    """
+                    INSERT INTO gha_usage_totals
+                    SELECT enterprise, ?, organisation, repository, sku, SUM(minutes) FROM gha_usage
+                    WHERE enterprise = ? AND usage_date >= ? AND usage_date < ?
+                    GROUP BY organisation, repository, sku
+                    """,
+                    (month_start.strftime("%Y-%m"), enterprise, month_start.isoformat(), next_month_start.isoformat())
+                )
+                connection.execute(
+                    """
+                    INSERT INTO gha_usage_ingested_days VALUES (?, ?, ?)
+                    ON CONFLICT (enterprise, usage_date) DO UPDATE SET ingested_at = excluded.ingested_at
+                    """,
+                    (enterprise, usage_date.isoformat(), datetime.now(timezone.utc).isoformat())
+                )
+        return sum(minutes.values())
+
+    def get_month_minutes(self, enterprise: str, month: date,
+                          billable_repositories: dict[str, list[str]] | None = None) -> float:
+        """The Actions minutes of the month ingested so far, only counting the billable repositories of each
+        organisation when they are given."""
+        with self.__connect() as connection:
+            rows = connection.execute(
+                "SELECT organisation, repository, SUM(minutes) FROM gha_usage_totals"
+                " WHERE enterprise = ? AND month = ? GROUP BY organisation, repository",
+                (enterprise, month.strftime("%Y-%m"))
+            ).fetchall()
+        if billable_repositories is None:
+            return sum(minutes for _, _, minutes in rows)
+        billable = {
+            (organisation, repository)
+            for organisation, repositories in billable_repositories.items() for repository in repositories
+        }
+        return sum(minutes for organisation, repository, minutes in rows if (organisation, repository) in billable)
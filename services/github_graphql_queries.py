@@ -0,0 +1,471 @@
+from gql import gql
+from graphql import DocumentNode
+
+# Queries are parsed once at import, GithubService looks them up by name from GITHUB_GRAPHQL_QUERIES
+# instead of parsing the query text on every call or page.
+
+PAGE_INFO_FRAGMENT = """
+    fragment PageInfoFields on PageInfo {
+        endCursor
+        hasNextPage
+    }
+"""
+
+REPOSITORY_TOPIC_FIELDS_FRAGMENT = """
+    fragment RepositoryTopicFields on Repository {
+        name
+        isDisabled
+        isLocked
+        hasIssuesEnabled
+        repositoryTopics(first: 10) {
+            edges {
+                node {
+                    topic {
+                        name
+                    }
+                }
+            }
+        }
+        collaborators(affiliation: DIRECT) {
+            totalCount
+        }
+    }
+"""
+
+REPOSITORY_FIELDS_FRAGMENT = """
+    fragment RepositoryFields on Repository {
+        ...RepositoryTopicFields
+        isPrivate
+        pushedAt
+        url
+        description
+        defaultBranchRef {
+            name
+        }
+        licenseInfo {
+            name
+        }
+        branchProtectionRules(first: 10) {
+            edges {
+                node {
+                    isAdminEnforced
+                    pattern
+                    requiredApprovingReviewCount
+                    requiresApprovingReviews
+                }
+            }
+        }
+    }
+""" + REPOSITORY_TOPIC_FIELDS_FRAGMENT
+
+ORG_REPOSITORY_NAMES_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                edges {
+                    node {
+                        isDisabled
+                        name
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+REPOSITORY_INVENTORY_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                nodes {
+                    id
+                    name
+                    isArchived
+                    isLocked
+                    isDisabled
+                    updatedAt
+                    pushedAt
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+UNLOCKED_UNARCHIVED_REPOSITORIES_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                nodes {
+                    name
+                    isDisabled
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+UNARCHIVED_REPOSITORY_VISIBILITIES_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor, isArchived: false) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                nodes {
+                    name
+                    visibility
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+UNLOCKED_UNARCHIVED_REPOSITORIES_AND_OUTSIDE_COLLABORATORS_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                nodes {
+                    name
+                    isDisabled
+                    visibility
+                    collaborators(first: 100, affiliation: OUTSIDE){
+                        pageInfo {
+                            ...PageInfoFields
+                        }
+                        edges {
+                            node {
+                                login
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+CIRCLECI_CONFIG_CHECK_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            repositories(first: $page_size, after: $after_cursor) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                edges {
+                    node {
+                        name
+                        object(expression: "HEAD:.circleci/config.yml") {
+                            ... on Blob {
+                                id
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+REPOSITORY_SEARCH_QUERY = """
+    query($page_size: Int!, $after_cursor: String, $the_query: String!) {
+        search(type: REPOSITORY, query: $the_query, first: $page_size, after: $after_cursor) {
+            repos: edges {
+                repo: node {
+                    ...RepositoryFields
+                }
+            }
+            pageInfo {
+                ...PageInfoFields
+            }
+        }
+    }
+""" + REPOSITORY_FIELDS_FRAGMENT + PAGE_INFO_FRAGMENT
+
+REPOSITORY_TOPIC_SEARCH_QUERY = """
+    query($page_size: Int!, $after_cursor: String, $the_query: String!) {
+        search(type: REPOSITORY, query: $the_query, first: $page_size, after: $after_cursor) {
+            repos: edges {
+                repo: node {
+                    ...RepositoryTopicFields
+                    ... on Repository {
+                        createdAt
+                    }
+                }
+            }
+            pageInfo {
+                ...PageInfoFields
+            }
+        }
+    }
+""" + REPOSITORY_TOPIC_FIELDS_FRAGMENT + PAGE_INFO_FRAGMENT
+
+REPOSITORY_SEARCH_COUNT_QUERY = """
+    query($the_query: String!) {
+        search(type: REPOSITORY, query: $the_query, first: 1) {
+            repositoryCount
+        }
+    }
+"""
+
+TEAM_ID_QUERY = """
+    query($organisation_name: String!, $team_name: String!) {
+        organization(login: $organisation_name) {
+            team(slug: $team_name) {
+                databaseId
+            }
+        }
+    }
+"""
+
+TEAM_NAMES_QUERY = """
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            teams(first: $page_size, after:$after_cursor) {
+                pageInfo {
+                    ...PageInfoFields
+                }
+                edges {
+                    node {
+                        slug
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+TEAM_REPOSITORIES_QUERY = """
+    query($organisation_name: String!, $team_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            team(slug: $team_name) {
+                repositories(first: $page_size, after:$after_cursor) {
+                    edges {
+                        node {
+                            name
+                        }
+                    }
+                    pageInfo {
+                        ...PageInfoFields
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+TEAM_USER_NAMES_QUERY = """
+    query($organisation_name: String!, $team_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            team(slug: $team_name) {
+                members(first: $page_size, after: $after_cursor) {
+                    edges {
+                        node {
+                            login
+                        }
+                    }
+                    pageInfo {
+                        ...PageInfoFields
+                    }
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+USER_ORG_EMAIL_QUERY = """
+    query($organisation_name: String!, $user_name: String!) {
+        user(login: $user_name) {
+            organizationVerifiedDomainEmails(login: $organisation_name)
+        }
+    }
+"""
+
+ORGANIZATION_MEMBERS_WITH_EMAILS_QUERY = """
+    query($org: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $org) {
+            membersWithRole(first: $page_size, after: $after_cursor) {
+                nodes {
+                    login
+                    organizationVerifiedDomainEmails(login: $org)
+                }
+                pageInfo {
+                    ...PageInfoFields
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+AUDIT_LOG_MEMBER_CHANGES_QUERY = """
+    query($organisation_name: String!, $since_date: String!, $cursor: String) {
+        organization(login: $organisation_name) {
+            auditLog(
+                first: 100
+                after: $cursor
+                query: $since_date
+            ) {
+                edges{
+                    node{
+                        ... on OrgAddMemberAuditEntry {
+                            action
+                            createdAt
+                            actorLogin
+                            operationType
+                            permission
+                            userLogin
+                        }
+                        ... on OrgUpdateMemberAuditEntry {
+                            action
+                            createdAt
+                            actorLogin
+                            operationType
+                            permission
+                            permissionWas
+                            userLogin
+                        }
+                    }
+                }
+                pageInfo {
+                    ...PageInfoFields
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+AUDIT_LOG_NEW_MEMBERS_QUERY = """
+    query($organisation_name: String!, $since_date: String!, $cursor: String) {
+        organization(login: $organisation_name) {
+            auditLog(
+                first: 100
+                after: $cursor
+                query: $since_date
+            ) {
+                edges{
+                    node{
+                        ... on OrgAddMemberAuditEntry {
+                            action
+                            createdAt
+                            actorLogin
+                            userLogin
+                        }
+                    }
+                }
+                pageInfo {
+                    ...PageInfoFields
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+AUDIT_LOG_USER_REMOVAL_EVENTS_QUERY = """
+    query($organisation_name: String!, $query_string: String!, $cursor: String) {
+        organization(login: $organisation_name) {
+            auditLog(
+                first: 100
+                after: $cursor
+                query: $query_string
+            ) {
+                edges{
+                    node{
+                        ... on OrgRemoveMemberAuditEntry {
+                            action
+                            createdAt
+                            actorLogin
+                            userLogin
+                        }
+                    }
+                }
+                pageInfo {
+                    ...PageInfoFields
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+AUDIT_LOG_SYNC_QUERY = """
+    query($organisation_name: String!, $query_string: String!, $cursor: String) {
+        organization(login: $organisation_name) {
+            auditLog(
+                first: 100
+                after: $cursor
+                query: $query_string
+                orderBy: {field: CREATED_AT, direction: ASC}
+            ) {
+                edges{
+                    node{
+                        ... on OrgAddMemberAuditEntry {
+                            id
+                            action
+                            createdAt
+                            actorLogin
+                            operationType
+                            permission
+                            userLogin
+                        }
+                        ... on OrgUpdateMemberAuditEntry {
+                            id
+                            action
+                            createdAt
+                            actorLogin
+                            operationType
+                            permission
+                            permissionWas
+                            userLogin
+                        }
+                        ... on OrgRemoveMemberAuditEntry {
+                            id
+                            action
+                            createdAt
+                            actorLogin
+                            userLogin
+                        }
+                    }
+                }
+                pageInfo {
+                    ...PageInfoFields
+                }
+            }
+        }
+    }
+""" + PAGE_INFO_FRAGMENT
+
+GITHUB_GRAPHQL_QUERIES: dict[str, DocumentNode] = {
+    name: gql(query)
+    for name, query in {
+        "org_repository_names": ORG_REPOSITORY_NAMES_QUERY,
+        "repository_inventory": REPOSITORY_INVENTORY_QUERY,
+        "unlocked_unarchived_repositories": UNLOCKED_UNARCHIVED_REPOSITORIES_QUERY,
+        "unarchived_repository_visibilities": UNARCHIVED_REPOSITORY_VISIBILITIES_QUERY,
+        "unlocked_unarchived_repositories_and_outside_collaborators":
+            UNLOCKED_UNARCHIVED_REPOSITORIES_AND_OUTSIDE_COLLABORATORS_QUERY,
+        "circleci_config_check": CIRCLECI_CONFIG_CHECK_QUERY,
+        "repository_search": REPOSITORY_SEARCH_QUERY,
+        "repository_topic_search": REPOSITORY_TOPIC_SEARCH_QUERY,
+        "repository_search_count": REPOSITORY_SEARCH_COUNT_QUERY,
+        "team_id": TEAM_ID_QUERY,
+        "team_names": TEAM_NAMES_QUERY,
+        "team_repositories": TEAM_REPOSITORIES_QUERY,
+        "team_user_names": TEAM_USER_NAMES_QUERY,
+        "user_org_email": USER_ORG_EMAIL_QUERY,
+        "organization_members_with_emails": ORGANIZATION_MEMBERS_WITH_EMAILS_QUERY,
+        "audit_log_member_changes": AUDIT_LOG_MEMBER_CHANGES_QUERY,
+        "audit_log_new_members": AUDIT_LOG_NEW_MEMBERS_QUERY,
+        "audit_log_user_removal_events": AUDIT_LOG_USER_REMOVAL_EVENTS_QUERY,
+        "audit_log_sync": AUDIT_LOG_SYNC_QUERY,
+    }.items()
+}
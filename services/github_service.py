@@ -1,29 +1,166 @@
 # pylint: disable=E1136, E1135, W0718, C0411
 
+import asyncio
+import concurrent.futures
 import json
+import threading
 import time
 from calendar import timegm
+from contextlib import closing
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from time import gmtime, sleep
-from typing import Any, Callable
-import concurrent.futures
+from typing import Any, Callable, Iterator
 
 from dateutil.relativedelta import relativedelta
-from github import (Github, NamedUser, RateLimitExceededException,
-                    UnknownObjectException, GithubException)
+from github import (Github, GithubException, NamedUser,
+                    RateLimitExceededException, UnknownObjectException)
 from github.Organization import Organization
 from github.Repository import Repository
+from github.Team import Team
 from gql import Client, gql
-from gql.transport.aiohttp import AIOHTTPTransport
-from gql.transport.exceptions import TransportServerError
+from gql.client import AsyncClientSession
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+from graphql import DocumentNode
 from requests import Session
 
+from clients.github_client_pool import GithubClientPool
+from clients.github_graphql_paginator import GithubGraphQLPaginator
+from clients.github_object_cache import GithubObjectCache
+from clients.github_query_cost_tracker import (GithubQueryCostTracker,
+                                               query_label)
+from clients.github_rate_limit_scheduler import (GithubTokenPool,
+                                                 RateLimitedAdapter,
+                                                 RateLimitedAIOHTTPTransport,
+                                                 RateLimitedClient)
+from clients.github_rest_cache import (ConditionalRequestAdapter,
+                                       GithubRestCache)
 from config.logging_config import logging
+from services.audit_log_store import AuditLogStore
+from services.gha_billing import aggregate_gha_minutes, usage_items_to_frame
+from services.gha_usage_ledger import GhaUsageLedger
+from services.github_graphql_queries import GITHUB_GRAPHQL_QUERIES
+from services.repository_inventory_store import RepositoryInventoryStore
 
 logging.getLogger("gql").setLevel(logging.WARNING)
 
 
-def retries_github_rate_limit_exception_at_next_reset_once(func: Callable) -> Callable:
+@lru_cache
+def _build_user_org_emails_query(number_of_users: int) -> DocumentNode:
+    # Each user is looked up under its own alias, user0 to userN, with its login passed as a variable
+    user_variables = "".join(f", $user{index}: String!" for index in range(number_of_users))
+    user_lookups = "\n".join(
+        f"user{index}: user(login: $user{index}) {{ organizationVerifiedDomainEmails(login: $organisation_name) }}"
+        for index in range(number_of_users)
+    )
+    return gql(f"""
+        query($organisation_name: String!{user_variables}) {{
+            rateLimit {{
+                cost
+                remaining
+                resetAt
+            }}
+            {user_lookups}
+        }}
+    """)
+
+
+@lru_cache
+def _build_repository_histories_query(number_of_repositories: int) -> DocumentNode:
+    # Each repository is looked up under its own alias, repo0 to repoN, with its name and history cursor as variables
+    repository_variables = "".join(
+        f", $repo{index}: String!, $cursor{index}: String" for index in range(number_of_repositories))
+    repository_lookups = "\n".join(f"""
+        repo{index}: repository(owner: $organisation_name, name: $repo{index}) {{
+            defaultBranchRef {{
+                target {{
+                    ... on Commit {{
+                        history(first: 100, after: $cursor{index}, since: $since) {{
+                            totalCount
+                            pageInfo {{
+                                endCursor
+                                hasNextPage
+                            }}
+                            nodes {{
+                                author {{
+                                    user {{
+                                        login
+                                    }}
+                                }}
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        }}""" for index in range(number_of_repositories))
+    return gql(f"""
+        query($organisation_name: String!, $since: GitTimestamp{repository_variables}) {{
+            rateLimit {{
+                cost
+                remaining
+                resetAt
+            }}
+            {repository_lookups}
+        }}
+    """)
+
+
+@lru_cache
+def _build_repository_collaborators_query(number_of_repositories: int, affiliation: str) -> DocumentNode:
+    # Each repository is looked up under its own alias, repo0 to repoN, with its name and collaborators cursor as variables
+    repository_variables = "".join(
+        f", $repo{index}: String!, $cursor{index}: String" for index in range(number_of_repositories))
+    repository_lookups = "\n".join(f"""
+        repo{index}: repository(owner: $organisation_name, name: $repo{index}) {{
+            collaborators(first: 100, after: $cursor{index}, affiliation: {affiliation}) {{
+                pageInfo {{
+                    endCursor
+                    hasNextPage
+                }}
+                edges {{
+                    node {{
+                        login
+                    }}
+                }}
+            }}
+        }}""" for index in range(number_of_repositories))
+    return gql(f"""
+        query($organisation_name: String!{repository_variables}) {{
+            rateLimit {{
+                cost
+                remaining
+                resetAt
+            }}
+            {repository_lookups}
+        }}
+    """)
+
+
+def _get_seconds_until_rate_limit_resets(github_service: "GithubService", exception: Exception) -> float:
+    resource = "core" if isinstance(exception, RateLimitExceededException) else "graphql"
+
+    # Prefer the reset time GitHub already sent, asking for the rate limit again costs another request
+    headers = getattr(exception, "headers", None)
+    if isinstance(headers, dict) and "x-ratelimit-reset" in headers:
+        return max(float(headers["x-ratelimit-reset"]) - time.time(), 0)
+    token_pool = getattr(github_service, "github_token_pool", None)
+    if token_pool is not None and token_pool.seconds_until_reset(resource) is not None:
+        return token_pool.seconds_until_reset(resource)
+
+    rate_limits = github_service.github_client_core_api.get_rate_limit()
+    rate_limit_to_use = rate_limits.core if resource == "core" else rate_limits.graphql
+    reset_timestamp = timegm(rate_limit_to_use.reset.timetuple())
+    now_timestamp = timegm(gmtime())
+    return (reset_timestamp - now_timestamp) if reset_timestamp > now_timestamp else 0
+
+
+def retries_github_rate_limit_exception_at_next_reset_once(func: Callable | None = None, *,
+                                                           resource: str = "core") -> Callable:
+    """Used bare for methods calling the REST API, or with resource="graphql" for methods only sending GraphQL
+    queries, so a method is only held back by the budget it spends."""
+    if func is None:
+        return lambda method: retries_github_rate_limit_exception_at_next_reset_once(method, resource=resource)
+
     def decorator(*args, **kwargs):
         """
         A decorator to retry the method when rate limiting for GitHub resets if the method fails due to Rate Limit related exception.
@@ -37,24 +174,23 @@ def retries_github_rate_limit_exception_at_next_reset_once(func: Callable) -> Ca
             - Deleting data
             - Updating data
         """
-        try:
-            return func(*args, **kwargs)
-        except (RateLimitExceededException, TransportServerError) as exception:
-            logging.warning(
-                f"Caught {type(exception).__name__}, retrying calls when rate limit resets.")
-            rate_limits = args[0].github_client_core_api.get_rate_limit()
-            rate_limit_to_use = rate_limits.core if isinstance(
-                exception, RateLimitExceededException) else rate_limits.graphql
-
-            reset_timestamp = timegm(rate_limit_to_use.reset.timetuple())
-            now_timestamp = timegm(gmtime())
-            time_until_core_api_rate_limit_resets = (
-                reset_timestamp - now_timestamp) if reset_timestamp > now_timestamp else 0
-
-            wait_time_buffer = 5
-            sleep(time_until_core_api_rate_limit_resets +
-                  wait_time_buffer if time_until_core_api_rate_limit_resets else 0)
-            return func(*args, **kwargs)
+        token_pool = getattr(args[0], "github_token_pool", None)
+        if token_pool is not None:
+            # Hold the call back while the budget of the resource it uses is down to its reserve
+            token_pool.acquire(resource, cost=0)
+        # GraphQL queries sent by the method, and the methods it calls, are costed against its name
+        with query_label(getattr(func, "__name__", repr(func))):
+            try:
+                return func(*args, **kwargs)
+            except (RateLimitExceededException, TransportServerError) as exception:
+                logging.warning(
+                    f"Caught {type(exception).__name__}, retrying calls when rate limit resets.")
+                time_until_rate_limit_resets = _get_seconds_until_rate_limit_resets(args[0], exception)
+
+                wait_time_buffer = 5
+                sleep(time_until_rate_limit_resets +
+                      wait_time_buffer if time_until_rate_limit_resets else 0)
+                return func(*args, **kwargs)
 
     return decorator
 
@@ -63,91 +199,191 @@ class GithubService:
     USER_ACCESS_REMOVED_ISSUE_TITLE: str = "User access removed, access is now via a team"
     GITHUB_GQL_MAX_PAGE_SIZE = 100
     GITHUB_GQL_DEFAULT_PAGE_SIZE = 80
+    GITHUB_GQL_USER_BATCH_SIZE = 50
+    GITHUB_MAX_CONCURRENT_READS = 16
+    # Each thread has its own PyGithub clients, the REST session is shared by all of them
+    GITHUB_CONNECTION_POOL_SIZE = GITHUB_MAX_CONCURRENT_READS
+    GITHUB_GQL_REPOSITORY_BATCH_SIZE = 20
+    GITHUB_GQL_MAX_CONCURRENT_BATCHES = 4
+    GITHUB_GQL_MAX_HISTORY_COMMITS = 2000
+    GITHUB_AUDIT_LOG_BULK_SCAN_MIN_USERS = 100
+    GITHUB_SEARCH_RESULT_CAP = 1000
+    GITHUB_SEARCH_MAX_CONCURRENT_SHARDS = 4
+    GITHUB_MAX_CONCURRENT_ORGANISATIONS = 4
+    GITHUB_FIRST_REPOSITORY_DATE = date(2008, 1, 1)
+    REPOSITORY_INVENTORY_FULL_SYNC_DAYS = 7
+    GHA_USAGE_SETTLE_DAYS = 1
+    GITHUB_OBJECT_CACHE_SIZE = 512
+    GITHUB_OBJECT_CACHE_TTL_SECONDS = 600
+    AUDIT_LOG_SYNCED_ACTIONS = ["org.add_member", "org.update_member", "org.remove_member"]
     ENTERPRISE_NAME = "ministry-of-justice-uk"
 
     # Added to stop TypeError on instantiation. See https://github.com/python/cpython/blob/d2340ef25721b6a72d45d4508c672c4be38c67d3/Objects/typeobject.c#L4444
     def __new__(cls, *_, **__):
         return super(GithubService, cls).__new__(cls)
 
-    def __init__(self, org_token: str, organisation_name: str,
-                 enterprise_name: str = ENTERPRISE_NAME) -> None:
+    def __init__(self, org_token: str | list[str], organisation_name: str,
+                 enterprise_name: str = ENTERPRISE_NAME, rest_cache_dir: str | None = None,
+                 audit_log_store: AuditLogStore | None = None,
+                 repository_inventory_store: RepositoryInventoryStore | None = None,
+                 gha_usage_ledger: GhaUsageLedger | None = None) -> None:
         self.organisation_name: str = organisation_name
         self.enterprise_name: str = enterprise_name
         self.organisations_in_enterprise: list = ["ministryofjustice", "moj-analytical-services"]
 
-        self.github_client_core_api: Github = Github(org_token)
-        self.github_client_gql_api: Client = Client(transport=AIOHTTPTransport(
+        # Several tokens can be given to spread the rate limit of enterprise wide jobs over them
+        org_tokens = [org_token] if isinstance(org_token, str) else list(org_token)
+        self.github_token_pool = GithubTokenPool(org_tokens)
+        self.github_client_pool = GithubClientPool(
+            self.github_token_pool.tokens, Github)
+        # Clients of other threads are created on their first call, those of this thread straight away
+        self.github_client_pool.clients()
+        # The GraphQL cost of each method, over every service of the job, is logged when the job exits
+        self.github_query_cost_tracker = GithubQueryCostTracker.for_process()
+        self.github_client_gql_api: Client = RateLimitedClient(transport=RateLimitedAIOHTTPTransport(
             url="https://api.github.com/graphql",
-            headers={"Authorization": f"Bearer {org_token}"},
+            headers={"Authorization": f"Bearer {org_tokens[0]}"},
+            token_pool=self.github_token_pool,
+            cost_tracker=self.github_query_cost_tracker,
         ), execute_timeout=120)
         self.github_client_rest_api = Session()
         self.github_client_rest_api.headers.update(
             {
                 "Accept": "application/vnd.github+json",
-                "Authorization": f"Bearer {org_token}",
+                "Authorization": f"Bearer {org_tokens[0]}",
             }
         )
+        if rest_cache_dir:
+            # Revalidate repeated GET requests with their ETag so unchanged responses cost no rate limit
+            self.github_client_rest_api.mount("https://api.github.com/", ConditionalRequestAdapter(
+                GithubRestCache(rest_cache_dir), self.github_token_pool, pool_maxsize=self.GITHUB_CONNECTION_POOL_SIZE))
+        else:
+            self.github_client_rest_api.mount("https://api.github.com/", RateLimitedAdapter(
+                self.github_token_pool, pool_maxsize=self.GITHUB_CONNECTION_POOL_SIZE))
+        self.github_graphql_paginator = GithubGraphQLPaginator(
+            self.github_client_gql_api, self.GITHUB_GQL_MAX_PAGE_SIZE)
+        # Organization, Team and Repository handles are fetched once per run and thread instead of once per call
+        self.__object_caches = threading.local()
+        # With a store the audit log reports are answered locally after fetching only the new entries
+        self.audit_log_store = audit_log_store
+        # With an inventory the repository listings only fetch the repositories updated since the last run
+        self.repository_inventory_store = repository_inventory_store
+        # With a ledger the GHA minutes are read from its month to date totals after ingesting the new hours
+        self.gha_usage_ledger = gha_usage_ledger
+
+    @property
+    def github_client_core_api(self) -> Github:
+        """The calling thread's PyGithub client of the token with the most core budget left.
+
+        PyGithub keeps the rate limit headers of its last response, which are copied into the token pool
+        before picking so calls made through PyGithub count towards the budget of their token. They are read
+        from the client's requester, as Github.rate_limiting sends a GET /rate_limit for a client that has
+        not made a request yet, and a client without any is left to the budget the pool already knows.
+        """
+        clients = self.github_client_pool.clients()
+        if len(clients) == 1:
+            return next(iter(clients.values()))
+        for token, client in clients.items():
+            requester = client._Github__requester  # pylint: disable=W0212
+            remaining, limit = requester.rate_limiting
+            if limit >= 0:
+                self.github_token_pool.schedulers[token].update(
+                    "core", limit, remaining, requester.rate_limiting_resettime)
+        return clients[self.github_token_pool.pick("core")]
+
+    @property
+    def github_object_cache(self) -> GithubObjectCache:
+        """The calling thread's cache of PyGithub objects, which send their requests through the client of the
+        thread that fetched them."""
+        if not hasattr(self.__object_caches, "cache"):
+            self.__object_caches.cache = GithubObjectCache(
+                self.GITHUB_OBJECT_CACHE_SIZE, self.GITHUB_OBJECT_CACHE_TTL_SECONDS)
+        return self.__object_caches.cache
+
+    def _get_organization(self, organisation_name: str | None = None) -> Organization:
+        organisation_name = organisation_name or self.organisation_name
+        return self.github_object_cache.get(
+            ("organization", organisation_name),
+            lambda: self.github_client_core_api.get_organization(organisation_name))
+
+    def _get_repository(self, repository_name: str) -> Repository:
+        full_name = f"{self.organisation_name}/{repository_name}"
+        return self.github_object_cache.get(
+            ("repository", full_name), lambda: self.github_client_core_api.get_repo(full_name))
+
+    def _get_team(self, team_id: int) -> Team:
+        return self.github_object_cache.get(("team", team_id), lambda: self._get_organization().get_team(team_id))
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_outside_collaborators_login_names(self) -> list[str]:
         logging.info("Getting Outside Collaborators Login Names")
-        outside_collaborators = self.github_client_core_api.get_organization(
-            self.organisation_name).get_outside_collaborators() or []
+        outside_collaborators = self._get_organization().get_outside_collaborators() or []
         return outside_collaborators
 
     @retries_github_rate_limit_exception_at_next_reset_once
-    def add_all_users_to_team(self, team_name: str) -> None:
+    def add_all_users_to_team(self, team_name: str) -> dict[str, int | float]:
+        """Adds every organisation member missing from the team and returns a report of what was done.
+
+        Both member lists are read once into sets of logins so the missing members are a set difference
+        and the team is fetched once. The memberships are added one at a time, as PyGithub spaces writes out
+        a second apart to stay within the secondary rate limit and the team's requester is not shared
+        between threads.
+        """
         logging.info(f"Adding all users to {team_name}")
+        start_time = time.perf_counter()
         team_id = self.get_team_id_from_team_name(team_name)
-        all_users = self.__get_all_users()
-        existing_users_in_team = self.__get_users_from_team(team_id)
-
-        for user in all_users:
-            if user not in existing_users_in_team:
-                self.__add_user_to_team(user, team_id)
+        all_users = {user.login: user for user in self.__get_all_users()}
+        existing_logins_in_team = {user.login for user in self.__get_users_from_team(team_id)}
+        users_to_add = [user for login, user in all_users.items() if login not in existing_logins_in_team]
+
+        team = self._get_team(team_id)
+        users_added = sum(self.__add_user_to_team(user, team) for user in users_to_add)
+
+        report = {
+            "organisation_members": len(all_users),
+            "team_members": len(existing_logins_in_team),
+            "users_added": users_added,
+            "users_failed": len(users_to_add) - users_added,
+            "seconds": round(time.perf_counter() - start_time, 2),
+        }
+        logging.info(f"Finished adding all users to {team_name}: {report}")
+        return report
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def __get_all_users(self) -> list:
         logging.info("Getting all organization members")
         logging.info(self.github_client_core_api.get_rate_limit())
-        return self.github_client_core_api.get_organization(self.organisation_name).get_members() or []
+        return self._get_organization().get_members() or []
 
     @retries_github_rate_limit_exception_at_next_reset_once
-    def __add_user_to_team(self, user: NamedUser, team_id: int) -> None:
-        logging.info(f"Adding user {user.login} to team {team_id}")
+    def __add_user_to_team(self, user: NamedUser, team: Team) -> bool:
+        logging.info(f"Adding user {user.login} to team {team.id}")
         try:
-            self.github_client_core_api.get_organization(self.organisation_name).get_team(team_id).add_membership(user)
+            team.add_membership(user)
+            return True
         except GithubException as err:
-            print(f"Could not add {user.login} to team {team_id}: {err}")
+            logging.error(f"Could not add {user.login} to team {team.id}: {err}")
+            return False
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def __get_repositories_from_team(self, team_id: int) -> list[Repository]:
         logging.info(f"Getting all repositories for team {team_id}")
-        return self.github_client_core_api.get_organization(self.organisation_name).get_team(
-            team_id).get_repos() or []
+        return self._get_team(team_id).get_repos() or []
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def __get_users_from_team(self, team_id: int) -> list:
         logging.info(f"Getting all named users for team {team_id}")
-        return self.github_client_core_api.get_organization(self.organisation_name).get_team(
-            team_id).get_members() or []
+        return self._get_team(team_id).get_members() or []
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_team_id_from_team_name(self, team_name: str) -> int | TypeError:
         logging.info(f"Getting team ID for team name {team_name}")
-        data = self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $team_name: String!) {
-                organization(login: $organisation_name) {
-                    team(slug: $team_name) {
-                        databaseId
-                    }
-                }
-            }
-        """), variable_values={"organisation_name": self.organisation_name, "team_name": team_name})
+        data = self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["team_id"], variable_values={
+            "organisation_name": self.organisation_name, "team_name": team_name})
 
         return data["organization"]["team"]["databaseId"]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_org_repository_names(self, after_cursor: str | None,
                                                    page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
         logging.info(
@@ -155,27 +391,13 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
-                organization(login: $organisation_name) {
-                    repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                        edges {
-                            node {
-                                isDisabled
-                                name
-                            }
-                        }
-                    }
-                }
-            }
-        """), variable_values={"organisation_name": self.organisation_name, "page_size": page_size,
-                               "after_cursor": after_cursor})
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["org_repository_names"], variable_values={
+            "organisation_name": self.organisation_name,
+            "page_size": page_size,
+            "after_cursor": after_cursor
+        })
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_repositories_per_type(self, repo_type: str, after_cursor: str | None,
                                                     page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
         logging.info(
@@ -184,68 +406,10 @@ class GithubService:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
         the_query = f"org:{self.organisation_name}, archived:false, is:{repo_type}"
-        return self.github_client_gql_api.execute(gql("""
-            query($page_size: Int!, $after_cursor: String, $the_query: String!) {
-                search(
-                    type: REPOSITORY
-                    query: $the_query
-                    first: $page_size
-                    after: $after_cursor
-                ) {
-                repos: edges {
-                    repo: node {
-                        ... on Repository {
-                                isDisabled
-                                isPrivate
-                                isLocked
-                                name
-                                pushedAt
-                                url
-                                description
-                                hasIssuesEnabled
-                                repositoryTopics(first: 10) {
-                                    edges {
-                                        node {
-                                            topic {
-                                                name
-                                            }
-                                        }
-                                    }
-                                }
-                                defaultBranchRef {
-                                    name
-                                }
-                                collaborators(affiliation: DIRECT) {
-                                    totalCount
-                                }
-                                licenseInfo {
-                                    name
-                                }
-                                collaborators(affiliation: DIRECT) {
-                                    totalCount
-                                }
-                                branchProtectionRules(first: 10) {
-                                    edges {
-                                        node {
-                                            isAdminEnforced
-                                            pattern
-                                            requiredApprovingReviewCount
-                                            requiresApprovingReviews
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                    pageInfo {
-                        hasNextPage
-                        endCursor
-                    }
-                }
-            }
-        """), variable_values={"the_query": the_query, "page_size": page_size, "after_cursor": after_cursor})
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["repository_search"], variable_values={
+            "the_query": the_query, "page_size": page_size, "after_cursor": after_cursor})
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_team_names(self, after_cursor: str | None,
                                          page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
         logging.info(
@@ -253,29 +417,13 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
-                organization(login: $organisation_name) {
-                    teams(first: $page_size, after:$after_cursor) {
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                        edges {
-                            node {
-                                slug
-                            }
-                        }
-                    }
-                }
-            }
-        """), variable_values={
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["team_names"], variable_values={
             "organisation_name": self.organisation_name,
             "page_size": page_size,
             "after_cursor": after_cursor
         })
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_team_repositories(self, team_name: str, after_cursor: str | None,
                                                 page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
         logging.info(
@@ -283,100 +431,82 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-        query($organisation_name: String!, $team_name: String!, $page_size: Int!, $after_cursor: String) {
-            organization(login: $organisation_name) {
-                team(slug: $team_name) {
-                    repositories(first: $page_size, after:$after_cursor) {
-                        edges {
-                            node {
-                                name
-                            }
-                        }
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                    }
-                }
-            }
-        }
-        """), variable_values={
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["team_repositories"], variable_values={
             "organisation_name": self.organisation_name,
             "team_name": team_name,
             "page_size": page_size,
             "after_cursor": after_cursor
         })
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_team_names(self) -> list[str]:
         """A wrapper function to run a GraphQL query to get the team names in the organisation
 
         Returns:
             list: A list of the team names
         """
-        has_next_page = True
-        after_cursor = None
-        team_names = []
-
-        while has_next_page:
-            data = self.get_paginated_list_of_team_names(after_cursor, 100)
-
-            if data["organization"]["teams"]["edges"] is not None:
-                for team in data["organization"]["teams"]["edges"]:
-                    team_names.append(team["node"]["slug"])
-
-            has_next_page = data["organization"]["teams"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["teams"]["pageInfo"]["endCursor"]
-        return team_names
+        teams = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["team_names"], ["organization", "teams"],
+            {"organisation_name": self.organisation_name}
+        )
+        return [team["slug"] for team in teams]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_team_repository_names(self, team_name: str) -> list[str]:
         """A wrapper function to run a GraphQL query to get a team repository names
 
         Returns:
             list: A list of the team repository names
         """
-        has_next_page = True
-        after_cursor = None
-        team_repository_names = []
-
-        while has_next_page:
-            data = self.get_paginated_list_of_team_repositories(
-                team_name, after_cursor, 100)
-
-            if data["organization"]["team"]["repositories"]["edges"] is not None:
-                for team in data["organization"]["team"]["repositories"]["edges"]:
-                    team_repository_names.append(team["node"]["name"])
-
-            has_next_page = data["organization"]["team"]["repositories"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["team"]["repositories"]["pageInfo"]["endCursor"]
-        return team_repository_names
+        repositories = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["team_repositories"], ["organization", "team", "repositories"],
+            {"organisation_name": self.organisation_name, "team_name": team_name}
+        )
+        return [repository["name"] for repository in repositories]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_team_user_names(self, team_name: str) -> list[str]:
         """A wrapper function to run a GraphQL query to get a team user names
 
         Returns:
             list: A list of the team user names
         """
-        has_next_page = True
-        after_cursor = None
-        team_user_names = []
+        members = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["team_user_names"], ["organization", "team", "members"],
+            {"organisation_name": self.organisation_name, "team_name": team_name}
+        )
+        return [member["login"] for member in members]
 
-        while has_next_page:
-            data = self.get_paginated_list_of_team_user_names(
-                team_name, after_cursor, 100)
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def sync_repository_inventory(self, full: bool = False) -> int:
+        """
+        Brings the repository inventory store up to date and returns the number of repositories fetched.
 
-            if data["organization"]["team"]["members"]["edges"] is not None:
-                for team in data["organization"]["team"]["members"]["edges"]:
-                    team_user_names.append(team["node"]["login"])
+        Repositories are listed most recently updated first and listing stops at the first one older
+        than the newest stored, so a daily run fetches a page or two. A full listing, which also drops
+        deleted and transferred repositories, is taken when asked for, on the first sync and once the
+        last one is more than REPOSITORY_INVENTORY_FULL_SYNC_DAYS old.
+        """
+        state = self.repository_inventory_store.get_sync_state(self.organisation_name)
+        full = full or state is None or datetime.fromisoformat(state["full_synced_at"]) < (
+            datetime.now(timezone.utc) - timedelta(days=self.REPOSITORY_INVENTORY_FULL_SYNC_DAYS))
+        logging.info(f"Syncing the {'full' if full else 'updated'} repository inventory of {self.organisation_name}")
+
+        updated_repositories = []
+        repositories = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["repository_inventory"], ["organization", "repositories"],
+            {"organisation_name": self.organisation_name}
+        )
+        with closing(repositories):
+            for repository in repositories:
+                if not full and state["watermark"] and repository["updatedAt"] < state["watermark"]:
+                    break
+                updated_repositories.append(repository)
 
-            has_next_page = data["organization"]["team"]["members"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["team"]["members"]["pageInfo"]["endCursor"]
-        return team_user_names
+        self.repository_inventory_store.save_repositories(self.organisation_name, updated_repositories, full)
+        return len(updated_repositories)
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_org_repo_names(self) -> list[str]:
         """A wrapper function to run a GraphQL query to get a list of the organisation repository names
         (open repositories only).
@@ -384,24 +514,16 @@ class GithubService:
         Returns:
             list: A list of the organisation repository names
         """
-        has_next_page = True
-        after_cursor = None
-        repository_names = []
-        while has_next_page:
-            data = self.get_paginated_list_of_org_repository_names(
-                after_cursor, 100)
-
-            if data["organization"]["repositories"]["edges"] is not None:
-                for repo in data["organization"]["repositories"]["edges"]:
-                    if repo["node"]["isDisabled"]:
-                        continue
-                    repository_names.append(repo["node"]["name"])
-
-            has_next_page = data["organization"]["repositories"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["repositories"]["pageInfo"]["endCursor"]
-        return repository_names
+        if self.repository_inventory_store:
+            self.sync_repository_inventory()
+            return self.repository_inventory_store.get_repository_names(self.organisation_name)
+        repositories = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["org_repository_names"], ["organization", "repositories"],
+            {"organisation_name": self.organisation_name}
+        )
+        return [repo["name"] for repo in repositories if not repo["isDisabled"]]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def check_circleci_config_in_repos(self) -> list[str]:
         """Check if each repository in the list has a CircleCI configuration file using GraphQL.
 
@@ -411,55 +533,24 @@ class GithubService:
         Returns:
             list: A list of repository names that have a CircleCI configuration file.
         """
-        has_next_page = True
-        after_cursor = None
-        repos_with_circleci_config = []
-
-        while has_next_page:
-            data = self.get_paginated_circleci_config_check(after_cursor, 100)
-
-            if data["organization"]["repositories"]["edges"]:
-                for repo in data["organization"]["repositories"]["edges"]:
-                    if repo["node"]["object"]:
-                        repos_with_circleci_config.append(repo["node"]["name"])
-
-            has_next_page = data["organization"]["repositories"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["repositories"]["pageInfo"]["endCursor"]
-        return repos_with_circleci_config
+        repositories = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["circleci_config_check"], ["organization", "repositories"],
+            {"organisation_name": self.organisation_name}
+        )
+        return [repo["name"] for repo in repositories if repo["object"]]
 
     def get_paginated_circleci_config_check(self, after_cursor: str | None, page_size: int) -> dict[str, Any]:
         logging.info(f"Checking CircleCI config in repos. Page size {page_size}, after cursor {bool(after_cursor)}")
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
 
-        return self.github_client_gql_api.execute(gql("""
-        query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
-            organization(login: $organisation_name) {
-                repositories(first: $page_size, after: $after_cursor) {
-                    pageInfo {
-                        endCursor
-                        hasNextPage
-                    }
-                    edges {
-                        node {
-                            name
-                            object(expression: "HEAD:.circleci/config.yml") {
-                                ... on Blob {
-                                    id
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        """), variable_values={
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["circleci_config_check"], variable_values={
             "organisation_name": self.organisation_name,
             "page_size": page_size,
             "after_cursor": after_cursor
         })
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_unlocked_unarchived_repos_and_their_first_100_outside_collaborators(
         self,
         after_cursor: str | None,
@@ -471,37 +562,12 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
-                organization(login: $organisation_name) {
-                    repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                        nodes {
-                            name
-                            isDisabled
-                            visibility
-                            collaborators(first: 100, affiliation: OUTSIDE){
-                                pageInfo {
-                                    hasNextPage
-                                }
-                                edges {
-                                    node {
-                                        login
-                                    }
-                                }
-                            }
-                        }
+        return self.github_client_gql_api.execute(
+            GITHUB_GRAPHQL_QUERIES["unlocked_unarchived_repositories_and_outside_collaborators"],
+            variable_values={"organisation_name": self.organisation_name, "page_size": page_size,
+                             "after_cursor": after_cursor})
 
-                    }
-                }
-            }
-        """), variable_values={"organisation_name": self.organisation_name, "page_size": page_size,
-                               "after_cursor": after_cursor})
-
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_active_repos_and_outside_collaborators(self) -> list[dict[str, bool, list[str]]]:
         """A wrapper function to run a GraphQL query to get a list of dictionaries containing active
         repositories and for each its set of current affiliated Outside Collaborators login names for
@@ -517,69 +583,172 @@ class GithubService:
                 {'repository': 'repo2', 'public': False, 'outside_collaborators': ['c3', 'c4']}
             ]
         """
-        repo_has_next_page = True
-        after_cursor = None
+        return self.github_graphql_paginator.run(self.__get_active_repos_and_outside_collaborators)
+
+    async def __get_active_repos_and_outside_collaborators(
+            self, session: AsyncClientSession) -> list[dict[str, bool, list[str]]]:
+        # The first 100 Outside Collaborators of each repo come with the repo, the rest of those of the few repos
+        # with more are fetched by aliased queries run alongside the next pages of repos
+        semaphore = asyncio.Semaphore(self.GITHUB_GQL_MAX_CONCURRENT_BATCHES)
         active_repos_and_outside_collaborators = []
-        while repo_has_next_page:
-            data = self.get_paginated_list_of_unlocked_unarchived_repos_and_their_first_100_outside_collaborators(
-                after_cursor, self.GITHUB_GQL_MAX_PAGE_SIZE
-            )
-            if data["organization"]["repositories"]["nodes"] is not None:
-                for repo in data["organization"]["repositories"]["nodes"]:
+        follow_ups: list[asyncio.Task] = []
+        try:
+            async for connection in self.github_graphql_paginator.paginate_connections(
+                    session, GITHUB_GRAPHQL_QUERIES["unlocked_unarchived_repositories_and_outside_collaborators"],
+                    ["organization", "repositories"], {"organisation_name": self.organisation_name}):
+                collaborator_cursors: dict[str, str] = {}
+                collaborators_by_repo: dict[str, list[str]] = {}
+                for repo in self.github_graphql_paginator.get_nodes(connection):
                     if repo["isDisabled"]:
                         continue
-                    # The query only returns the first 100 Outside Collaborators on a repo, if there is a next page
-                    # of collaborators it will not collect them. This is very unlikely to occur, however the function
-                    # output is unreliable if it does so.
+                    collaborators = [edge["node"]["login"] for edge in repo["collaborators"]["edges"]]
+                    active_repos_and_outside_collaborators.append(
+                        {"repository": repo["name"], "public": repo["visibility"] == "PUBLIC",
+                         "outside_collaborators": collaborators}
+                    )
                     if repo["collaborators"]["pageInfo"]["hasNextPage"]:
-                        raise ValueError(
-                            f"Repo has more than {self.GITHUB_GQL_MAX_PAGE_SIZE} Outside Collaborators; only collected the first {self.GITHUB_GQL_MAX_PAGE_SIZE} hence omitted and calculation unreliable."
-                        )
-                    public = False
-                    if repo["visibility"] == "PUBLIC":
-                        public = True
-                    if repo["collaborators"]["edges"]:
-                        collaborators = [edge["node"]["login"] for edge in repo["collaborators"]["edges"]]
-                        active_repos_and_outside_collaborators.append(
-                            {"repository": repo["name"], "public": public, "outside_collaborators": collaborators}
-                        )
-            repo_has_next_page = data["organization"]["repositories"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["repositories"]["pageInfo"]["endCursor"]
-
-        return active_repos_and_outside_collaborators
+                        collaborator_cursors[repo["name"]] = repo["collaborators"]["pageInfo"]["endCursor"]
+                        collaborators_by_repo[repo["name"]] = collaborators
+                if collaborator_cursors:
+                    follow_ups.append(asyncio.create_task(self.__page_repository_collaborators(
+                        session, semaphore, "OUTSIDE", collaborator_cursors, collaborators_by_repo)))
+            await asyncio.gather(*follow_ups)
+        finally:
+            for follow_up in follow_ups:
+                follow_up.cancel()
+            await asyncio.gather(*follow_ups, return_exceptions=True)
+
+        return [repo for repo in active_repos_and_outside_collaborators if repo["outside_collaborators"]]
+
+    async def __page_repository_collaborators(self, session: AsyncClientSession, semaphore: asyncio.Semaphore,
+                                              affiliation: str, collaborator_cursors: dict[str, str | None],
+                                              collaborators_by_repo: dict[str, list[str]]) -> None:
+        """Appends the logins of the collaborators of each repo after its cursor to its list, reading
+        GITHUB_GQL_REPOSITORY_BATCH_SIZE repos per aliased query and paging on only the repos with more left.
+        Repos that no longer exist are left as they are.
+        """
+        while collaborator_cursors:
+            batch = list(collaborator_cursors.items())[:self.GITHUB_GQL_REPOSITORY_BATCH_SIZE]
+            variable_values = {"organisation_name": self.organisation_name}
+            for index, (repo_name, cursor) in enumerate(batch):
+                variable_values[f"repo{index}"] = repo_name
+                variable_values[f"cursor{index}"] = cursor
+            async with semaphore:
+                try:
+                    data = await session.execute(
+                        _build_repository_collaborators_query(len(batch), affiliation), variable_values=variable_values)
+                except TransportQueryError as error:
+                    if not error.data or any((entry or {}).get("type") != "NOT_FOUND" for entry in error.errors or []):
+                        raise
+                    data = error.data
+
+            for index, (repo_name, _) in enumerate(batch):
+                collaborators = (data.get(f"repo{index}") or {}).get("collaborators")
+                if collaborators is None:
+                    del collaborator_cursors[repo_name]
+                    continue
+                collaborators_by_repo[repo_name] += [edge["node"]["login"] for edge in collaborators["edges"]]
+                if collaborators["pageInfo"]["hasNextPage"]:
+                    collaborator_cursors[repo_name] = collaborators["pageInfo"]["endCursor"]
+                else:
+                    del collaborator_cursors[repo_name]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
-    def fetch_all_repositories_in_org(self) -> list[dict[str, Any]]:
-        """A wrapper function to run a GraphQL query to get the list of repositories in the organisation
-        Returns:
-            list: A list of the organisation repos names
+    def __count_repository_search(self, search_query: str) -> int:
+        data = self.github_client_gql_api.execute(
+            GITHUB_GRAPHQL_QUERIES["repository_search_count"], variable_values={"the_query": search_query})
+        return data["search"]["repositoryCount"]
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def plan_repository_search_shards(self, search_query: str) -> list[str]:
         """
-        repos = []
+        Splits a repository search into shards by created: date range until each shard matches no more
+        repositories than GitHub returns for one search, so paging every shard returns every match.
 
-        # Specifically switch off logging for this query as it is very large and doesn't need to be logged
-        logging.disabled = True
+        A single day with more matches than the cap cannot be split further and is logged.
+        """
+        if self.__count_repository_search(search_query) <= self.GITHUB_SEARCH_RESULT_CAP:
+            return [search_query]
+
+        shards = []
+        date_ranges: list[tuple[date, date | None]] = [(self.GITHUB_FIRST_REPOSITORY_DATE, None)]
+        while date_ranges:
+            start, end = date_ranges.pop()
+            shard = f"{search_query} created:{start.isoformat()}..{end.isoformat() if end else '*'}"
+            count = self.__count_repository_search(shard)
+            if count == 0:
+                continue
+            last_day = end or date.today()
+            if count <= self.GITHUB_SEARCH_RESULT_CAP or start >= last_day:
+                if count > self.GITHUB_SEARCH_RESULT_CAP:
+                    logging.warning(
+                        f"Search {shard} matches {count} repositories, only the first {self.GITHUB_SEARCH_RESULT_CAP} are returned")
+                shards.append(shard)
+                continue
+            middle = start + (last_day - start) / 2
+            date_ranges += [(middle + timedelta(days=1), end), (start, middle)]
 
-        for repo_type in ["public", "private", "internal"]:
-            after_cursor = None
-            has_next_page = True
-            while has_next_page:
-                data = self.get_paginated_list_of_repositories_per_type(
-                    repo_type, after_cursor)
+        logging.info(f"Split search {search_query} into {len(shards)} shards")
+        return shards
 
-                if data["search"]["repos"] is not None:
-                    for repo in data["search"]["repos"]:
-                        if repo["repo"]["isDisabled"] or repo["repo"]["isLocked"]:
-                            continue
-                        repos.append(repo["repo"])
+    def __stream_repository_searches(self, query: DocumentNode, search_queries: list[str]) -> Iterator[dict[str, Any]]:
+        shards = [
+            (search_query, shard)
+            for search_query in search_queries for shard in self.plan_repository_search_shards(search_query)
+        ]
+        searches = [
+            (query, ["search"], {"the_query": shard, "page_size": self.GITHUB_GQL_DEFAULT_PAGE_SIZE})
+            for _, shard in shards
+        ]
+        connections = self.github_graphql_paginator.iterate_connections_concurrently(
+            searches, max_concurrency=self.GITHUB_SEARCH_MAX_CONCURRENT_SHARDS, page_size_variable=None)
+        seen = set()
+        with closing(connections):
+            for index, connection in connections:
+                for repo in connection["repos"] or []:
+                    if not repo["repo"]:
+                        continue
+                    # A repository created while the shards were planned can match two shards of a search
+                    key = (shards[index][0], repo["repo"]["name"])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield repo["repo"]
 
-                has_next_page = data["search"]["pageInfo"]["hasNextPage"]
-                after_cursor = data["search"]["pageInfo"]["endCursor"]
+    def stream_all_repositories_in_org(self) -> Iterator[dict[str, Any]]:
+        """
+        Yields the repositories of the organisation that are neither disabled nor locked as the pages
+        of the public, private and internal repository searches arrive.
 
-        # Re-enable logging
-        logging.disabled = False
-        return repos
+        Each search is sharded to get past the cap on search results and the shards are paged
+        concurrently over one session, so the caller can process each repository while the next
+        pages are being fetched.
+        """
+        logging.info(f"Streaming all repositories in organisation {self.organisation_name}")
+        search_queries = [
+            f"org:{self.organisation_name}, archived:false, is:{repo_type}"
+            for repo_type in ["public", "private", "internal"]
+        ]
+        for repo in self.__stream_repository_searches(GITHUB_GRAPHQL_QUERIES["repository_search"], search_queries):
+            if repo["isDisabled"] or repo["isLocked"]:
+                continue
+            yield repo
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    def stream_repositories_per_topic(self, topic: str) -> Iterator[dict[str, Any]]:
+        """Yields every unarchived repository of the organisation with the topic, see stream_all_repositories_in_org."""
+        logging.info(f"Streaming repositories with topic {topic} in organisation {self.organisation_name}")
+        yield from self.__stream_repository_searches(
+            GITHUB_GRAPHQL_QUERIES["repository_topic_search"],
+            [f"org:{self.organisation_name}, archived:false, topic:{topic}"])
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def fetch_all_repositories_in_org(self) -> list[dict[str, Any]]:
+        """A wrapper function to run a GraphQL query to get the list of repositories in the organisation
+        Returns:
+            list: A list of the organisation repos names
+        """
+        return list(self.stream_all_repositories_in_org())
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_team_user_names(self, team_name: str, after_cursor: str | None,
                                               page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
 
@@ -588,25 +757,7 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-        query($organisation_name: String!, $team_name: String!, $page_size: Int!, $after_cursor: String) {
-            organization(login: $organisation_name) {
-                team(slug: $team_name) {
-                    members(first: $page_size, after: $after_cursor) {
-                        edges {
-                            node {
-                                login
-                            }
-                        }
-                        pageInfo {
-                            hasNextPage
-                            endCursor
-                        }
-                    }
-                }
-            }
-        }
-        """), variable_values={
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["team_user_names"], variable_values={
             "organisation_name": self.organisation_name,
             "team_name": team_name,
             "page_size": page_size,
@@ -615,17 +766,62 @@ class GithubService:
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_repository_direct_users(self, repository_name: str) -> list:
-        users = self.github_client_core_api.get_repo(
-            f"{self.organisation_name}/{repository_name}").get_collaborators("direct") or []
+        users = self._get_repository(repository_name).get_collaborators("direct") or []
         return [member.login.lower() for member in users]
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_repository_collaborators(self, repository_name: str) -> list:
-        users = self.github_client_core_api.get_repo(
-            f"{self.organisation_name}/{repository_name}").get_collaborators("outside") or []
+        users = self._get_repository(repository_name).get_collaborators("outside") or []
         return [member.login.lower() for member in users]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def get_repositories_direct_users(self, repository_names: list[str]) -> dict[str, list[str]]:
+        """A bulk version of get_repository_direct_users, see get_repositories_collaborators_by_affiliation."""
+        return self.get_repositories_collaborators_by_affiliation(repository_names, "DIRECT")
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def get_repositories_collaborators(self, repository_names: list[str]) -> dict[str, list[str]]:
+        """A bulk version of get_repository_collaborators, see get_repositories_collaborators_by_affiliation."""
+        return self.get_repositories_collaborators_by_affiliation(repository_names, "OUTSIDE")
+
+    def get_repositories_collaborators_by_affiliation(self, repository_names: list[str],
+                                                      affiliation: str) -> dict[str, list[str]]:
+        """
+        Maps each repository to the lowercased logins of its collaborators of the given affiliation,
+        DIRECT or OUTSIDE.
+
+        The collaborators are read with aliased GraphQL queries covering GITHUB_GQL_REPOSITORY_BATCH_SIZE
+        repositories at a time, with at most GITHUB_GQL_MAX_CONCURRENT_BATCHES queries in flight over one
+        session. Repositories that do not exist are mapped to no collaborators.
+        """
+        logging.info(f"Getting the {affiliation.lower()} collaborators of {len(repository_names)} repositories")
+        collaborators_by_repo: dict[str, list[str]] = {repository_name: [] for repository_name in repository_names}
+        self.github_graphql_paginator.run(
+            lambda session: self.__page_collaborators_of_repositories(session, affiliation, collaborators_by_repo))
+        return {
+            repository_name: [login.lower() for login in logins]
+            for repository_name, logins in collaborators_by_repo.items()
+        }
+
+    async def __page_collaborators_of_repositories(self, session: AsyncClientSession, affiliation: str,
+                                                   collaborators_by_repo: dict[str, list[str]]) -> None:
+        semaphore = asyncio.Semaphore(self.GITHUB_GQL_MAX_CONCURRENT_BATCHES)
+        repository_names = list(collaborators_by_repo)
+        batches = [
+            asyncio.create_task(self.__page_repository_collaborators(
+                session, semaphore, affiliation,
+                dict.fromkeys(repository_names[start:start + self.GITHUB_GQL_REPOSITORY_BATCH_SIZE]),
+                collaborators_by_repo))
+            for start in range(0, len(repository_names), self.GITHUB_GQL_REPOSITORY_BATCH_SIZE)
+        ]
+        try:
+            await asyncio.gather(*batches)
+        finally:
+            for batch in batches:
+                batch.cancel()
+            await asyncio.gather(*batches, return_exceptions=True)
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_repositories_per_topic(self, topic: str, after_cursor: str | None,
                                                      page_size: int = GITHUB_GQL_DEFAULT_PAGE_SIZE) -> dict[str, Any]:
         """
@@ -654,66 +850,72 @@ class GithubService:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
         the_query = f"org:{self.organisation_name}, archived:false, topic:{topic}"
-        query = gql("""
-            query($page_size: Int!, $after_cursor: String, $the_query: String!) {
-                search(
-                    type: REPOSITORY
-                    query: $the_query
-                    first: $page_size
-                    after: $after_cursor
-                ) {
-                repos: edges {
-                    repo: node {
-                        ... on Repository {
-                                name
-                                isDisabled
-                                isLocked
-                                hasIssuesEnabled
-                                repositoryTopics(first: 10) {
-                                    edges {
-                                        node {
-                                            topic {
-                                                name
-                                            }
-                                        }
-                                    }
-                                }
-                                collaborators(affiliation: DIRECT) {
-                                    totalCount
-                                }
-                            }
-                        }
-                    }
-                    pageInfo {
-                        hasNextPage
-                        endCursor
-                    }
-                }
-            }
-        """)
+        query = GITHUB_GRAPHQL_QUERIES["repository_topic_search"]
         variable_values = {"the_query": the_query, "page_size": page_size,
                            "after_cursor": after_cursor}
         return self.github_client_gql_api.execute(query, variable_values)
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_user_org_email_address(self, user_name) -> str | None:
-        data = self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $user_name: String!) {
-                user(login: $user_name) {
-                    organizationVerifiedDomainEmails(login: $organisation_name)
-                }
-            }
-        """), variable_values={"organisation_name": self.organisation_name, "user_name": user_name})
+        data = self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["user_org_email"], variable_values={
+            "organisation_name": self.organisation_name, "user_name": user_name})
 
         if data["user"]["organizationVerifiedDomainEmails"]:
             return data["user"]["organizationVerifiedDomainEmails"][0]
         return None
 
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def get_user_org_email_addresses(self, user_names: list[str],
+                                     batch_size: int = GITHUB_GQL_USER_BATCH_SIZE) -> dict[str, str | None]:
+        """Looks up the organisation verified email of many users, up to batch_size users per aliased query.
+
+        The batch size shrinks when GitHub charges more than one rate limit point for a query or fails to
+        answer it in time. Logins that do not resolve to a user map to None like users without an email.
+        """
+        logging.info(f"Getting the org email addresses of {len(user_names)} users")
+        emails: dict[str, str | None] = {}
+        remaining_user_names = list(dict.fromkeys(user_names))
+
+        while remaining_user_names:
+            batch = remaining_user_names[:batch_size]
+            variable_values = {f"user{index}": user_name for index, user_name in enumerate(batch)}
+            try:
+                data = self.github_client_gql_api.execute(
+                    _build_user_org_emails_query(len(batch)),
+                    variable_values={"organisation_name": self.organisation_name, **variable_values})
+            except TransportQueryError as error:
+                if error.data and all((entry or {}).get("type") == "NOT_FOUND" for entry in error.errors or []):
+                    data = error.data
+                elif len(batch) > 1:
+                    batch_size = len(batch) // 2
+                    logging.warning(f"Query for {len(batch)} users failed, retrying {batch_size} at a time: {error}")
+                    continue
+                else:
+                    raise
+            except TransportServerError as error:
+                # A 502 or 504 means the query timed out, anything else is left to the rate limit retry
+                if (error.code or 0) < 500 or len(batch) == 1:
+                    raise
+                batch_size = len(batch) // 2
+                logging.warning(f"Query for {len(batch)} users timed out, retrying {batch_size} at a time")
+                continue
+
+            for index, user_name in enumerate(batch):
+                user = data.get(f"user{index}") or {}
+                user_emails = user.get("organizationVerifiedDomainEmails") or []
+                emails[user_name] = user_emails[0] if user_emails else None
+            remaining_user_names = remaining_user_names[len(batch):]
+
+            cost = (data.get("rateLimit") or {}).get("cost", 1)
+            if cost > 1:
+                batch_size = max(len(batch) // cost, 1)
+
+        return emails
+
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_org_members_login_names(self) -> list[str]:
         logging.info("Getting Org Members Login Names")
-        members = self.github_client_core_api.get_organization(
-            self.organisation_name).get_members() or []
+        members = self._get_organization().get_members() or []
         return [member.login.lower() for member in members]
 
     def enterprise_audit_activity_for_user(self, username: str):
@@ -757,9 +959,53 @@ class GithubService:
             return datetime.fromtimestamp(audit_activity[0]["@timestamp"] / 1000.0)
         return None
 
+    def stream_enterprise_audit_log(self, phrase: str) -> Iterator[dict]:
+        """
+        Yields the enterprise audit log events matching the search phrase, a page of 100 at a time,
+        following the after cursor of the next link GitHub returns with each page.
+        """
+        response_okay = 200
+        url = f"https://api.github.com/enterprises/{self.enterprise_name}/audit-log"
+        params = {"phrase": phrase, "per_page": 100}
+        while url:
+            response = self.github_client_rest_api.get(url, params=params, timeout=10)
+            if response.status_code != response_okay:
+                raise ValueError(
+                    f"Failed to get enterprise audit log events for {phrase}. Response status code: {response.status_code}")
+            yield from response.json()
+            # The next link already carries the phrase, page size and cursor
+            url, params = response.links.get("next", {}).get("url"), None
+
+    def get_last_audit_log_activity_dates(self, since_date: datetime) -> dict[str, datetime]:
+        """
+        Scans the enterprise audit log once from since_date and returns the last activity date of each
+        lowercased actor seen in it.
+        """
+        logging.info(f"Scanning the enterprise audit log for activity since {since_date}")
+        last_activity_dates: dict[str, datetime] = {}
+        for event in self.stream_enterprise_audit_log(f"created:>={since_date.strftime('%Y-%m-%d')}"):
+            if not event.get("actor"):
+                continue
+            actor = event["actor"].lower()
+            active_date = datetime.fromtimestamp(event["@timestamp"] / 1000.0)
+            if active_date > last_activity_dates.get(actor, datetime.min):
+                last_activity_dates[actor] = active_date
+        return last_activity_dates
+
     @retries_github_rate_limit_exception_at_next_reset_once
     def check_dormant_users_audit_activity_since_date(self, users: list, since_date: datetime) -> list:
-        return [user for user in users if self.is_user_dormant_since_date(user, since_date)]
+        if len(users) < self.GITHUB_AUDIT_LOG_BULK_SCAN_MIN_USERS:
+            return [user for user in users if self.is_user_dormant_since_date(user, since_date)]
+
+        # For many users one scan of the whole window is cheaper than a search per user
+        last_activity_dates = self.get_last_audit_log_activity_dates(since_date)
+        dormant_users = []
+        for user in users:
+            last_active_date = last_activity_dates.get(user.lower())
+            if last_active_date is None or last_active_date < since_date:
+                logging.info(f"User {user} has no audit activity since {since_date}, adding to dormant users list")
+                dormant_users.append(user)
+        return dormant_users
 
     def is_user_dormant_since_date(self, user: str, since_date: datetime) -> bool:
         audit_activity = self.enterprise_audit_activity_for_user(user)
@@ -779,8 +1025,7 @@ class GithubService:
     @retries_github_rate_limit_exception_at_next_reset_once
     def remove_user_from_gitub(self, user: str):
         github_user = self.github_client_core_api.get_user(user)
-        self.github_client_core_api.get_organization(
-            self.organisation_name).remove_from_membership(github_user)
+        self._get_organization().remove_from_membership(github_user)
 
     def get_inactive_users(self, team_name: str, users_to_ignore, repositories_to_ignore: list[str],
                            inactivity_months: int) -> list[NamedUser.NamedUser]:
@@ -811,9 +1056,11 @@ class GithubService:
 
     def _identify_inactive_users(self, users: list[NamedUser.NamedUser], repositories: list[Repository],
                                  inactivity_months: int) -> list[NamedUser.NamedUser]:
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=inactivity_months * 30)
+        last_commit_index = self.build_last_commit_index([repo.name for repo in repositories], cutoff_date)
         users_to_remove = []
         for user in users:
-            if self._is_user_inactive(user, repositories, inactivity_months):
+            if self._is_user_inactive(user, repositories, inactivity_months, last_commit_index):
                 logging.info(
                     f"User {user.login} is inactive for {inactivity_months} months")
                 users_to_remove.append(user)
@@ -829,8 +1076,56 @@ class GithubService:
         repositories = self.__get_repositories_from_team(team_id)
         return [repo for repo in repositories if repo.name.lower() not in repositories_to_ignore]
 
+    @staticmethod
+    def __as_utc(date_time: datetime) -> datetime:
+        return date_time.replace(tzinfo=timezone.utc) if date_time.tzinfo is None else date_time
+
+    @retries_github_rate_limit_exception_at_next_reset_once
+    def __get_last_commit_dates_by_author(self, repo_name: str, since: datetime) -> dict[str, datetime]:
+        last_commit_dates = {}
+        try:
+            repository = self.github_client_core_api.get_repo(f"{self.organisation_name}/{repo_name}", lazy=True)
+            for commit in repository.get_commits(since=since):
+                if commit.author is None or not commit.author.login:
+                    continue
+                commit_date = self.__as_utc(commit.commit.author.date)
+                if commit_date > last_commit_dates.get(commit.author.login, since):
+                    last_commit_dates[commit.author.login] = commit_date
+        except GithubException as exception:
+            # GitHub answers 409 Conflict for the commits of a repository with no commits at all
+            if exception.status != 409:
+                logging.error(f"An exception occurred while getting commits in repo {repo_name}")
+                raise
+            logging.info(f"Repo {repo_name} is empty")
+        return last_commit_dates
+
+    def build_last_commit_index(self, repository_names: list[str], since: datetime) -> dict[str, datetime]:
+        """
+        Maps the login of every author who committed to any of the repositories since the given date to the
+        date of their latest commit. Each repository's history is read once, back to the since date, so the
+        activity of any number of users can then be looked up without further requests.
+
+        The histories are read by GITHUB_MAX_CONCURRENT_READS threads, each building the repositories it reads
+        lazily on its own client, so only their commits are requested. A history that cannot be read fails the whole index, as leaving it out would
+        report its authors as inactive; empty repositories simply have no commits.
+        """
+        since = self.__as_utc(since)
+        last_commit_index: dict[str, datetime] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.GITHUB_MAX_CONCURRENT_READS) as executor:
+            for last_commit_dates in executor.map(
+                    lambda repo_name: self.__get_last_commit_dates_by_author(repo_name, since), repository_names):
+                for login, commit_date in last_commit_dates.items():
+                    if commit_date > last_commit_index.get(login, since):
+                        last_commit_index[login] = commit_date
+        return last_commit_index
+
     def _is_user_inactive(self, user: NamedUser.NamedUser, repositories: list[Repository],
-                          inactivity_months: int) -> bool:
+                          inactivity_months: int, last_commit_index: dict[str, datetime] | None = None) -> bool:
+        if last_commit_index is not None:
+            last_commit_date = last_commit_index.get(user.login)
+            return last_commit_date is None or \
+                last_commit_date <= datetime.now(timezone.utc) - timedelta(days=inactivity_months * 30)
+
         cutoff_date = datetime.now() - timedelta(days=inactivity_months *
                                                  30)  # Roughly calculate the cutoff date
 
@@ -855,7 +1150,7 @@ class GithubService:
 
         return True  # User is inactive in all given repositories
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def _get_paginated_organization_members_with_emails(self, after_cursor: str | None,
                                                         page_size: int = GITHUB_GQL_MAX_PAGE_SIZE) -> dict[str, Any]:
         logging.info(
@@ -865,22 +1160,7 @@ class GithubService:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
 
-        query = gql("""
-            query($org: String!, $page_size: Int!, $after_cursor: String) {
-                organization(login: $org) {
-                    membersWithRole(first: $page_size, after: $after_cursor) {
-                        nodes {
-                            login
-                            organizationVerifiedDomainEmails(login: $org)
-                        }
-                        pageInfo {
-                            hasNextPage
-                            endCursor
-                        }
-                    }
-                }
-            }
-        """)
+        query = GITHUB_GRAPHQL_QUERIES["organization_members_with_emails"]
 
         variable_values = {
             "org": self.organisation_name,
@@ -937,18 +1217,19 @@ class GithubService:
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def update_team_repository_permission(self, team_name: str, repositories, permission: str):
-        org = self.github_client_core_api.get_organization(
-            self.organisation_name)
+        org = self._get_organization()
 
         try:
-            team = org.get_team_by_slug(team_name)
+            team = self.github_object_cache.get(("team_slug", team_name), lambda: org.get_team_by_slug(team_name))
         except UnknownObjectException as exc:
             raise ValueError(
                 f"Team '{team_name}' does not exist in organization '{self.organisation_name}'") from exc
 
         for repo_name in repositories:
             try:
-                repo = org.get_repo(repo_name)
+                repo = self.github_object_cache.get(
+                    ("repository", f"{self.organisation_name}/{repo_name}"),
+                    lambda repo_name=repo_name: org.get_repo(repo_name))
             except UnknownObjectException as exc:
                 raise ValueError(
                     f"Repository '{repo_name}' does not exist in organization '{self.organisation_name}'") from exc
@@ -972,117 +1253,91 @@ class GithubService:
 
         return list_of_changes_to_flag
 
-    @retries_github_rate_limit_exception_at_next_reset_once
-    def audit_log_member_changes(self, since_date: str) -> list:
-        logging.info(f"Getting audit log entries since {since_date}")
-        today = datetime.now()
-        query = """
-            query($organisation_name: String!, $since_date: String!, $cursor: String) {
-                organization(login: $organisation_name) {
-                    auditLog(
-                        first: 100
-                        after: $cursor
-                        query: $since_date
-                    ) {
-                        edges{
-                            node{
-                                ... on OrgAddMemberAuditEntry {
-                                    action
-                                    createdAt
-                                    actorLogin
-                                    operationType
-                                    permission
-                                    userLogin
-                                }
-                                ... on OrgUpdateMemberAuditEntry {
-                                    action
-                                    createdAt
-                                    actorLogin
-                                    operationType
-                                    permission
-                                    permissionWas
-                                    userLogin
-                                }
-                            }
-                        }
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                    }
-                }
-            }
-        """
-        variable_values = {
-            "organisation_name": self.organisation_name,
-            "since_date": f"action:org.add_member  action:org.update_member  created:{since_date}..{today.strftime('%Y-%m-%d')}",
-            "cursor": None
-        }
+    def __get_audit_log_query_string(self, since_date: str) -> str:
+        actions = " ".join(f"action:{action}" for action in self.AUDIT_LOG_SYNCED_ACTIONS)
+        return f"{actions} created:>={since_date}"
 
-        all_entries = []
-        while True:
-            data = self.github_client_gql_api.execute(
-                gql(query), variable_values=variable_values)
-            all_entries.extend(
-                [entry["node"] for entry in data["organization"]["auditLog"]["edges"] if entry["node"]])
+    def __sync_audit_log_pages(self, covered_since: str, query_string: str, end_cursor: str | None) -> int:
+        new_entries = 0
+        connections = self.github_graphql_paginator.iterate_connections(
+            GITHUB_GRAPHQL_QUERIES["audit_log_sync"], ["organization", "auditLog"],
+            {"organisation_name": self.organisation_name, "query_string": query_string},
+            cursor_variable="cursor", page_size_variable=None, start_cursor=end_cursor
+        )
+        with closing(connections):
+            for connection in connections:
+                new_entries += self.audit_log_store.save_page(
+                    self.organisation_name, GithubGraphQLPaginator.get_nodes(connection), covered_since,
+                    query_string, connection["pageInfo"]["endCursor"])
+        return new_entries
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def sync_audit_log(self, since_date: str) -> int:
+        """
+        Brings the audit log store up to date with the member changes of the organisation and returns
+        the number of new entries stored.
 
-            if data["organization"]["auditLog"]["pageInfo"]["hasNextPage"]:
-                variable_values["cursor"] = data["organization"]["auditLog"]["pageInfo"]["endCursor"]
-            else:
-                break
+        The first sync, and any sync from a date earlier than the store covers, searches the audit log
+        from since_date. Later syncs resume after the cursor the previous one ended on, so only entries
+        logged since then are fetched.
+        """
+        state = self.audit_log_store.get_sync_state(self.organisation_name)
+        if state is None or since_date < state["covered_since"]:
+            logging.info(f"Syncing audit log entries since {since_date}")
+            return self.__sync_audit_log_pages(since_date, self.__get_audit_log_query_string(since_date), None)
 
-        return all_entries
+        logging.info(f"Syncing audit log entries logged after {state['last_created_at']}")
+        try:
+            return self.__sync_audit_log_pages(state["covered_since"], state["query_string"], state["end_cursor"])
+        except TransportQueryError as error:
+            # An expired cursor is rejected, search again from the day of the last stored entry instead
+            resume_date = (state["last_created_at"] or state["covered_since"])[:10]
+            logging.warning(f"Could not resume the audit log sync, searching again since {resume_date}: {error}")
+            return self.__sync_audit_log_pages(
+                state["covered_since"], self.__get_audit_log_query_string(resume_date), None)
+
+    def __get_stored_audit_log_entries(self, actions: list[str], since_date: str, fields: list[str],
+                                       actor: str | None = None) -> list:
+        self.sync_audit_log(since_date)
+        entries = self.audit_log_store.get_entries(
+            self.organisation_name, actions, since_date, datetime.now().strftime('%Y-%m-%d'), actor)
+        return [{field: entry[field] for field in fields if field in entry} for entry in entries]
+
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
+    def audit_log_member_changes(self, since_date: str) -> list:
+        logging.info(f"Getting audit log entries since {since_date}")
+        if self.audit_log_store:
+            return self.__get_stored_audit_log_entries(
+                ["org.add_member", "org.update_member"], since_date,
+                ["action", "createdAt", "actorLogin", "operationType", "permission", "permissionWas", "userLogin"])
+        today = datetime.now()
+        entries = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["audit_log_member_changes"], ["organization", "auditLog"],
+            {
+                "organisation_name": self.organisation_name,
+                "since_date": f"action:org.add_member  action:org.update_member  created:{since_date}..{today.strftime('%Y-%m-%d')}"
+            },
+            cursor_variable="cursor", page_size_variable=None
+        )
+        return [entry for entry in entries if entry]
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def check_for_audit_log_new_members(self, since_date: str) -> list:
         logging.info(
             f"Getting audit log entries for new members since {since_date}")
+        if self.audit_log_store:
+            return self.__get_stored_audit_log_entries(
+                ["org.add_member"], since_date, ["action", "createdAt", "actorLogin", "userLogin"])
         today = datetime.now()
-        query = """
-            query($organisation_name: String!, $since_date: String!, $cursor: String) {
-                organization(login: $organisation_name) {
-                    auditLog(
-                        first: 100
-                        after: $cursor
-                        query: $since_date
-                    ) {
-                        edges{
-                            node{
-                                ... on OrgAddMemberAuditEntry {
-                                    action
-                                    createdAt
-                                    actorLogin
-                                    userLogin
-                                }
-                            }
-                        }
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                    }
-                }
-            }
-        """
-        variable_values = {
-            "organisation_name": self.organisation_name,
-            "since_date": f"action:org.add_member created:{since_date}..{today.strftime('%Y-%m-%d')}",
-            "cursor": None
-        }
-
-        new_members = []
-        while True:
-            data = self.github_client_gql_api.execute(
-                gql(query), variable_values=variable_values)
-            new_members.extend(
-                [entry["node"] for entry in data["organization"]["auditLog"]["edges"] if entry["node"]])
-
-            if data["organization"]["auditLog"]["pageInfo"]["hasNextPage"]:
-                variable_values["cursor"] = data["organization"]["auditLog"]["pageInfo"]["endCursor"]
-            else:
-                break
-
-        return new_members
+        entries = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["audit_log_new_members"], ["organization", "auditLog"],
+            {
+                "organisation_name": self.organisation_name,
+                "since_date": f"action:org.add_member created:{since_date}..{today.strftime('%Y-%m-%d')}"
+            },
+            cursor_variable="cursor", page_size_variable=None
+        )
+        return [entry for entry in entries if entry]
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_all_organisations_in_enterprise(self) -> list[Organization]:
@@ -1106,18 +1361,26 @@ class GithubService:
 
         return response.json()
 
-    def get_all_private_internal_repos_names(self, org_name: str):
-
-        logging.info(
-            f"Getting all private and internal repos used for organization {org_name}")
-        private_internal_repos = []
-        org = self.github_client_core_api.get_organization(org_name)
-        all_repos = org.get_repos(type="all")
-        private_internal_repos = [
-            repo.name for repo in all_repos if not repo.archived and repo.visibility in (
-                'internal', 'private')]
+    def get_private_internal_repository_names_by_organisation(self, organisations: list[str]) -> dict[str, list[str]]:
+        """Maps each organisation to the names of its unarchived private and internal repositories, paging the
+        repositories of the organisations concurrently over one GraphQL session."""
+        logging.info(f"Getting all private and internal repos used for organizations {organisations}")
+        repository_names: dict[str, list[str]] = {organisation: [] for organisation in organisations}
+        connections = self.github_graphql_paginator.iterate_connections_concurrently([
+            (GITHUB_GRAPHQL_QUERIES["unarchived_repository_visibilities"], ["organization", "repositories"],
+             {"organisation_name": organisation})
+            for organisation in organisations
+        ], max_concurrency=self.GITHUB_MAX_CONCURRENT_ORGANISATIONS)
+        with closing(connections):
+            for index, connection in connections:
+                repository_names[organisations[index]] += [
+                    repository["name"] for repository in self.github_graphql_paginator.get_nodes(connection)
+                    if repository["visibility"] in ("INTERNAL", "PRIVATE")
+                ]
+        return repository_names
 
-        return private_internal_repos
+    def get_all_private_internal_repos_names(self, org_name: str):
+        return self.get_private_internal_repository_names_by_organisation([org_name])[org_name]
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_current_month_gha_minutes_for_enterprise(self, month) -> int:
@@ -1146,6 +1409,37 @@ class GithubService:
 
         raise ValueError("Failed to retrieve valid usage data after multiple attempts.")
 
+    @retries_github_rate_limit_exception_at_next_reset_once
+    def get_gha_usage_items(self, usage_date: date, hour: int | None = None) -> list[dict[str, Any]]:
+        """The usage items of the enterprise billing usage report of a day, or of one hour of it."""
+        params = {"year": usage_date.year, "month": usage_date.month, "day": usage_date.day}
+        if hour is not None:
+            params["hour"] = hour
+        response = self.github_client_rest_api.get(
+            f"https://api.github.com/enterprises/{self.enterprise_name}/settings/billing/usage",
+            params=params,
+            headers={"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+        )
+        if response.status_code != 200:
+            raise ValueError(
+                f"Failed to get the usage report of {usage_date} hour {hour}. Response status code: {response.status_code}")
+        return response.json().get("usageItems") or []
+
+    def sync_gha_usage_ledger(self) -> int:
+        """
+        Ingests the days of the current month that the GHA usage ledger has not settled yet and returns how
+        many were fetched.
+
+        Usage is reported late, so a day is fetched again on every run, replacing its minutes, until it has
+        been ingested GHA_USAGE_SETTLE_DAYS after it ended. A day without usage is recorded as ingested.
+        """
+        days = self.gha_usage_ledger.get_unsettled_days(
+            self.enterprise_name, datetime.now(timezone.utc), timedelta(days=self.GHA_USAGE_SETTLE_DAYS))
+        logging.info(f"Ingesting {len(days)} days of GHA usage for the enterprise {self.enterprise_name}")
+        for usage_date in days:
+            self.gha_usage_ledger.ingest(self.enterprise_name, usage_date, self.get_gha_usage_items(usage_date))
+        return len(days)
+
     @retries_github_rate_limit_exception_at_next_reset_once
     def modify_gha_minutes_quota_threshold(self, new_threshold):
         logging.info(f"Changing the alerting threshold to {new_threshold}%")
@@ -1162,8 +1456,7 @@ class GithubService:
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def _get_repository_variable(self, variable_name):
-        actions_variable = self.github_client_core_api.get_repo(
-            f'{self.organisation_name}/operations-engineering').get_variable(variable_name)
+        actions_variable = self._get_repository("operations-engineering").get_variable(variable_name)
         return actions_variable.value
 
     @retries_github_rate_limit_exception_at_next_reset_once
@@ -1177,28 +1470,25 @@ class GithubService:
     def calculate_total_minutes_enterprise(self):
 
         organisations = self.get_all_organisations_in_enterprise()
-        enterprise_billable_repos = []
-        for org in organisations:
-            org_repos = self.get_all_private_internal_repos_names(org)
-            enterprise_billable_repos.extend(org_repos)
+        enterprise_billable_repos = self.get_private_internal_repository_names_by_organisation(organisations)
 
         gha_minutes_total = 0.0
-        if enterprise_billable_repos:
+        if any(enterprise_billable_repos.values()):
             current_billing_month = datetime.now().month
             try:
+                if self.gha_usage_ledger:
+                    self.sync_gha_usage_ledger()
+                    return self.gha_usage_ledger.get_month_minutes(
+                        self.enterprise_name, datetime.now(timezone.utc).date().replace(day=1),
+                        enterprise_billable_repos)
                 billing_data = self.get_current_month_gha_minutes_for_enterprise(current_billing_month)
                 usage_items = billing_data.get('usageItems', [])
 
                 if not usage_items:
                     logging.warning("No usage items returned in billing data.")
                 else:
-                    gha_minutes_total = sum(
-                        item['quantity']
-                        for item in usage_items
-                        if item.get('product') == 'actions'
-                        and item.get('unitType') == 'Minutes'
-                        and item.get('repositoryName') in enterprise_billable_repos
-                    )
+                    minutes = aggregate_gha_minutes(usage_items_to_frame(usage_items), enterprise_billable_repos)
+                    gha_minutes_total = float(minutes["minutes"].sum())
             except Exception as e:
                 logging.error(f"Failed to retrieve or process billing data: {e}")
 
@@ -1245,7 +1535,7 @@ class GithubService:
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def calculate_repo_age(self, repo: str) -> list:
-        creation_date = self.github_client_core_api.get_repo(f"{self.organisation_name}/{repo}").created_at
+        creation_date = self._get_repository(repo).created_at
 
         age_in_days = (datetime.now(timezone.utc) - creation_date).days
 
@@ -1253,68 +1543,33 @@ class GithubService:
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_old_poc_repositories(self) -> list:
-        poc_repositories = [repo['repo']['name'] for repo in self.get_paginated_list_of_repositories_per_topic("poc", None)['search']['repos']]
-
         old_poc_repositories = {}
         age_threshold = 30
+        now = datetime.now(timezone.utc)
 
-        for repo in poc_repositories:
-            age = self.calculate_repo_age(repo)
+        # The topic search returns each repository's creation date, so no repository is fetched on its own
+        for repo in self.stream_repositories_per_topic("poc"):
+            age = (now - datetime.fromisoformat(repo["createdAt"])).days
             if age >= age_threshold:
-                old_poc_repositories[repo] = age
+                old_poc_repositories[repo["name"]] = age
 
         return old_poc_repositories
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_user_removal_events(self, since_date: str, actor: str) -> list:
         logging.info(f"Getting audit log entries for users removed by {actor} since {since_date}")
+        if self.audit_log_store:
+            return self.__get_stored_audit_log_entries(
+                ["org.remove_member"], since_date, ["action", "createdAt", "actorLogin", "userLogin"], actor)
         today = datetime.now()
         query_string = f"action:org.remove_member actor:{actor} created:{since_date}..{today.strftime('%Y-%m-%d')}"
 
-        query = """
-            query($organisation_name: String!, $query_string: String!, $cursor: String) {
-                organization(login: $organisation_name) {
-                    auditLog(
-                        first: 100
-                        after: $cursor
-                        query: $query_string
-                    ) {
-                        edges{
-                            node{
-                                ... on OrgRemoveMemberAuditEntry {
-                                    action
-                                    createdAt
-                                    actorLogin
-                                    userLogin
-                                }
-                            }
-                        }
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                    }
-                }
-            }
-        """
-        variable_values = {
-            "organisation_name": self.organisation_name,
-            "query_string": query_string,
-            "cursor": None
-        }
-
-        removed_users = []
-        while True:
-            data = self.github_client_gql_api.execute(
-                gql(query), variable_values=variable_values)
-            removed_users.extend(
-                [entry["node"] for entry in data["organization"]["auditLog"]["edges"] if entry["node"]])
-            if data["organization"]["auditLog"]["pageInfo"]["hasNextPage"]:
-                variable_values["cursor"] = data["organization"]["auditLog"]["pageInfo"]["endCursor"]
-            else:
-                break
-
-        return removed_users
+        entries = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["audit_log_user_removal_events"], ["organization", "auditLog"],
+            {"organisation_name": self.organisation_name, "query_string": query_string},
+            cursor_variable="cursor", page_size_variable=None
+        )
+        return [entry for entry in entries if entry]
 
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_current_contributors_for_repo(
@@ -1332,7 +1587,7 @@ class GithubService:
             {'repository': 'repo1', 'contributors': {'c1', 'c2', 'c3'}}
         Returns None if repo has 0 contributors or 0 current contributors.
         """
-        repo = self.github_client_core_api.get_repo(f"{self.organisation_name}/{repo_name}")
+        repo = self._get_repository(repo_name)
         contributors = [contributor.login for contributor in repo.get_contributors()]
         if contributors:
             current_contributors = set(current_logins).intersection(set(contributors))
@@ -1341,6 +1596,71 @@ class GithubService:
 
         return None
 
+    def __execute_allowing_not_found(self, query: DocumentNode, variable_values: dict[str, Any]) -> dict[str, Any]:
+        # Aliased lookups of things that no longer exist come back as null alongside the rest of the data
+        try:
+            return self.github_client_gql_api.execute(query, variable_values=variable_values)
+        except TransportQueryError as error:
+            if not error.data or any((entry or {}).get("type") != "NOT_FOUND" for entry in error.errors or []):
+                raise
+            return error.data
+
+    @retries_github_rate_limit_exception_at_next_reset_once
+    def build_contributor_index(self, repo_names: list[str], since: datetime | None = None) -> dict[str, set[str]]:
+        """
+        Maps each repository to the logins of the authors of the commits on its default branch,
+        optionally only the commits made since the given date.
+
+        The commit histories are read with aliased GraphQL queries covering many repositories at a time,
+        paging on only the repositories with more history left. Without a since date, repositories with
+        more than GITHUB_GQL_MAX_HISTORY_COMMITS commits are read from the REST contributors endpoint
+        instead, which lists each contributor once rather than each commit.
+        Commits whose author is not linked to a GitHub user are skipped.
+        """
+        contributor_index: dict[str, set[str]] = {repo_name: set() for repo_name in repo_names}
+        # The repositories that still have history to read, with the cursor of their next page
+        history_cursors: dict[str, str | None] = dict.fromkeys(repo_names)
+        rest_repo_names = []
+
+        while history_cursors:
+            batch = list(history_cursors.items())[:self.GITHUB_GQL_REPOSITORY_BATCH_SIZE]
+            variable_values = {"organisation_name": self.organisation_name,
+                               "since": since.isoformat() if since else None}
+            for index, (repo_name, cursor) in enumerate(batch):
+                variable_values[f"repo{index}"] = repo_name
+                variable_values[f"cursor{index}"] = cursor
+            data = self.__execute_allowing_not_found(_build_repository_histories_query(len(batch)), variable_values)
+
+            for index, (repo_name, cursor) in enumerate(batch):
+                repository = data.get(f"repo{index}") or {}
+                history = ((repository.get("defaultBranchRef") or {}).get("target") or {}).get("history")
+                if history is None:
+                    del history_cursors[repo_name]
+                    continue
+                if since is None and cursor is None and history["totalCount"] > self.GITHUB_GQL_MAX_HISTORY_COMMITS:
+                    rest_repo_names.append(repo_name)
+                    del history_cursors[repo_name]
+                    continue
+
+                contributor_index[repo_name].update(
+                    node["author"]["user"]["login"] for node in history["nodes"]
+                    if node.get("author") and node["author"].get("user")
+                )
+                if history["pageInfo"]["hasNextPage"]:
+                    history_cursors[repo_name] = history["pageInfo"]["endCursor"]
+                else:
+                    del history_cursors[repo_name]
+
+        for repo_name in rest_repo_names:
+            logging.info(f"Getting contributors of {repo_name} from the REST API as its history is too long")
+            contributor_index[repo_name] = {
+                contributor.login for contributor in
+                self._get_repository(repo_name).get_contributors()
+                if contributor.login
+            }
+
+        return contributor_index
+
     @retries_github_rate_limit_exception_at_next_reset_once
     def get_current_contributors_for_active_repos(self) -> list[dict[str, set[str]]]:
         """
@@ -1353,30 +1673,20 @@ class GithubService:
         ]
         Repos with 0 contributors or 0 current contributors are dropped.
         """
-        logins = [user.login for user in self.__get_all_users()]
+        logins = {user.login for user in self.__get_all_users()}
         active_repos = self.get_active_repositories()
         number_of_repos = len(active_repos)
         logging.info(
             f"Org: {self.organisation_name} has {len(logins)} members and {number_of_repos} active repositories"
         )
 
-        active_repos_and_current_contributors = []
-
         logging.info(f"Getting current contributors for active repos in {self.organisation_name}")
         logging.info(f"Pre getting current contributors: {self.github_client_core_api.get_rate_limit()}")
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = []
-            for repo_name in active_repos:
-                futures.append(
-                    executor.submit(
-                        self.get_current_contributors_for_repo,
-                        repo_name=repo_name,
-                        current_logins=logins
-                    )
-                )
-            for future in concurrent.futures.as_completed(futures):
-                if future.result():
-                    active_repos_and_current_contributors.append(future.result())
+        active_repos_and_current_contributors = [
+            {"repository": repo_name, "contributors": contributors & logins}
+            for repo_name, contributors in self.build_contributor_index(active_repos).items()
+            if contributors & logins
+        ]
 
         sorted_active_repos_and_current_contributors = sorted(
             active_repos_and_current_contributors,
@@ -1408,7 +1718,7 @@ class GithubService:
         since_datetime: datetime
     ) -> bool:
 
-        repo = self.github_client_core_api.get_repo(f"{self.organisation_name}/{repo_name}")
+        repo = self._get_repository(repo_name)
         commits = repo.get_commits(
                 since=since_datetime,
                 author=username.lower()
@@ -1434,7 +1744,7 @@ class GithubService:
         )
 
         for repo_name in repos:
-            repo = self.github_client_core_api.get_repo(f"{self.organisation_name}/{repo_name}")
+            repo = self._get_repository(repo_name)
             commits = repo.get_commits(
                 since=since_datetime,
                 author=username.lower()
@@ -1444,7 +1754,7 @@ class GithubService:
 
         return False
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_paginated_list_of_unlocked_unarchived_repos(
         self,
         after_cursor: str | None,
@@ -1456,26 +1766,13 @@ class GithubService:
         if page_size > self.GITHUB_GQL_MAX_PAGE_SIZE:
             raise ValueError(
                 f"Page size of {page_size} is too large. Max page size {self.GITHUB_GQL_MAX_PAGE_SIZE}")
-        return self.github_client_gql_api.execute(gql("""
-            query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
-                organization(login: $organisation_name) {
-                    repositories(first: $page_size, after: $after_cursor, isLocked: false, isArchived: false) {
-                        pageInfo {
-                            endCursor
-                            hasNextPage
-                        }
-                        nodes {
-                            name
-                            isDisabled
-                        }
-
-                    }
-                }
-            }
-        """), variable_values={"organisation_name": self.organisation_name, "page_size": page_size,
-                               "after_cursor": after_cursor})
+        return self.github_client_gql_api.execute(GITHUB_GRAPHQL_QUERIES["unlocked_unarchived_repositories"], variable_values={
+            "organisation_name": self.organisation_name,
+            "page_size": page_size,
+            "after_cursor": after_cursor
+        })
 
-    @retries_github_rate_limit_exception_at_next_reset_once
+    @retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")
     def get_active_repositories(self) -> list[str]:
         """A wrapper function to run a GraphQL query to get a list of active (not locked,
         not archived nor disabled) repositories in the organisation.
@@ -1483,20 +1780,11 @@ class GithubService:
         Returns:
             list: A list of the organisation's active repositories.
         """
-
-        repo_has_next_page = True
-        after_cursor = None
-        active_repositories = []
-        while repo_has_next_page:
-            data = self.get_paginated_list_of_unlocked_unarchived_repos(
-                after_cursor, self.GITHUB_GQL_MAX_PAGE_SIZE
-            )
-            if data["organization"]["repositories"]["nodes"] is not None:
-                for repo in data["organization"]["repositories"]["nodes"]:
-                    if repo["isDisabled"]:
-                        continue
-                    active_repositories.append(repo["name"])
-            repo_has_next_page = data["organization"]["repositories"]["pageInfo"]["hasNextPage"]
-            after_cursor = data["organization"]["repositories"]["pageInfo"]["endCursor"]
-
-        return active_repositories
+        if self.repository_inventory_store:
+            self.sync_repository_inventory()
+            return self.repository_inventory_store.get_repository_names(self.organisation_name)
+        repositories = self.github_graphql_paginator.iterate(
+            GITHUB_GRAPHQL_QUERIES["unlocked_unarchived_repositories"], ["organization", "repositories"],
+            {"organisation_name": self.organisation_name}
+        )
+        return [repo["name"] for repo in repositories if not repo["isDisabled"]]
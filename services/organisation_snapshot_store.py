@@ -0,0 +1,132 @@
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config.logging_config import logging
+from services.github_service import GithubService
+from services.outside_collaborator_index import OutsideCollaboratorIndex
+
+UTC_DATETIME = "datetime64[ns, UTC]"
+REPOSITORY_COLUMNS = {
+    "name": "string",
+    "url": "string",
+    "description": "string",
+    "is_private": "boolean",
+    "is_disabled": "boolean",
+    "is_locked": "boolean",
+    "has_issues_enabled": "boolean",
+    "pushed_at": UTC_DATETIME,
+    "default_branch": "string",
+    "license": "string",
+    "direct_collaborators": "Int64",
+    "topics": "object",
+}
+MEMBER_COLUMNS = {"username": "string", "email": "string"}
+TEAM_MEMBER_COLUMNS = {"team": "string", "username": "string"}
+OUTSIDE_COLLABORATOR_COLUMNS = {"repository": "string", "public": "boolean", "username": "string"}
+
+
+def _to_frame(rows: list[dict], columns: dict[str, str]) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=list(columns))
+    for column, dtype in columns.items():
+        if dtype == UTC_DATETIME:
+            frame[column] = pd.to_datetime(frame[column], utc=True)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def repositories_to_frame(repositories: list[dict]) -> pd.DataFrame:
+    return _to_frame([
+        {
+            "name": repository["name"],
+            "url": repository.get("url"),
+            "description": repository.get("description"),
+            "is_private": repository.get("isPrivate"),
+            "is_disabled": repository.get("isDisabled"),
+            "is_locked": repository.get("isLocked"),
+            "has_issues_enabled": repository.get("hasIssuesEnabled"),
+            "pushed_at": repository.get("pushedAt"),
+            "default_branch": (repository.get("defaultBranchRef") or {}).get("name"),
+            "license": (repository.get("licenseInfo") or {}).get("name"),
+            "direct_collaborators": (repository.get("collaborators") or {}).get("totalCount"),
+            "topics": [
+                edge["node"]["topic"]["name"] for edge in (repository.get("repositoryTopics") or {}).get("edges", [])
+            ],
+        }
+        for repository in repositories
+    ], REPOSITORY_COLUMNS)
+
+
+class OrganisationSnapshotStore:
+    """Per-run snapshots of an organisation's repositories, members, team memberships and outside
+    collaborators, stored as typed columnar tables so reports can load and filter them locally instead
+    of querying GitHub again.
+
+    Tables are written as Parquet and read back memory-mapped, loading only the columns asked for.
+    """
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(self, snapshot_dir: str) -> None:
+        self.snapshot_dir = snapshot_dir
+
+    def __path(self, organisation: str, run_id: str, table: str) -> str:
+        return os.path.join(self.snapshot_dir, organisation, run_id, f"{table}.parquet")
+
+    def list_runs(self, organisation: str) -> list[str]:
+        organisation_dir = os.path.join(self.snapshot_dir, organisation)
+        if not os.path.isdir(organisation_dir):
+            return []
+        return sorted(run for run in os.listdir(organisation_dir) if not run.endswith(self.PARTIAL_SUFFIX))
+
+    def write(self, organisation: str, run_id: str, table: str, frame: pd.DataFrame) -> str:
+        path = self.__path(organisation, run_id, table)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame.to_parquet(path, index=False)
+        return path
+
+    def read(self, organisation: str, table: str, run_id: str | None = None,
+             columns: list[str] | None = None) -> pd.DataFrame:
+        """Loads a table of the given run, or of the latest run, optionally only the given columns."""
+        if run_id is None:
+            runs = self.list_runs(organisation)
+            if not runs:
+                raise ValueError(f"There are no snapshots of organisation {organisation}")
+            run_id = runs[-1]
+        path = self.__path(organisation, run_id, table)
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+
+    def read_outside_collaborator_index(self, organisation: str, run_id: str | None = None) -> OutsideCollaboratorIndex:
+        """Loads the outside collaborators of the given run, or of the latest run, into an index."""
+        return OutsideCollaboratorIndex.from_rows(
+            self.read(organisation, "outside_collaborators", run_id).to_dict("records"))
+
+    def snapshot_organisation(self, github_service: GithubService, run_id: str | None = None) -> str:
+        """Fetches the organisation's data through the GithubService, writes each table for the run and
+        returns the run id, a UTC timestamp unless one is given."""
+        organisation = github_service.organisation_name
+        run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        logging.info(f"Taking snapshot {run_id} of organisation {organisation}")
+
+        # Tables are written to a partial run first so a failed snapshot is never read as the latest one
+        partial_run_id = run_id + self.PARTIAL_SUFFIX
+        self.write(organisation, partial_run_id, "repositories",
+                   repositories_to_frame(list(github_service.stream_all_repositories_in_org())))
+        self.write(organisation, partial_run_id, "members",
+                   _to_frame(github_service.get_github_member_list(), MEMBER_COLUMNS))
+        self.write(organisation, partial_run_id, "team_members", _to_frame([
+            {"team": team, "username": username}
+            for team in github_service.get_team_names()
+            for username in github_service.get_team_user_names(team)
+        ], TEAM_MEMBER_COLUMNS))
+        self.write(organisation, partial_run_id, "outside_collaborators", _to_frame(
+            OutsideCollaboratorIndex.from_active_repos(
+                github_service.get_active_repos_and_outside_collaborators()).to_rows(),
+            OUTSIDE_COLLABORATOR_COLUMNS))
+        run_dir = os.path.join(self.snapshot_dir, organisation, run_id)
+        # A run taken again with the same id replaces the earlier one, which os.replace cannot do for a directory
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.replace(os.path.join(self.snapshot_dir, organisation, partial_run_id), run_dir)
+        return run_id
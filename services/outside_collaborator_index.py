@@ -0,0 +1,125 @@
+from array import array
+from typing import Any
+
+
+class OutsideCollaboratorIndex:
+    """An in memory index of which outside collaborators can reach which active repositories, built in one
+    pass over the output of GithubService.get_active_repos_and_outside_collaborators.
+
+    Logins and repository names are stored once each and referred to by integer ids, the repositories of a
+    collaborator as a set of ids and the counts of public and private repositories per collaborator as
+    arrays, so lookups in either direction and access checks take constant time however many pairs there are.
+    """
+
+    def __init__(self) -> None:
+        self.__logins: list[str] = []
+        self.__login_ids: dict[str, int] = {}
+        self.__repository_names: list[str] = []
+        self.__repository_ids: dict[str, int] = {}
+        self.__repository_public = bytearray()
+        self.__repositories_by_collaborator: list[set[int]] = []
+        self.__collaborators_by_repository: list[list[int]] = []
+        self.__public_counts = array("L")
+        self.__private_counts = array("L")
+        self.__pair_count = 0
+
+    @classmethod
+    def from_active_repos(cls, active_repos_and_outside_collaborators: list[dict[str, Any]]) -> "OutsideCollaboratorIndex":
+        index = cls()
+        for repository in active_repos_and_outside_collaborators:
+            for login in repository["outside_collaborators"]:
+                index.add(repository["repository"], repository["public"], login)
+        return index
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> "OutsideCollaboratorIndex":
+        """Rebuilds an index from the rows of to_rows, e.g. an outside_collaborators snapshot table."""
+        index = cls()
+        for row in rows:
+            index.add(row["repository"], bool(row["public"]), row["username"])
+        return index
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        """One row per collaborator and repository pair, with the repository's visibility."""
+        return [
+            {
+                "repository": repository_name,
+                "public": bool(self.__repository_public[repository_id]),
+                "username": self.__logins[login_id],
+            }
+            for repository_id, repository_name in enumerate(self.__repository_names)
+            for login_id in self.__collaborators_by_repository[repository_id]
+        ]
+
+    def add(self, repository_name: str, public: bool, login: str) -> None:
+        repository_id = self.__repository_ids.get(repository_name)
+        if repository_id is None:
+            repository_id = self.__repository_ids[repository_name] = len(self.__repository_names)
+            self.__repository_names.append(repository_name)
+            self.__repository_public.append(public)
+            self.__collaborators_by_repository.append([])
+        login_id = self.__login_ids.get(login)
+        if login_id is None:
+            login_id = self.__login_ids[login] = len(self.__logins)
+            self.__logins.append(login)
+            self.__repositories_by_collaborator.append(set())
+            self.__public_counts.append(0)
+            self.__private_counts.append(0)
+        if repository_id in self.__repositories_by_collaborator[login_id]:
+            return
+
+        self.__repositories_by_collaborator[login_id].add(repository_id)
+        self.__collaborators_by_repository[repository_id].append(login_id)
+        self.__pair_count += 1
+        if self.__repository_public[repository_id]:
+            self.__public_counts[login_id] += 1
+        else:
+            self.__private_counts[login_id] += 1
+
+    def get_collaborators(self) -> list[str]:
+        return list(self.__logins)
+
+    def get_repositories(self) -> list[str]:
+        return list(self.__repository_names)
+
+    def get_collaborator_repositories(self, login: str) -> list[str]:
+        login_id = self.__login_ids.get(login)
+        if login_id is None:
+            return []
+        return [self.__repository_names[repository_id] for repository_id in self.__repositories_by_collaborator[login_id]]
+
+    def get_repository_collaborators(self, repository_name: str) -> list[str]:
+        repository_id = self.__repository_ids.get(repository_name)
+        if repository_id is None:
+            return []
+        return [self.__logins[login_id] for login_id in self.__collaborators_by_repository[repository_id]]
+
+    def has_access(self, login: str, repository_name: str) -> bool:
+        login_id = self.__login_ids.get(login)
+        repository_id = self.__repository_ids.get(repository_name)
+        if login_id is None or repository_id is None:
+            return False
+        return repository_id in self.__repositories_by_collaborator[login_id]
+
+    def is_public(self, repository_name: str) -> bool:
+        repository_id = self.__repository_ids.get(repository_name)
+        return repository_id is not None and bool(self.__repository_public[repository_id])
+
+    def get_public_repository_count(self, login: str) -> int:
+        login_id = self.__login_ids.get(login)
+        return 0 if login_id is None else self.__public_counts[login_id]
+
+    def get_private_repository_count(self, login: str) -> int:
+        """The count of the private and internal repositories the collaborator can reach."""
+        login_id = self.__login_ids.get(login)
+        return 0 if login_id is None else self.__private_counts[login_id]
+
+    def get_collaborators_with_public_access(self) -> list[str]:
+        return [login for login_id, login in enumerate(self.__logins) if self.__public_counts[login_id]]
+
+    def __len__(self) -> int:
+        """The number of collaborator and repository pairs."""
+        return self.__pair_count
+
+    def __contains__(self, login: str) -> bool:
+        return login in self.__login_ids
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any
+
+
+class RepositoryInventoryStore:
+    """A local SQLite inventory of the repositories of each organisation.
+
+    Repositories are kept by node id so renames replace the old name, and the sync state of each
+    organisation records the newest updatedAt stored, the watermark an incremental sync stops at, and
+    when the inventory was last rebuilt from a full listing, which is what removes deleted or
+    transferred repositories.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        self.database_path = database_path
+        self.__lock = threading.Lock()
+        with self.__connect() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS repositories (
+                    organisation TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    is_archived INTEGER NOT NULL,
+                    is_locked INTEGER NOT NULL,
+                    is_disabled INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    pushed_at TEXT,
+                    PRIMARY KEY (organisation, id)
+                );
+                CREATE INDEX IF NOT EXISTS repositories_name ON repositories (organisation, name);
+                CREATE TABLE IF NOT EXISTS repository_sync_state (
+                    organisation TEXT PRIMARY KEY,
+                    watermark TEXT,
+                    full_synced_at TEXT NOT NULL,
+                    synced_at TEXT NOT NULL
+                );
+            """)
+
+    def __connect(self) -> closing:
+        return closing(sqlite3.connect(self.database_path))
+
+    def get_sync_state(self, organisation: str) -> dict[str, str | None] | None:
+        with self.__connect() as connection:
+            row = connection.execute(
+                "SELECT watermark, full_synced_at FROM repository_sync_state WHERE organisation = ?",
+                (organisation,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["watermark", "full_synced_at"], row))
+
+    def save_repositories(self, organisation: str, repositories: list[dict[str, Any]], full: bool = False) -> None:
+        """Merges the repositories into the inventory, or replaces the inventory with them after a full
+        listing, and moves the watermark up to the newest updatedAt among them."""
+        rows = [
+            (organisation, repository["id"], repository["name"], repository["isArchived"], repository["isLocked"],
+             repository["isDisabled"], repository["updatedAt"], repository.get("pushedAt"))
+            for repository in repositories
+        ]
+        now = datetime.now(timezone.utc).isoformat()
+        watermark = max((row[6] for row in rows), default=None)
+        with self.__lock, self.__connect() as connection:
+            # The connection commits the repositories and the sync state together, or neither
+            with connection:
+                if full:
+                    connection.execute("DELETE FROM repositories WHERE organisation = ?", (organisation,))
+                connection.executemany("INSERT OR REPLACE INTO repositories VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.execute(
+                    """
+                    INSERT INTO repository_sync_state VALUES (?, ?, ?, ?)
+                    ON CONFLICT (organisation) DO UPDATE SET
+                        watermark = MAX(COALESCE(excluded.watermark, watermark), COALESCE(watermark, excluded.watermark)),
+                        full_synced_at = CASE WHEN ? THEN excluded.full_synced_at ELSE full_synced_at END,
+                        synced_at = excluded.synced_at
+                    """,
+                    (organisation, watermark, now, now, full)
+                )
+
+    def get_repository_names(self, organisation: str, include_archived: bool = False,
+                             include_locked: bool = False, include_disabled: bool = False) -> list[str]:
+        sql = "SELECT name FROM repositories WHERE organisation = ?"
+        if not include_archived:
+            sql += " AND NOT is_archived"
+        if not include_locked:
+            sql += " AND NOT is_locked"
+        if not include_disabled:
+            sql += " AND NOT is_disabled"
+        with self.__connect() as connection:
+            return [name for (name,) in connection.execute(sql + " ORDER BY name", (organisation,))]
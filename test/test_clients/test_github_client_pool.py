@@ -0,0 +1,44 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from clients.github_client_pool import GithubClientPool
+
+
+class TestGithubClientPool(unittest.TestCase):
+    def test_reuses_client_within_thread(self):
+        create_client = Mock(side_effect=lambda token: MagicMock(token=token))
+        pool = GithubClientPool(["token1", "token2"], create_client)
+
+        clients = pool.clients()
+
+        self.assertEqual(["token1", "token2"], [client.token for client in clients.values()])
+        self.assertIs(clients["token1"], pool.get("token1"))
+        self.assertEqual(2, create_client.call_count)
+
+    def test_creates_client_per_thread(self):
+        pool = GithubClientPool(["token"], lambda token: MagicMock())
+        worker_clients = []
+        thread = threading.Thread(target=lambda: worker_clients.append(pool.get("token")))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(pool.get("token"), worker_clients[0])
+
+    def test_close_closes_clients_of_every_thread(self):
+        pool = GithubClientPool(["token"], lambda token: MagicMock())
+        worker_clients = []
+        thread = threading.Thread(target=lambda: worker_clients.append(pool.get("token")))
+        thread.start()
+        thread.join()
+        client = pool.get("token")
+
+        pool.close()
+
+        client.close.assert_called_once_with()
+        worker_clients[0].close.assert_called_once_with()
+        self.assertIsNot(client, pool.get("token"))
+
+
+if __name__ == "__main__":
+    unittest.main()
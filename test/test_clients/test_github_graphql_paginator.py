@@ -0,0 +1,162 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, call
+
+from gql import gql
+
+from clients.github_graphql_paginator import GithubGraphQLPaginator
+
+QUERY = gql("""
+    query($organisation_name: String!, $page_size: Int!, $after_cursor: String) {
+        organization(login: $organisation_name) {
+            teams(first: $page_size, after: $after_cursor) {
+                pageInfo {
+                    endCursor
+                    hasNextPage
+                }
+                nodes {
+                    slug
+                }
+            }
+        }
+    }
+""")
+
+
+def create_page(slugs: list[str], has_next_page: bool, end_cursor: str | None) -> dict:
+    return {
+        "organization": {
+            "teams": {
+                "nodes": [{"slug": slug} for slug in slugs],
+                "pageInfo": {"hasNextPage": has_next_page, "endCursor": end_cursor}
+            }
+        }
+    }
+
+
+class TestGithubGraphQLPaginator(unittest.TestCase):
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.execute = AsyncMock(side_effect=[
+            create_page(["team1", "team2"], True, "cursor1"),
+            create_page(["team3"], False, "cursor2"),
+        ])
+        self.client = MagicMock()
+        self.client.connect_async = AsyncMock(return_value=self.session)
+        self.client.close_async = AsyncMock()
+        self.paginator = GithubGraphQLPaginator(self.client, 50)
+
+    def test_iterate_yields_nodes_from_every_page(self):
+        nodes = list(self.paginator.iterate(QUERY, ["organization", "teams"], {"organisation_name": "org"}))
+        self.assertEqual([{"slug": "team1"}, {"slug": "team2"}, {"slug": "team3"}], nodes)
+
+    def test_iterate_passes_cursor_and_page_size(self):
+        list(self.paginator.iterate(QUERY, ["organization", "teams"], {"organisation_name": "org"}))
+        self.assertEqual(self.session.execute.call_args_list, [
+            call(QUERY, variable_values={"organisation_name": "org", "page_size": 50, "after_cursor": None}),
+            call(QUERY, variable_values={"organisation_name": "org", "page_size": 50, "after_cursor": "cursor1"}),
+        ])
+
+    def test_iterate_uses_one_session_for_all_pages(self):
+        list(self.paginator.iterate(QUERY, ["organization", "teams"], {"organisation_name": "org"}))
+        self.client.connect_async.assert_awaited_once()
+        self.client.close_async.assert_awaited_once()
+
+    def test_iterate_closes_session_when_discarded_early(self):
+        nodes = self.paginator.iterate(QUERY, ["organization", "teams"], {"organisation_name": "org"})
+        next(nodes)
+        nodes.close()
+        self.client.close_async.assert_awaited_once()
+        self.session.execute.assert_awaited_once()
+
+    def test_iterate_supports_custom_cursor_and_fixed_page_size(self):
+        list(self.paginator.iterate(QUERY, ["organization", "teams"], {}, cursor_variable="cursor",
+                                    page_size_variable=None))
+        self.assertEqual(self.session.execute.call_args_list[1],
+                         call(QUERY, variable_values={"cursor": "cursor1"}))
+
+    def test_iterate_reads_edges(self):
+        self.session.execute = AsyncMock(return_value={
+            "organization": {
+                "teams": {
+                    "edges": [{"node": {"slug": "team1"}}],
+                    "pageInfo": {"hasNextPage": False, "endCursor": None}
+                }
+            }
+        })
+        nodes = list(self.paginator.iterate(QUERY, ["organization", "teams"]))
+        self.assertEqual([{"slug": "team1"}], nodes)
+
+    def test_iterate_handles_empty_edges(self):
+        self.session.execute = AsyncMock(return_value={
+            "organization": {"teams": {"edges": None, "pageInfo": {"hasNextPage": False, "endCursor": None}}}
+        })
+        self.assertEqual([], list(self.paginator.iterate(QUERY, ["organization", "teams"])))
+
+    def test_iterate_connections_resumes_after_start_cursor(self):
+        connections = list(self.paginator.iterate_connections(
+            QUERY, ["organization", "teams"], {}, start_cursor="cursor0"))
+        self.assertEqual("cursor0", self.session.execute.call_args_list[0].kwargs["variable_values"]["after_cursor"])
+        self.assertEqual("cursor2", connections[-1]["pageInfo"]["endCursor"])
+
+    def test_iterate_connections_concurrently_yields_pages_of_every_connection(self):
+        pages = {
+            "org1": [create_page(["team1"], True, "cursor1"), create_page(["team2"], False, None)],
+            "org2": [create_page(["team3"], False, None)],
+        }
+        self.session.execute = AsyncMock(side_effect=lambda query, variable_values: pages[
+            variable_values["organisation_name"]].pop(0))
+
+        connections = list(self.paginator.iterate_connections_concurrently([
+            (QUERY, ["organization", "teams"], {"organisation_name": "org1"}),
+            (QUERY, ["organization", "teams"], {"organisation_name": "org2"}),
+        ]))
+
+        self.assertEqual([(0, "team1"), (0, "team2"), (1, "team3")], sorted(
+            (index, node["slug"]) for index, connection in connections for node in connection["nodes"]))
+        self.client.connect_async.assert_awaited_once()
+        self.client.close_async.assert_awaited_once()
+
+    def test_iterate_connections_concurrently_raises_errors_of_any_connection(self):
+        def execute(_query, variable_values):
+            if variable_values["organisation_name"] == "org2":
+                raise ConnectionError
+            return create_page(["team1"], False, None)
+
+        self.session.execute = AsyncMock(side_effect=execute)
+
+        connections = self.paginator.iterate_connections_concurrently([
+            (QUERY, ["organization", "teams"], {"organisation_name": "org1"}),
+            (QUERY, ["organization", "teams"], {"organisation_name": "org2"}),
+        ])
+
+        self.assertRaises(ConnectionError, list, connections)
+        self.client.close_async.assert_awaited_once()
+
+    def test_paginate_streams_nodes_on_a_given_session(self):
+        async def collect():
+            return [node async for node in self.paginator.paginate(self.session, QUERY, ["organization", "teams"])]
+
+        self.assertEqual(3, len(asyncio.run(collect())))
+        self.client.connect_async.assert_not_called()
+
+    def test_run_awaits_the_coroutine_on_one_session(self):
+        async def count_pages(session):
+            return len([page async for page in self.paginator.paginate_pages(session, QUERY, ["organization", "teams"])])
+
+        self.assertEqual(2, self.paginator.run(count_pages))
+        self.client.connect_async.assert_awaited_once()
+        self.client.close_async.assert_awaited_once()
+
+    def test_run_closes_the_session_when_the_coroutine_fails(self):
+        self.session.execute = AsyncMock(side_effect=ConnectionError)
+
+        async def count_pages(session):
+            return len([page async for page in self.paginator.paginate_pages(session, QUERY, ["organization", "teams"])])
+
+        self.assertRaises(ConnectionError, self.paginator.run, count_pages)
+        self.client.close_async.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
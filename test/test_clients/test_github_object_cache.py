@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from clients.github_object_cache import GithubObjectCache
+
+
+class TestGithubObjectCache(unittest.TestCase):
+    def test_loads_missing_key_once(self):
+        cache = GithubObjectCache()
+        load = Mock(return_value="repository")
+
+        self.assertEqual("repository", cache.get("key", load))
+        self.assertEqual("repository", cache.get("key", load))
+
+        load.assert_called_once_with()
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    @patch("clients.github_object_cache.time.monotonic")
+    def test_reloads_expired_entry(self, mock_monotonic):
+        cache = GithubObjectCache(ttl_seconds=60)
+        load = Mock(side_effect=["first", "second"])
+
+        mock_monotonic.return_value = 0
+        cache.get("key", load)
+        mock_monotonic.return_value = 59
+        self.assertEqual("first", cache.get("key", load))
+        mock_monotonic.return_value = 60
+        self.assertEqual("second", cache.get("key", load))
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = GithubObjectCache(max_size=2)
+        cache.get("a", lambda: "a")
+        cache.get("b", lambda: "b")
+        cache.get("a", lambda: "not loaded")
+        cache.get("c", lambda: "c")
+
+        self.assertEqual("a", cache.get("a", lambda: "reloaded"))
+        self.assertEqual("reloaded b", cache.get("b", lambda: "reloaded b"))
+
+    def test_invalidate_forces_reload(self):
+        cache = GithubObjectCache()
+        cache.get("key", lambda: "first")
+        cache.invalidate("key")
+        self.assertEqual("second", cache.get("key", lambda: "second"))
+
+    def test_failed_load_is_not_cached(self):
+        cache = GithubObjectCache()
+        load = Mock(side_effect=[ConnectionError, "repository"])
+
+        self.assertRaises(ConnectionError, cache.get, "key", load)
+        self.assertEqual("repository", cache.get("key", load))
+        self.assertEqual("repository", cache.get("key", load))
+        self.assertEqual(2, load.call_count)
+
+    def test_concurrent_callers_share_one_load(self):
+        cache = GithubObjectCache()
+        calls = []
+
+        def load():
+            calls.append(None)
+            time.sleep(0.05)
+            return "organisation"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("key", load))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(["organisation"] * 8, results)
+
+
+if __name__ == "__main__":
+    unittest.main()
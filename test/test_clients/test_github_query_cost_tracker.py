@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+
+from gql import gql
+from graphql import print_ast
+
+from clients.github_query_cost_tracker import (GithubQueryCostTracker,
+                                               get_query_label, query_label,
+                                               with_rate_limit_field)
+
+QUERY = gql("""
+    query($organisation_name: String!) {
+        organization(login: $organisation_name) {
+            id
+        }
+    }
+""")
+
+
+class TestWithRateLimitField(unittest.TestCase):
+    def test_adds_rate_limit_to_query(self):
+        document, added = with_rate_limit_field(QUERY)
+        self.assertTrue(added)
+        self.assertIn("rateLimit {\n    cost\n    remaining\n    resetAt\n  }", print_ast(document))
+        self.assertNotIn("rateLimit", print_ast(QUERY))
+
+    def test_keeps_query_that_selects_rate_limit(self):
+        query = gql("query { viewer { login } rateLimit { cost } }")
+        self.assertEqual((query, False), with_rate_limit_field(query))
+
+    def test_keeps_mutation(self):
+        mutation = gql("mutation { addStar(input: {starrableId: \"1\"}) { clientMutationId } }")
+        self.assertEqual((mutation, False), with_rate_limit_field(mutation))
+
+
+class TestQueryLabel(unittest.TestCase):
+    def test_outermost_label_is_kept(self):
+        with query_label("outer_method"):
+            with query_label("inner_method"):
+                self.assertEqual("outer_method", get_query_label(QUERY))
+        self.assertEqual("query { organization }", get_query_label(QUERY))
+
+
+class TestGithubQueryCostTracker(unittest.TestCase):
+    def test_adds_up_cost_per_label(self):
+        tracker = GithubQueryCostTracker()
+        tracker.record("fetch_all_repositories_in_org", 1, 0.5)
+        tracker.record("fetch_all_repositories_in_org", 2, 1.0)
+        tracker.record("get_team_names", None, 0.25, failed=True)
+
+        self.assertEqual(2, tracker.stats["fetch_all_repositories_in_org"].calls)
+        self.assertEqual(3, tracker.stats["fetch_all_repositories_in_org"].cost)
+        self.assertEqual(1, tracker.stats["get_team_names"].failures)
+        self.assertEqual(0, tracker.stats["get_team_names"].cost)
+
+    def test_summary_lists_most_expensive_method_first(self):
+        tracker = GithubQueryCostTracker()
+        tracker.record("cheap_method", 1, 0.5)
+        tracker.record("expensive_method", 10, 1.0)
+
+        lines = tracker.summary().splitlines()
+
+        self.assertTrue(lines[1].startswith("expensive_method"))
+        self.assertTrue(lines[2].startswith("cheap_method"))
+        self.assertEqual(["total", "2", "0", "11", "1.50"], lines[3].split())
+
+    @patch.object(GithubQueryCostTracker, "_GithubQueryCostTracker__process_tracker", None)
+    @patch("clients.github_query_cost_tracker.atexit.register")
+    def test_process_tracker_is_shared_and_logged_once_at_exit(self, mock_register):
+        tracker = GithubQueryCostTracker.for_process()
+
+        self.assertIs(tracker, GithubQueryCostTracker.for_process())
+        mock_register.assert_called_once_with(tracker.log_summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
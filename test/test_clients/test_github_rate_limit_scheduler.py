@@ -0,0 +1,308 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from freezegun import freeze_time
+from gql import gql
+from graphql import ExecutionResult, print_ast
+from requests import Request, Response
+from requests.adapters import HTTPAdapter
+
+from clients.github_query_cost_tracker import (GithubQueryCostTracker,
+                                               query_label)
+from clients.github_rate_limit_scheduler import (GithubRateLimitScheduler,
+                                                 GithubTokenPool,
+                                                 RateLimitedAdapter,
+                                                 RateLimitedAIOHTTPTransport,
+                                                 RateLimitedClient)
+
+NOW = 1675209600  # 2023-02-01T00:00:00Z
+
+
+def create_headers(remaining: int, reset_in: int = 3600, limit: int = 5000, resource: str = "core") -> dict:
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(NOW + reset_in),
+        "x-ratelimit-resource": resource,
+    }
+
+
+@freeze_time("2023-02-01")
+class TestGithubRateLimitScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = GithubRateLimitScheduler(reserved_requests=50, pace_below=0.5)
+
+    def test_does_not_pace_unknown_resource(self):
+        self.assertEqual(0, self.scheduler.claim("core"))
+
+    def test_does_not_pace_while_budget_is_plentiful(self):
+        self.scheduler.update_from_headers(create_headers(4000))
+        self.assertEqual([0, 0, 0], [self.scheduler.claim("core") for _ in range(3)])
+
+    def test_spreads_remaining_budget_until_reset(self):
+        self.scheduler.update_from_headers(create_headers(410))
+        delays = [self.scheduler.claim("core") for _ in range(3)]
+        self.assertEqual(0, delays[0])
+        self.assertAlmostEqual(10, delays[1])
+        self.assertAlmostEqual(10 + 3600 / 359, delays[2])
+
+    def test_waits_for_reset_once_only_reserve_is_left(self):
+        self.scheduler.update_from_headers(create_headers(50, reset_in=120))
+        self.assertEqual(125, self.scheduler.claim("core"))
+
+    def test_claim_of_nothing_waits_for_reset_once_only_reserve_is_left(self):
+        self.scheduler.update_from_headers(create_headers(50, reset_in=600))
+        self.assertEqual(605, self.scheduler.claim("core", cost=0))
+
+    def test_claim_of_nothing_is_not_paced(self):
+        self.scheduler.update_from_headers(create_headers(51))
+        self.assertEqual([0, 0], [self.scheduler.claim("core", cost=0) for _ in range(2)])
+        self.assertEqual(51, self.scheduler.budgets["core"].remaining)
+
+    def test_pacing_is_per_resource(self):
+        self.scheduler.update_from_headers(create_headers(10, resource="graphql"))
+        self.assertEqual(0, self.scheduler.claim("core"))
+        self.assertGreater(self.scheduler.claim("graphql"), 0)
+
+    def test_uses_resource_given_when_headers_do_not_name_one(self):
+        headers = create_headers(10)
+        del headers["x-ratelimit-resource"]
+        self.scheduler.update_from_headers(headers, "search")
+        self.assertIn("search", self.scheduler.budgets)
+
+    def test_late_response_does_not_raise_budget_within_window(self):
+        self.scheduler.update_from_headers(create_headers(100))
+        self.scheduler.update_from_headers(create_headers(200))
+        self.assertEqual(100, self.scheduler.budgets["core"].remaining)
+
+    def test_new_window_replaces_budget(self):
+        self.scheduler.update_from_headers(create_headers(100, reset_in=10))
+        self.scheduler.update_from_headers(create_headers(4999, reset_in=3600))
+        self.assertEqual(4999, self.scheduler.budgets["core"].remaining)
+
+    def test_ignores_responses_without_rate_limit_headers(self):
+        self.scheduler.update_from_headers({"content-type": "application/json"})
+        self.scheduler.update_from_headers(None)
+        self.assertEqual({}, self.scheduler.budgets)
+
+    def test_stops_pacing_after_reset(self):
+        self.scheduler.update_from_headers(create_headers(10, reset_in=0))
+        self.assertEqual(0, self.scheduler.claim("core"))
+        self.assertNotIn("core", self.scheduler.budgets)
+
+    def test_reads_graphql_rate_limit_object(self):
+        self.scheduler.update_from_graphql(
+            {"cost": 1, "limit": 5000, "remaining": 20, "resetAt": "2023-02-01T00:10:00Z"})
+        self.assertEqual(600, self.scheduler.seconds_until_reset("graphql"))
+        self.assertEqual(605, self.scheduler.claim("graphql"))
+
+    def test_seconds_until_reset_is_none_for_unknown_resource(self):
+        self.assertIsNone(self.scheduler.seconds_until_reset("core"))
+
+    @patch("clients.github_rate_limit_scheduler.sleep")
+    def test_acquire_sleeps_for_claimed_delay(self, mock_sleep):
+        self.scheduler.update_from_headers(create_headers(50, reset_in=10))
+        self.scheduler.acquire("core")
+        mock_sleep.assert_called_once_with(15)
+
+    @patch("clients.github_rate_limit_scheduler.sleep")
+    def test_acquire_does_not_sleep_without_delay(self, mock_sleep):
+        self.scheduler.acquire("core")
+        mock_sleep.assert_not_called()
+
+    @patch("clients.github_rate_limit_scheduler.asyncio.sleep", new_callable=AsyncMock)
+    def test_acquire_async_sleeps_for_claimed_delay(self, mock_sleep):
+        self.scheduler.update_from_headers(create_headers(50, reset_in=10))
+        asyncio.run(self.scheduler.acquire_async("core"))
+        mock_sleep.assert_awaited_once_with(15)
+
+
+@freeze_time("2023-02-01")
+class TestGithubTokenPool(unittest.TestCase):
+    def setUp(self):
+        self.token_pool = GithubTokenPool(["token1", "token2", "token3"])
+
+    def test_requires_a_token(self):
+        self.assertRaises(ValueError, GithubTokenPool, [])
+
+    def test_ignores_duplicate_tokens(self):
+        self.assertEqual(["token1"], GithubTokenPool(["token1", "token1"]).tokens)
+
+    def test_hands_out_tokens_round_robin_while_budgets_are_unknown(self):
+        self.assertEqual(["token1", "token2", "token3", "token1"], [self.token_pool.pick("core") for _ in range(4)])
+
+    def test_picks_token_with_most_remaining_budget(self):
+        self.token_pool.update_from_headers("token1", create_headers(100))
+        self.token_pool.update_from_headers("token2", create_headers(3000))
+        self.token_pool.update_from_headers("token3", create_headers(2000))
+        self.assertEqual(["token2", "token2"], [self.token_pool.pick("core") for _ in range(2)])
+
+    def test_budgets_are_per_resource(self):
+        for token in self.token_pool.tokens:
+            self.token_pool.update_from_headers(token, create_headers(4000))
+        self.token_pool.update_from_graphql("token1", {"remaining": 10, "resetAt": "2023-02-01T01:00:00Z"})
+        self.token_pool.update_from_graphql("token2", {"remaining": 4000, "resetAt": "2023-02-01T01:00:00Z"})
+        self.token_pool.update_from_graphql("token3", {"remaining": 20, "resetAt": "2023-02-01T01:00:00Z"})
+        self.assertEqual("token2", self.token_pool.pick("graphql"))
+
+    def test_acquire_claims_budget_of_picked_token(self):
+        self.token_pool.update_from_headers("token1", create_headers(4000))
+        self.token_pool.update_from_headers("token2", create_headers(3000))
+        self.token_pool.update_from_headers("token3", create_headers(3000))
+        self.assertEqual("token1", self.token_pool.acquire("core"))
+        self.assertEqual(3999, self.token_pool.schedulers["token1"].budgets["core"].remaining)
+
+    def test_seconds_until_reset_is_earliest_known_reset(self):
+        self.token_pool.update_from_headers("token1", create_headers(10, reset_in=600))
+        self.token_pool.update_from_headers("token2", create_headers(10, reset_in=60))
+        self.assertEqual(60, self.token_pool.seconds_until_reset("core"))
+        self.assertIsNone(self.token_pool.seconds_until_reset("graphql"))
+
+
+class TestRateLimitedAdapter(unittest.TestCase):
+    @patch.object(HTTPAdapter, "send")
+    def test_sends_with_pool_token_and_records_headers(self, mock_send):
+        response = Response()
+        response.status_code = 200
+        response.headers.update(create_headers(4999, resource="search"))
+        mock_send.return_value = response
+        token_pool = MagicMock()
+        token_pool.acquire.return_value = "token2"
+        request = Request("GET", "https://api.github.com/search/code",
+                          headers={"Authorization": "Bearer token1"}).prepare()
+
+        RateLimitedAdapter(token_pool).send(request)
+
+        token_pool.acquire.assert_called_once_with("search")
+        self.assertEqual("Bearer token2", request.headers["Authorization"])
+        token_pool.update_from_headers.assert_called_once_with("token2", response.headers, "search")
+
+    @patch.object(HTTPAdapter, "send")
+    def test_passes_requests_through_without_scheduler(self, mock_send):
+        request = Request("GET", "https://api.github.com/orgs/org").prepare()
+        RateLimitedAdapter().send(request)
+        mock_send.assert_called_once_with(request)
+
+
+class TestRateLimitedAIOHTTPTransport(unittest.TestCase):
+    @patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+    def test_paces_requests_and_records_rate_limit(self, mock_execute):
+        token_pool = MagicMock()
+        token_pool.acquire_async = AsyncMock(return_value="token2")
+        transport = RateLimitedAIOHTTPTransport(url="https://api.github.com/graphql", token_pool=token_pool)
+        transport.response_headers = create_headers(4990, resource="graphql")
+        rate_limit = {"cost": 1, "remaining": 4990, "resetAt": "2023-02-01T01:00:00Z"}
+        mock_execute.return_value = ExecutionResult(data={"rateLimit": rate_limit})
+        document = MagicMock()
+
+        asyncio.run(transport.execute(document, {"login": "user"}))
+
+        token_pool.acquire_async.assert_awaited_once_with("graphql")
+        mock_execute.assert_awaited_once_with(
+            document, {"login": "user"}, None, {"headers": {"Authorization": "Bearer token2"}}, False)
+        token_pool.update_from_headers.assert_called_once_with("token2", transport.response_headers, "graphql")
+        token_pool.update_from_graphql.assert_called_once_with("token2", rate_limit)
+
+    @patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+    def test_adds_rate_limit_to_query_and_records_its_cost(self, mock_execute):
+        token_pool = MagicMock()
+        token_pool.acquire_async = AsyncMock(return_value="token1")
+        cost_tracker = GithubQueryCostTracker()
+        transport = RateLimitedAIOHTTPTransport(
+            url="https://api.github.com/graphql", token_pool=token_pool, cost_tracker=cost_tracker)
+        rate_limit = {"cost": 3, "remaining": 4990, "resetAt": "2023-02-01T01:00:00Z"}
+        mock_execute.return_value = ExecutionResult(data={"viewer": {"login": "user"}, "rateLimit": rate_limit})
+
+        with query_label("get_viewer"):
+            result = asyncio.run(transport.execute(gql("query { viewer { login } }")))
+
+        self.assertIn("rateLimit", print_ast(mock_execute.call_args.args[0]))
+        self.assertEqual({"viewer": {"login": "user"}}, result.data)
+        token_pool.update_from_graphql.assert_called_once_with("token1", rate_limit)
+        self.assertEqual(3, cost_tracker.stats["get_viewer"].cost)
+
+    @patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+    def test_records_failed_requests_against_query_fields(self, mock_execute):
+        token_pool = MagicMock()
+        token_pool.acquire_async = AsyncMock(return_value="token1")
+        cost_tracker = GithubQueryCostTracker()
+        transport = RateLimitedAIOHTTPTransport(
+            url="https://api.github.com/graphql", token_pool=token_pool, cost_tracker=cost_tracker)
+        mock_execute.side_effect = ConnectionError
+
+        self.assertRaises(ConnectionError, asyncio.run, transport.execute(gql("query { viewer { login } }")))
+        self.assertEqual(1, cost_tracker.stats["query { viewer }"].failures)
+
+    @patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+    def test_records_headers_of_failed_requests(self, mock_execute):
+        token_pool = MagicMock()
+        token_pool.acquire_async = AsyncMock(return_value="token1")
+        transport = RateLimitedAIOHTTPTransport(url="https://api.github.com/graphql", token_pool=token_pool)
+        transport.response_headers = create_headers(0, resource="graphql")
+        mock_execute.side_effect = ConnectionError
+
+        self.assertRaises(ConnectionError, asyncio.run, transport.execute(MagicMock()))
+        token_pool.update_from_headers.assert_called_once()
+
+    @patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+    def test_sends_with_a_given_token_without_acquiring_another(self, mock_execute):
+        token_pool = MagicMock()
+        token_pool.acquire_async = AsyncMock()
+        transport = RateLimitedAIOHTTPTransport(url="https://api.github.com/graphql", token_pool=token_pool)
+        mock_execute.return_value = ExecutionResult(data={})
+
+        asyncio.run(transport.execute(MagicMock(), token="token3"))
+
+        token_pool.acquire_async.assert_not_awaited()
+        self.assertEqual({"headers": {"Authorization": "Bearer token3"}}, mock_execute.call_args.args[3])
+
+
+@patch("gql.transport.aiohttp.AIOHTTPTransport.close", new_callable=AsyncMock)
+@patch("gql.transport.aiohttp.AIOHTTPTransport.connect", new_callable=AsyncMock)
+@patch("gql.transport.aiohttp.AIOHTTPTransport.execute", new_callable=AsyncMock)
+class TestRateLimitedClient(unittest.TestCase):
+    def setUp(self):
+        self.token_pool = GithubTokenPool(["token1"], reset_buffer_seconds=0)
+        # The budget is spent and resets after longer than the execute timeout
+        self.token_pool.update_from_graphql(
+            "token1", {"remaining": 0, "resetAt": datetime.fromtimestamp(time.time() + 0.3, timezone.utc).isoformat()})
+        self.client = RateLimitedClient(transport=RateLimitedAIOHTTPTransport(
+            url="https://api.github.com/graphql", token_pool=self.token_pool), execute_timeout=0.1)
+
+    def test_waits_for_the_budget_before_the_execute_timeout_starts(self, mock_execute, *_):
+        mock_execute.return_value = ExecutionResult(data={"viewer": {"login": "user"}})
+
+        started = time.monotonic()
+        result = self.client.execute(gql("query { viewer { login } }"))
+
+        self.assertEqual({"viewer": {"login": "user"}}, result)
+        self.assertGreater(time.monotonic() - started, 0.1)
+        self.assertEqual({"headers": {"Authorization": "Bearer token1"}}, mock_execute.call_args.args[3])
+
+    def test_connected_sessions_wait_for_the_budget_too(self, mock_execute, *_):
+        mock_execute.return_value = ExecutionResult(data={"viewer": {"login": "user"}})
+
+        async def execute():
+            session = await self.client.connect_async()
+            try:
+                return await session.execute(gql("query { viewer { login } }"))
+            finally:
+                await self.client.close_async()
+
+        self.assertEqual({"viewer": {"login": "user"}}, asyncio.run(execute()))
+
+    def test_queries_still_time_out_once_sent(self, mock_execute, *_):
+        async def slow_execute(*_, **__):
+            await asyncio.sleep(1)
+
+        mock_execute.side_effect = slow_execute
+        self.token_pool.schedulers["token1"].budgets.clear()
+
+        self.assertRaises(TimeoutError, self.client.execute, gql("query { viewer { login } }"))
+
+
+if __name__ == "__main__":
+    unittest.main()
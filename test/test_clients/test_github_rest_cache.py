@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from requests import Request, Response, Session
+from requests.adapters import HTTPAdapter
+
+from clients.github_rest_cache import (ConditionalRequestAdapter,
+                                       GithubRestCache)
+
+URL = "https://api.github.com/orgs/org/personal-access-tokens"
+
+
+def create_response(status_code: int, body: bytes = b"", headers: dict | None = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = URL
+    response.reason = "OK"
+    return response
+
+
+def prepare_request(token: str = "token") -> Request:
+    return Request("GET", URL, headers={"Authorization": f"Bearer {token}"}).prepare()
+
+
+class TestGithubRestCache(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temporary_directory)
+        self.cache = GithubRestCache(self.temporary_directory)
+
+    def test_returns_none_for_unknown_key(self):
+        self.assertIsNone(self.cache.get("unknown"))
+
+    def test_stores_and_returns_response(self):
+        self.cache.set("key", create_response(200, b"[1, 2]", {"ETag": '"abc"'}))
+        metadata, body = self.cache.get("key")
+        self.assertEqual(b"[1, 2]", body)
+        self.assertEqual('"abc"', metadata["headers"]["ETag"])
+
+    def test_key_differs_per_token(self):
+        self.assertNotEqual(self.cache.key_for(prepare_request("token1")),
+                            self.cache.key_for(prepare_request("token2")))
+
+    def test_does_not_write_token_to_disk(self):
+        key = self.cache.key_for(prepare_request("secret-token"))
+        self.cache.set(key, create_response(200, b"{}", {"ETag": '"abc"'}))
+        for name in os.listdir(self.temporary_directory):
+            with open(os.path.join(self.temporary_directory, name), "rb") as file:
+                self.assertNotIn(b"secret-token", file.read())
+
+    def test_evicts_least_recently_used_entries_over_max_size(self):
+        cache = GithubRestCache(self.temporary_directory, max_size_bytes=1100)
+        cache.set("first", create_response(200, b"a" * 400, {"ETag": '"1"'}))
+        cache.set("second", create_response(200, b"b" * 400, {"ETag": '"2"'}))
+        os.utime(os.path.join(self.temporary_directory, "first.json"), (0, 0))
+        cache.set("third", create_response(200, b"c" * 400, {"ETag": '"3"'}))
+        self.assertIsNone(cache.get("first"))
+        self.assertIsNotNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+
+class TestConditionalRequestAdapter(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temporary_directory)
+        self.adapter = ConditionalRequestAdapter(GithubRestCache(self.temporary_directory))
+
+    @patch.object(HTTPAdapter, "send")
+    def test_serves_cached_body_on_not_modified(self, mock_send):
+        mock_send.side_effect = [
+            create_response(200, b'{"id": 1}', {"ETag": '"abc"', "X-RateLimit-Remaining": "4999"}),
+            create_response(304, b"", {"ETag": '"abc"', "X-RateLimit-Remaining": "4999"}),
+        ]
+        self.adapter.send(prepare_request())
+        second_request = prepare_request()
+        response = self.adapter.send(second_request)
+
+        self.assertEqual('"abc"', second_request.headers["If-None-Match"])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({"id": 1}, response.json())
+        self.assertTrue(response.from_cache)
+
+    @patch.object(HTTPAdapter, "send")
+    def test_sends_if_modified_since_for_last_modified_responses(self, mock_send):
+        mock_send.side_effect = [
+            create_response(200, b"{}", {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+            create_response(304),
+        ]
+        self.adapter.send(prepare_request())
+        second_request = prepare_request()
+        self.adapter.send(second_request)
+        self.assertEqual("Mon, 01 Jan 2024 00:00:00 GMT", second_request.headers["If-Modified-Since"])
+
+    @patch.object(HTTPAdapter, "send")
+    def test_returns_fresh_response_when_modified(self, mock_send):
+        mock_send.side_effect = [
+            create_response(200, b'{"id": 1}', {"ETag": '"abc"'}),
+            create_response(200, b'{"id": 2}', {"ETag": '"def"'}),
+        ]
+        self.adapter.send(prepare_request())
+        response = self.adapter.send(prepare_request())
+        self.assertEqual({"id": 2}, response.json())
+
+    @patch.object(HTTPAdapter, "send")
+    def test_does_not_cache_responses_without_validators(self, mock_send):
+        mock_send.side_effect = [create_response(200, b"{}"), create_response(200, b"{}")]
+        self.adapter.send(prepare_request())
+        second_request = prepare_request()
+        self.adapter.send(second_request)
+        self.assertNotIn("If-None-Match", second_request.headers)
+
+    @patch.object(HTTPAdapter, "send")
+    def test_does_not_cache_non_get_requests(self, mock_send):
+        mock_send.return_value = create_response(200, b"{}", {"ETag": '"abc"'})
+        self.adapter.send(Request("PATCH", URL, data="{}").prepare())
+        self.assertEqual([], os.listdir(self.temporary_directory))
+
+    @patch.object(HTTPAdapter, "send")
+    def test_mounts_on_a_session(self, mock_send):
+        mock_send.return_value = create_response(200, b"[]", {"ETag": '"abc"'})
+        session = Session()
+        session.mount("https://api.github.com/", self.adapter)
+        self.assertEqual([], session.get(URL).json())
+        self.assertEqual(2, len(os.listdir(self.temporary_directory)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.async_github_service import AsyncGithubService
+from services.github_graphql_queries import GITHUB_GRAPHQL_QUERIES
+from services.github_service import GithubService
+
+ORGANISATION_NAME = "moj-analytical-services"
+
+
+def create_page(path: list[str], nodes: list[dict], end_cursor: str | None = None) -> dict:
+    connection = {"nodes": nodes, "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor}}
+    for key in reversed(path):
+        connection = {key: connection}
+    return connection
+
+
+def mock_graphql_session(github_service: GithubService, execute) -> MagicMock:
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=execute)
+    github_service.github_client_gql_api.connect_async = AsyncMock(return_value=session)
+    github_service.github_client_gql_api.close_async = AsyncMock()
+    return session
+
+
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("github.Github.__new__", new=MagicMock)
+class TestAsyncGithubService(unittest.TestCase):
+    def test_runs_queries_concurrently_over_one_session(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        in_flight = []
+        most_in_flight = []
+
+        async def execute(query, **_):
+            in_flight.append(query)
+            most_in_flight.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(query)
+            if query is GITHUB_GRAPHQL_QUERIES["team_names"]:
+                return create_page(["organization", "teams"], [{"slug": "team1"}])
+            return create_page(["organization", "repositories"], [
+                {"name": "repo1", "isDisabled": False}, {"name": "repo2", "isDisabled": True}])
+
+        session = mock_graphql_session(github_service, execute)
+
+        async def get_teams_and_repositories():
+            async with AsyncGithubService(github_service) as async_github_service:
+                return await asyncio.gather(
+                    async_github_service.get_team_names(), async_github_service.get_org_repo_names())
+
+        self.assertEqual([["team1"], ["repo1"]], asyncio.run(get_teams_and_repositories()))
+        self.assertEqual(2, max(most_in_flight))
+        self.assertEqual(2, session.execute.await_count)
+        github_service.github_client_gql_api.connect_async.assert_awaited_once()
+        github_service.github_client_gql_api.close_async.assert_awaited_once()
+
+    def test_pages_through_connection(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        session = mock_graphql_session(github_service, [
+            create_page(["organization", "membersWithRole"],
+                        [{"login": "user1", "organizationVerifiedDomainEmails": ["user1@example.com"]}], "cursor1"),
+            create_page(["organization", "membersWithRole"],
+                        [{"login": "user2", "organizationVerifiedDomainEmails": []}]),
+        ])
+
+        async def get_members():
+            async with AsyncGithubService(github_service) as async_github_service:
+                return await async_github_service.get_github_member_list()
+
+        self.assertEqual([
+            {"username": "user1", "email": "user1@example.com"},
+            {"username": "user2", "email": None},
+        ], asyncio.run(get_members()))
+        self.assertEqual("cursor1", session.execute.await_args.kwargs["variable_values"]["after_cursor"])
+
+    def test_maps_teams_to_members(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        async def execute(query, variable_values):
+            if query is GITHUB_GRAPHQL_QUERIES["team_names"]:
+                return create_page(["organization", "teams"], [{"slug": "team1"}, {"slug": "team2"}])
+            return create_page(["organization", "team", "members"], [{"login": f"{variable_values['team_name']}-user"}])
+
+        mock_graphql_session(github_service, execute)
+
+        async def get_team_members():
+            async with AsyncGithubService(github_service) as async_github_service:
+                return await async_github_service.get_team_user_names_by_team()
+
+        self.assertEqual({"team1": ["team1-user"], "team2": ["team2-user"]}, asyncio.run(get_team_members()))
+
+    def test_bounds_the_teams_paged_at_once(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        team_names = [f"team{number}" for number in range(github_service.GITHUB_GQL_MAX_CONCURRENT_BATCHES * 3)]
+        in_flight = []
+        most_in_flight = []
+
+        async def execute(query, variable_values):
+            if query is GITHUB_GRAPHQL_QUERIES["team_names"]:
+                return create_page(["organization", "teams"], [{"slug": team_name} for team_name in team_names])
+            in_flight.append(variable_values["team_name"])
+            most_in_flight.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(variable_values["team_name"])
+            return create_page(["organization", "team", "members"], [])
+
+        mock_graphql_session(github_service, execute)
+
+        async def get_team_members():
+            async with AsyncGithubService(github_service) as async_github_service:
+                return await async_github_service.get_team_user_names_by_team()
+
+        self.assertEqual(dict.fromkeys(team_names, []), asyncio.run(get_team_members()))
+        self.assertEqual(github_service.GITHUB_GQL_MAX_CONCURRENT_BATCHES, max(most_in_flight))
+
+    def test_raises_when_not_entered(self):
+        async_github_service = AsyncGithubService(GithubService("", ORGANISATION_NAME))
+        self.assertRaises(RuntimeError, asyncio.run, async_github_service.get_team_names())
+
+
+if __name__ == "__main__":
+    unittest.main()
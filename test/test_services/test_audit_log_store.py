@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from services.audit_log_store import AuditLogStore
+
+ORGANISATION_NAME = "moj-analytical-services"
+
+
+def create_entry(entry_id: str, action: str, created_at: str, actor: str = "admin_user",
+                 user: str = "some_user") -> dict:
+    return {"id": entry_id, "action": action, "createdAt": created_at, "actorLogin": actor, "userLogin": user}
+
+
+class TestAuditLogStore(unittest.TestCase):
+    def setUp(self):
+        self.database_path = os.path.join(tempfile.mkdtemp(), "audit_log.db")
+        self.store = AuditLogStore(self.database_path)
+
+    def test_has_no_sync_state_before_first_sync(self):
+        self.assertIsNone(self.store.get_sync_state(ORGANISATION_NAME))
+
+    def test_save_page_records_sync_state(self):
+        self.store.save_page(ORGANISATION_NAME, [
+            create_entry("1", "org.add_member", "2023-12-06T10:32:07.832Z"),
+            create_entry("2", "org.add_member", "2023-12-07T10:32:07.832Z"),
+        ], "2023-12-01", "query", "cursor1")
+        self.assertEqual({
+            "covered_since": "2023-12-01",
+            "query_string": "query",
+            "end_cursor": "cursor1",
+            "last_created_at": "2023-12-07T10:32:07.832Z",
+        }, self.store.get_sync_state(ORGANISATION_NAME))
+
+    def test_save_page_skips_entries_already_stored(self):
+        entry = create_entry("1", "org.add_member", "2023-12-06T10:32:07.832Z")
+        self.assertEqual(1, self.store.save_page(ORGANISATION_NAME, [entry, None], "2023-12-01", "query", "cursor1"))
+        self.assertEqual(0, self.store.save_page(ORGANISATION_NAME, [entry], "2023-12-01", "query", "cursor2"))
+
+    def test_empty_page_keeps_cursor_and_last_created_at_of_same_query(self):
+        self.store.save_page(ORGANISATION_NAME, [create_entry("1", "org.add_member", "2023-12-06T10:32:07.832Z")],
+                             "2023-12-01", "query", "cursor1")
+        self.store.save_page(ORGANISATION_NAME, [], "2023-12-01", "query", None)
+        state = self.store.get_sync_state(ORGANISATION_NAME)
+        self.assertEqual("cursor1", state["end_cursor"])
+        self.assertEqual("2023-12-06T10:32:07.832Z", state["last_created_at"])
+
+    def test_empty_page_of_new_query_drops_cursor_of_old_query(self):
+        self.store.save_page(ORGANISATION_NAME, [], "2023-12-01", "query", "cursor1")
+        self.store.save_page(ORGANISATION_NAME, [], "2023-11-01", "other query", None)
+        self.assertIsNone(self.store.get_sync_state(ORGANISATION_NAME)["end_cursor"])
+
+    def test_get_entries_filters_by_action_date_and_actor(self):
+        self.store.save_page(ORGANISATION_NAME, [
+            create_entry("1", "org.add_member", "2023-11-30T23:59:59Z"),
+            create_entry("2", "org.add_member", "2023-12-01T00:00:00Z"),
+            create_entry("3", "org.remove_member", "2023-12-02T10:00:00Z", actor="other_admin"),
+            create_entry("4", "org.remove_member", "2023-12-03T23:59:59.999Z"),
+            create_entry("5", "org.remove_member", "2023-12-04T00:00:00Z"),
+        ], "2023-11-01", "query", None)
+
+        self.assertEqual(["2"], [
+            entry["id"] for entry in self.store.get_entries(
+                ORGANISATION_NAME, ["org.add_member"], "2023-12-01", "2023-12-03")
+        ])
+        self.assertEqual(["4", "3"], [
+            entry["id"] for entry in self.store.get_entries(
+                ORGANISATION_NAME, ["org.add_member", "org.remove_member"], "2023-12-02", "2023-12-03")
+        ])
+        self.assertEqual(["4"], [
+            entry["id"] for entry in self.store.get_entries(
+                ORGANISATION_NAME, ["org.remove_member"], "2023-12-01", "2023-12-03", actor="admin_user")
+        ])
+
+    def test_entries_are_kept_per_organisation(self):
+        self.store.save_page("other-org", [create_entry("1", "org.add_member", "2023-12-06T10:32:07.832Z")],
+                             "2023-12-01", "query", None)
+        self.assertEqual([], self.store.get_entries(ORGANISATION_NAME, ["org.add_member"], "2023-12-01", "2023-12-31"))
+        self.assertIsNone(self.store.get_sync_state(ORGANISATION_NAME))
+
+    def test_entries_persist_across_instances(self):
+        self.store.save_page(ORGANISATION_NAME, [create_entry("1", "org.add_member", "2023-12-06T10:32:07.832Z")],
+                             "2023-12-01", "query", "cursor1")
+        store = AuditLogStore(self.database_path)
+        self.assertEqual("cursor1", store.get_sync_state(ORGANISATION_NAME)["end_cursor"])
+        self.assertEqual(1, len(store.get_entries(ORGANISATION_NAME, ["org.add_member"], "2023-12-01", "2023-12-31")))
+
+
+if __name__ == "__main__":
+    unittest.main()
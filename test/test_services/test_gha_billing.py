@@ -0,0 +1,71 @@
+import unittest
+
+from services.gha_billing import aggregate_gha_minutes, usage_items_to_frame
+
+
+def create_usage_item(organisation: str, repository: str, quantity: float, sku: str = "Actions Linux",
+                      product: str = "actions", unit_type: str = "Minutes") -> dict:
+    return {"date": "2025-01-06T15:15:47Z", "product": product, "sku": sku, "quantity": quantity,
+            "unitType": unit_type, "pricePerUnit": 0.008, "organizationName": organisation,
+            "repositoryName": repository}
+
+
+class TestUsageItemsToFrame(unittest.TestCase):
+    def test_keeps_aggregated_columns_with_their_types(self):
+        usage = usage_items_to_frame([create_usage_item("org1", "repo1", 10)])
+
+        self.assertEqual(["organizationName", "repositoryName", "product", "sku", "unitType", "quantity"],
+                         list(usage.columns))
+        self.assertEqual("float64", usage["quantity"].dtype)
+
+    def test_fills_missing_fields(self):
+        usage = usage_items_to_frame([{"product": "actions", "quantity": 1}])
+        self.assertTrue(usage["repositoryName"].isna().all())
+
+
+class TestAggregateGhaMinutes(unittest.TestCase):
+    def test_sums_minutes_per_organisation_repository_and_sku(self):
+        usage = usage_items_to_frame([
+            create_usage_item("org1", "repo1", 10),
+            create_usage_item("org1", "repo1", 5),
+            create_usage_item("org1", "repo1", 2, sku="Actions Windows"),
+            create_usage_item("org2", "repo2", 7),
+        ])
+
+        minutes = aggregate_gha_minutes(usage, {"org1": ["repo1"], "org2": ["repo2"]})
+
+        self.assertEqual([
+            ["org1", "repo1", "Actions Linux", 15.0],
+            ["org1", "repo1", "Actions Windows", 2.0],
+            ["org2", "repo2", "Actions Linux", 7.0],
+        ], minutes.values.tolist())
+
+    def test_only_counts_billable_repositories_of_their_organisation(self):
+        usage = usage_items_to_frame([
+            create_usage_item("org1", "repo1", 10),
+            create_usage_item("org2", "repo1", 20),
+            create_usage_item("org1", "public-repo", 30),
+        ])
+
+        minutes = aggregate_gha_minutes(usage, {"org1": ["repo1"]})
+
+        self.assertEqual(10, minutes["minutes"].sum())
+
+    def test_ignores_other_products_and_units(self):
+        usage = usage_items_to_frame([
+            create_usage_item("org1", "repo1", 10),
+            create_usage_item("org1", "repo1", 3, product="packages"),
+            create_usage_item("org1", "repo1", 4, unit_type="GigabyteHours"),
+        ])
+
+        self.assertEqual(10, aggregate_gha_minutes(usage, {"org1": ["repo1"]})["minutes"].sum())
+
+    def test_empty_usage(self):
+        minutes = aggregate_gha_minutes(usage_items_to_frame([]), {})
+
+        self.assertTrue(minutes.empty)
+        self.assertEqual(["organisation", "repository", "sku", "minutes"], list(minutes.columns))
+
+
+if __name__ == "__main__":
+    unittest.main()
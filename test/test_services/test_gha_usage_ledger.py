@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from freezegun import freeze_time
+
+from services.gha_usage_ledger import GhaUsageLedger
+
+ENTERPRISE_NAME = "ministry-of-justice-uk"
+
+
+def create_usage_item(organisation: str, repository: str, quantity: float, sku: str = "Actions Linux",
+                      product: str = "actions", unit_type: str = "Minutes") -> dict:
+    return {"product": product, "sku": sku, "quantity": quantity, "unitType": unit_type,
+            "organizationName": organisation, "repositoryName": repository}
+
+
+class TestGhaUsageLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = GhaUsageLedger(os.path.join(tempfile.mkdtemp(), "gha_usage.db"))
+
+    def test_unsettled_days_are_the_days_of_the_month_not_ingested(self):
+        days = self.ledger.get_unsettled_days(
+            ENTERPRISE_NAME, datetime(2025, 1, 3, 2, 30, tzinfo=timezone.utc), timedelta(days=1))
+
+        self.assertEqual([date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)], days)
+
+    def test_days_ingested_before_they_settled_are_fetched_again(self):
+        with freeze_time("2025-01-02 10:00"):
+            self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 1), [])
+            self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 2), [])
+
+        self.assertEqual([date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)], self.ledger.get_unsettled_days(
+            ENTERPRISE_NAME, datetime(2025, 1, 3, 2, 30, tzinfo=timezone.utc), timedelta(days=1)))
+
+    def test_settled_day_is_not_fetched_again(self):
+        with freeze_time("2025-01-03 00:00"):
+            self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 1), [])
+
+        self.assertEqual([date(2025, 1, 2), date(2025, 1, 3)], self.ledger.get_unsettled_days(
+            ENTERPRISE_NAME, datetime(2025, 1, 3, 2, 30, tzinfo=timezone.utc), timedelta(days=1)))
+
+    def test_ingesting_a_day_again_replaces_its_minutes(self):
+        self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 1), [create_usage_item("org1", "repo1", 10)])
+        self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 2), [create_usage_item("org1", "repo1", 5)])
+
+        minutes = self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 1), [
+            create_usage_item("org1", "repo1", 12), create_usage_item("org1", "repo2", 3)])
+        self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 2), [])
+
+        self.assertEqual(15, minutes)
+        self.assertEqual(15, self.ledger.get_month_minutes(ENTERPRISE_NAME, date(2025, 1, 1)))
+        self.assertEqual(12, self.ledger.get_month_minutes(ENTERPRISE_NAME, date(2025, 1, 1), {"org1": ["repo1"]}))
+
+    def test_keeps_running_totals_of_actions_minutes_per_month(self):
+        self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 1), [
+            create_usage_item("org1", "repo1", 10),
+            create_usage_item("org1", "repo1", 3, product="packages"),
+            create_usage_item("org1", "repo2", 4, unit_type="GigabyteHours"),
+        ])
+        minutes = self.ledger.ingest(ENTERPRISE_NAME, date(2025, 1, 2), [
+            create_usage_item("org1", "repo1", 5),
+            create_usage_item("org2", "repo1", 7),
+        ])
+        self.ledger.ingest(ENTERPRISE_NAME, date(2025, 2, 1), [create_usage_item("org1", "repo1", 100)])
+
+        self.assertEqual(12, minutes)
+        self.assertEqual(22, self.ledger.get_month_minutes(ENTERPRISE_NAME, date(2025, 1, 1)))
+        self.assertEqual(15, self.ledger.get_month_minutes(ENTERPRISE_NAME, date(2025, 1, 1), {"org1": ["repo1"]}))
+        self.assertEqual(100, self.ledger.get_month_minutes(ENTERPRISE_NAME, date(2025, 2, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
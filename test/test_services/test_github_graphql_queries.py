@@ -0,0 +1,37 @@
+import unittest
+
+from graphql import (FragmentDefinitionNode, FragmentSpreadNode,
+                     OperationDefinitionNode, Visitor, visit)
+
+from services.github_graphql_queries import GITHUB_GRAPHQL_QUERIES
+
+
+class FragmentSpreadCollector(Visitor):
+    def __init__(self):
+        super().__init__()
+        self.names = set()
+
+    def enter_fragment_spread(self, node: FragmentSpreadNode, *_):
+        self.names.add(node.name.value)
+
+
+class TestGithubGraphQLQueries(unittest.TestCase):
+    def test_each_query_has_one_operation(self):
+        for name, document in GITHUB_GRAPHQL_QUERIES.items():
+            with self.subTest(name):
+                operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+                self.assertEqual(1, len(operations))
+
+    def test_each_query_defines_exactly_the_fragments_it_spreads(self):
+        # GitHub rejects a query with an unknown or unused fragment
+        for name, document in GITHUB_GRAPHQL_QUERIES.items():
+            with self.subTest(name):
+                collector = FragmentSpreadCollector()
+                visit(document, collector)
+                defined = [d.name.value for d in document.definitions if isinstance(d, FragmentDefinitionNode)]
+                self.assertEqual(len(defined), len(set(defined)))
+                self.assertEqual(collector.names, set(defined))
+
+
+if __name__ == "__main__":
+    unittest.main()
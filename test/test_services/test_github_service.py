@@ -1,6 +1,12 @@
+import asyncio
+import concurrent.futures
+import copy
+import os
+import tempfile
+import threading
 import unittest
-from datetime import datetime, timedelta, timezone
-from unittest.mock import MagicMock, Mock, call, patch
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, Mock, call, patch
 
 from freezegun import freeze_time
 from github import (Github, GithubException, RateLimitExceededException,
@@ -8,10 +14,19 @@ from github import (Github, GithubException, RateLimitExceededException,
 from github.NamedUser import NamedUser
 from github.Organization import Organization
 from github.Variable import Variable
-from gql.transport.exceptions import TransportServerError
-
+from gql import gql
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+from graphql import print_ast
+
+from clients.github_query_cost_tracker import get_query_label
+from clients.github_rate_limit_scheduler import (GithubTokenPool,
+                                                 RateLimitedAdapter)
+from clients.github_rest_cache import ConditionalRequestAdapter
+from services.audit_log_store import AuditLogStore
+from services.gha_usage_ledger import GhaUsageLedger
 from services.github_service import (
     GithubService, retries_github_rate_limit_exception_at_next_reset_once)
+from services.repository_inventory_store import RepositoryInventoryStore
 
 # pylint: disable=E1101
 
@@ -21,6 +36,14 @@ USER_ACCESS_REMOVED_ISSUE_TITLE = "User access removed, access is now via a team
 TEST_REPOSITORY = "moj-analytical-services/test_repository"
 
 
+def mock_graphql_session(github_service: GithubService, *pages: dict) -> MagicMock:
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=pages)
+    github_service.github_client_gql_api.connect_async = AsyncMock(return_value=session)
+    github_service.github_client_gql_api.close_async = AsyncMock()
+    return session
+
+
 class TestRetriesGithubRateLimitExceptionAtNextResetOnce(unittest.TestCase):
 
     def test_function_is_only_called_once_with_arguments(self):
@@ -33,6 +56,23 @@ class TestRetriesGithubRateLimitExceptionAtNextResetOnce(unittest.TestCase):
         mock_function.assert_has_calls(
             [call(mock_github_service, "test_arg")])
 
+    def test_queries_are_costed_against_decorated_method(self):
+        def get_team_names(_github_service):
+            return get_query_label(gql("query { viewer { login } }"))
+
+        mock_github_service = Mock(GithubService, github_client_core_api=Mock(Github))
+        self.assertEqual("get_team_names", retries_github_rate_limit_exception_at_next_reset_once(
+            get_team_names)(mock_github_service))
+
+    def test_holds_method_back_on_the_budget_of_the_resource_it_uses(self):
+        token_pool = Mock(GithubTokenPool)
+        mock_github_service = Mock(GithubService, github_token_pool=token_pool)
+
+        retries_github_rate_limit_exception_at_next_reset_once(Mock())(mock_github_service)
+        retries_github_rate_limit_exception_at_next_reset_once(resource="graphql")(Mock())(mock_github_service)
+
+        self.assertEqual([call("core", cost=0), call("graphql", cost=0)], token_pool.acquire.call_args_list)
+
     @freeze_time("2023-02-01")
     def test_function_is_called_twice_when_rate_limit_exception_raised_once(self):
         mock_function = Mock(
@@ -87,6 +127,39 @@ class TestRetriesGithubRateLimitExceptionAtNextResetOnce(unittest.TestCase):
                               mock_function), mock_github_service,
                           "test_arg")
 
+    @freeze_time("2023-02-01")
+    @patch("services.github_service.sleep")
+    def test_waits_for_reset_from_exception_headers_without_requesting_rate_limit(self, mock_sleep):
+        reset = datetime.now(timezone.utc).timestamp() + 100
+        mock_function = Mock(side_effect=[
+            RateLimitExceededException(403, {}, {"x-ratelimit-reset": str(int(reset))}), Mock()])
+        mock_github_client = Mock(Github)
+        mock_github_service = Mock(
+            GithubService, github_client_core_api=mock_github_client)
+        retries_github_rate_limit_exception_at_next_reset_once(
+            mock_function)(mock_github_service, "test_arg")
+        mock_sleep.assert_called_once_with(105)
+        mock_github_client.get_rate_limit.assert_not_called()
+
+    @freeze_time("2023-02-01")
+    @patch("services.github_service.sleep")
+    def test_waits_for_reset_known_to_token_pool_without_requesting_rate_limit(self, mock_sleep):
+        mock_function = Mock(side_effect=[TransportServerError(Mock(), Mock()), Mock()])
+        mock_github_client = Mock(Github)
+        token_pool = GithubTokenPool(["token"])
+        token_pool.update_from_headers("token", {
+            "x-ratelimit-resource": "graphql",
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": "4000",
+            "x-ratelimit-reset": str(int(datetime.now(timezone.utc).timestamp()) + 60),
+        })
+        mock_github_service = Mock(
+            GithubService, github_client_core_api=mock_github_client, github_token_pool=token_pool)
+        retries_github_rate_limit_exception_at_next_reset_once(
+            mock_function)(mock_github_service, "test_arg")
+        mock_sleep.assert_called_once_with(65)
+        mock_github_client.get_rate_limit.assert_not_called()
+
 
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__")
@@ -109,6 +182,88 @@ class TestGithubServiceInit(unittest.TestCase):
         self.assertEqual(ENTERPRISE_NAME,
                          github_service.enterprise_name)
 
+    def test_mounts_rate_limited_adapter_without_rest_cache_by_default(self, mock_github_client_rest_api,
+                                                                       _mock_github_client_core_api,
+                                                                       _mock_github_client_gql_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        adapter = mock_github_client_rest_api.return_value.mount.call_args.args[1]
+        self.assertNotIsInstance(adapter, ConditionalRequestAdapter)
+        self.assertIsInstance(adapter, RateLimitedAdapter)
+        self.assertIs(github_service.github_token_pool, adapter.token_pool)
+
+    def test_mounts_rest_cache_when_cache_dir_given(self, mock_github_client_rest_api, _mock_github_client_core_api,
+                                                    _mock_github_client_gql_api):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            GithubService("", ORGANISATION_NAME, rest_cache_dir=cache_dir)
+        mount_call = mock_github_client_rest_api.return_value.mount.call_args
+        self.assertEqual("https://api.github.com/", mount_call.args[0])
+        self.assertIsInstance(mount_call.args[1], ConditionalRequestAdapter)
+        self.assertIsNotNone(mount_call.args[1].token_pool)
+
+    def test_sets_up_token_pool_from_several_tokens(self, _mock_github_client_rest_api, mock_github_client_core_api,
+                                                    _mock_github_client_gql_api):
+        github_service = GithubService(["token1", "token2"], ORGANISATION_NAME)
+        self.assertEqual(["token1", "token2"], github_service.github_token_pool.tokens)
+        mock_github_client_core_api.assert_has_calls([
+            call(Github, "token1"),
+            call(Github, "token2")
+        ])
+
+    def test_sizes_rest_connection_pool_to_concurrency(self, mock_github_client_rest_api, _mock_github_client_core_api,
+                                                       _mock_github_client_gql_api):
+        GithubService("", ORGANISATION_NAME)
+        adapter = mock_github_client_rest_api.return_value.mount.call_args.args[1]
+        self.assertEqual(GithubService.GITHUB_CONNECTION_POOL_SIZE, adapter._pool_maxsize)
+
+    def test_core_api_client_is_per_thread(self, _mock_github_client_rest_api, mock_github_client_core_api,
+                                           _mock_github_client_gql_api):
+        mock_github_client_core_api.side_effect = lambda *_, **__: MagicMock()
+        github_service = GithubService("", ORGANISATION_NAME)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            worker_client = executor.submit(lambda: github_service.github_client_core_api).result()
+        self.assertIs(github_service.github_client_core_api, github_service.github_client_core_api)
+        self.assertIsNot(github_service.github_client_core_api, worker_client)
+
+    def test_services_share_the_query_cost_tracker_of_the_process(self, _mock_github_client_rest_api,
+                                                                  _mock_github_client_core_api,
+                                                                  _mock_github_client_gql_api):
+        self.assertIs(GithubService("", ORGANISATION_NAME).github_query_cost_tracker,
+                      GithubService("", ORGANISATION_NAME).github_query_cost_tracker)
+
+    def test_object_cache_is_per_thread(self, _mock_github_client_rest_api, _mock_github_client_core_api,
+                                        _mock_github_client_gql_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            worker_cache = executor.submit(lambda: github_service.github_object_cache).result()
+        self.assertIs(github_service.github_object_cache, github_service.github_object_cache)
+        self.assertIsNot(github_service.github_object_cache, worker_cache)
+
+    @freeze_time("2023-02-01")
+    def test_core_api_uses_client_of_token_with_most_budget(self, _mock_github_client_rest_api,
+                                                            mock_github_client_core_api, _mock_github_client_gql_api):
+        reset = int(datetime.now(timezone.utc).timestamp()) + 3600
+        low_budget_client = MagicMock(_Github__requester=MagicMock(
+            rate_limiting=(100, 5000), rate_limiting_resettime=reset))
+        high_budget_client = MagicMock(_Github__requester=MagicMock(
+            rate_limiting=(4000, 5000), rate_limiting_resettime=reset))
+        mock_github_client_core_api.side_effect = [low_budget_client, high_budget_client]
+        github_service = GithubService(["token1", "token2"], ORGANISATION_NAME)
+        self.assertIs(high_budget_client, github_service.github_client_core_api)
+
+    @freeze_time("2023-02-01")
+    def test_core_api_does_not_fetch_rate_limit_of_unused_clients(self, _mock_github_client_rest_api,
+                                                                  mock_github_client_core_api,
+                                                                  _mock_github_client_gql_api):
+        reset = int(datetime.now(timezone.utc).timestamp()) + 3600
+        used_client = MagicMock(_Github__requester=MagicMock(rate_limiting=(100, 5000), rate_limiting_resettime=reset))
+        unused_client = MagicMock(_Github__requester=MagicMock(rate_limiting=(-1, -1), rate_limiting_resettime=0))
+        mock_github_client_core_api.side_effect = [used_client, unused_client]
+        github_service = GithubService(["token1", "token2"], ORGANISATION_NAME)
+
+        self.assertIs(unused_client, github_service.github_client_core_api)
+        used_client.get_rate_limit.assert_not_called()
+        unused_client.get_rate_limit.assert_not_called()
+
 
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
@@ -180,7 +335,43 @@ class TestGithubServiceAddAllUsersToTeam(unittest.TestCase):
         github_service = GithubService("", ORGANISATION_NAME)
         github_service.add_all_users_to_team("test_team_name")
         mock_team.assert_has_calls(
-            [call.add_membership(user_3), call.add_membership(user_4)])
+            [call.add_membership(user_3), call.add_membership(user_4)], any_order=True)
+
+    def test_reports_counts_of_users_added(self, mock_github_client_core_api, mock_github_client_gql_api):
+        user_1 = self.__create_user("user_1")
+        user_2 = self.__create_user("user_2")
+        user_3 = self.__create_user("user_3")
+        mock_github_client_gql_api.return_value.execute.return_value = {
+            "organization": {"team": {"databaseId": 1}}}
+        mock_github_client_core_api.return_value.get_organization().get_members.return_value = [
+            user_1, user_2, user_3
+        ]
+        mock_team = mock_github_client_core_api.return_value.get_organization().get_team()
+        mock_team.get_members.return_value = [user_1]
+        mock_team.add_membership.side_effect = [None, GithubException(422, "Validation Failed")]
+
+        with self.assertLogs(level="ERROR") as logs:
+            report = GithubService("", ORGANISATION_NAME).add_all_users_to_team("test_team_name")
+
+        self.assertIn("Could not add", logs.output[0])
+        self.assertEqual(3, report["organisation_members"])
+        self.assertEqual(1, report["team_members"])
+        self.assertEqual(1, report["users_added"])
+        self.assertEqual(1, report["users_failed"])
+
+    def test_compares_users_by_login(self, mock_github_client_core_api, mock_github_client_gql_api):
+        mock_github_client_gql_api.return_value.execute.return_value = {
+            "organization": {"team": {"databaseId": 1}}}
+        mock_github_client_core_api.return_value.get_organization().get_members.return_value = [
+            Mock(NamedUser, login="user_1"), Mock(NamedUser, login="user_2")
+        ]
+        mock_team = mock_github_client_core_api.return_value.get_organization().get_team()
+        mock_team.get_members.return_value = [Mock(NamedUser, login="user_1")]
+
+        GithubService("", ORGANISATION_NAME).add_all_users_to_team("test_team_name")
+
+        mock_team.add_membership.assert_called_once()
+        self.assertEqual("user_2", mock_team.add_membership.call_args.args[0].login)
 
     def test_adds_no_users_when_all_user_already_exist(self, mock_github_client_core_api, mock_github_client_gql_api):
         user_1 = self.__create_user("user_1")
@@ -384,6 +575,84 @@ class TestGithubServiceGetRepositoryDirectUsers(unittest.TestCase):
         self.assertRaises(
             ConnectionError, github_service.get_repository_direct_users, "test_repository")
 
+    def test_fetches_repository_once_across_calls(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.get_repository_direct_users("test_repository")
+        github_service.get_repository_collaborators("test_repository")
+        github_service.github_client_core_api.get_repo.assert_called_once_with(TEST_REPOSITORY)
+
+
+def create_collaborators_page(logins: list[str], end_cursor: str | None = None) -> dict:
+    return {
+        "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+        "edges": [{"node": {"login": login}} for login in logins]
+    }
+
+
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("github.Github.__new__", new=MagicMock)
+class TestGithubServiceGetRepositoriesCollaborators(unittest.TestCase):
+
+    def test_maps_each_repository_to_its_direct_users(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        session = mock_graphql_session(github_service, {
+            "repo0": {"collaborators": create_collaborators_page(["User1", "user2"])},
+            "repo1": {"collaborators": create_collaborators_page([])},
+        })
+        self.assertEqual({"repo1": ["user1", "user2"], "repo2": []},
+                         github_service.get_repositories_direct_users(["repo1", "repo2"]))
+        query = session.execute.call_args.args[0]
+        self.assertIn("affiliation: DIRECT", print_ast(query))
+        self.assertEqual({"organisation_name": ORGANISATION_NAME, "repo0": "repo1", "cursor0": None,
+                          "repo1": "repo2", "cursor1": None}, session.execute.call_args.kwargs["variable_values"])
+        github_service.github_client_core_api.get_repo.assert_not_called()
+
+    def test_pages_outside_collaborators_of_repositories_with_more(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        session = mock_graphql_session(
+            github_service,
+            {"repo0": {"collaborators": create_collaborators_page(["user1"], "cursor1")}},
+            {"repo0": {"collaborators": create_collaborators_page(["user2"])}},
+        )
+        self.assertEqual({"repo1": ["user1", "user2"]}, github_service.get_repositories_collaborators(["repo1"]))
+        self.assertIn("affiliation: OUTSIDE", print_ast(session.execute.call_args.args[0]))
+        self.assertEqual("cursor1", session.execute.call_args.kwargs["variable_values"]["cursor0"])
+
+    def test_reads_repositories_in_concurrent_batches(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.GITHUB_GQL_REPOSITORY_BATCH_SIZE = 2
+        github_service.GITHUB_GQL_MAX_CONCURRENT_BATCHES = 2
+        in_flight = []
+        most_in_flight = []
+
+        async def execute(_query, variable_values):
+            in_flight.append(variable_values)
+            most_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(variable_values)
+            return {
+                f"repo{index}": {"collaborators": create_collaborators_page([f"{variable_values[f'repo{index}']}_user"])}
+                for index in range(2) if f"repo{index}" in variable_values
+            }
+
+        session = mock_graphql_session(github_service)
+        session.execute.side_effect = execute
+        repository_names = [f"repository{index}" for index in range(5)]
+        collaborators = github_service.get_repositories_collaborators(repository_names)
+        self.assertEqual({name: [f"{name}_user"] for name in repository_names}, collaborators)
+        self.assertEqual(3, session.execute.await_count)
+        self.assertEqual(2, max(most_in_flight))
+
+    def test_maps_missing_repositories_to_no_collaborators(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        session = mock_graphql_session(github_service)
+        session.execute.side_effect = TransportQueryError(
+            "not found", errors=[{"type": "NOT_FOUND"}],
+            data={"repo0": None, "repo1": {"collaborators": create_collaborators_page(["user1"])}})
+        self.assertEqual({"deleted": [], "repo1": ["user1"]},
+                         github_service.get_repositories_direct_users(["deleted", "repo1"]))
+
 
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__")
@@ -417,6 +686,56 @@ class TestGithubServiceGetPaginatedListOfRepositoriesPerTopic(unittest.TestCase)
             ValueError, github_service.get_paginated_list_of_repositories_per_topic, "standards-compliant", "test_after_cursor", 101)
 
 
+def count_repositories_created_in(created_dates: list[date]):
+    def execute(_query, variable_values):
+        search_query = variable_values["the_query"]
+        if " created:" not in search_query:
+            return {"search": {"repositoryCount": len(created_dates)}}
+        start, end = search_query.split(" created:")[1].split("..")
+        count = len([
+            created_date for created_date in created_dates
+            if date.fromisoformat(start) <= created_date and (end == "*" or created_date <= date.fromisoformat(end))
+        ])
+        return {"search": {"repositoryCount": count}}
+    return execute
+
+
+@freeze_time("2024-01-01")
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("github.Github.__new__", new=MagicMock)
+class TestGithubServicePlanRepositorySearchShards(unittest.TestCase):
+    def test_does_not_split_search_under_cap(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.side_effect = count_repositories_created_in([date(2020, 1, 1)])
+        self.assertEqual(["is:public"], github_service.plan_repository_search_shards("is:public"))
+
+    def test_splits_by_created_date_until_each_shard_is_under_cap(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.GITHUB_SEARCH_RESULT_CAP = 2
+        created_dates = [date(2015, 1, 1), date(2018, 6, 1), date(2018, 6, 2), date(2023, 12, 31), date(2024, 1, 1)]
+        github_service.github_client_gql_api.execute.side_effect = count_repositories_created_in(created_dates)
+
+        shards = github_service.plan_repository_search_shards("is:public")
+
+        counts = [
+            github_service.github_client_gql_api.execute.side_effect(None, {"the_query": shard})["search"]["repositoryCount"]
+            for shard in shards
+        ]
+        self.assertTrue(all(count <= 2 for count in counts))
+        self.assertEqual(5, sum(counts))
+        self.assertTrue(any(shard.endswith("..*") for shard in shards))
+
+    def test_keeps_single_day_over_cap(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.GITHUB_SEARCH_RESULT_CAP = 1
+        github_service.github_client_gql_api.execute.side_effect = count_repositories_created_in(
+            [date(2020, 1, 1), date(2020, 1, 1)])
+
+        self.assertEqual(["is:public created:2020-01-01..2020-01-01"],
+                         github_service.plan_repository_search_shards("is:public"))
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__", new=MagicMock)
@@ -444,9 +763,7 @@ class TestGithubServiceGetTeamRepositoryNames(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_team_repositories = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_repository_names("some-team")
         self.assertEqual(len(repos), 1)
         self.assertEqual(repos[0], "test_repository")
@@ -454,9 +771,7 @@ class TestGithubServiceGetTeamRepositoryNames(unittest.TestCase):
     def test_nothing_to_return(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["team"]["repositories"]["edges"] = None
-        github_service.get_paginated_list_of_team_repositories = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_repository_names("some-team")
         self.assertEqual(len(repos), 0)
 
@@ -486,19 +801,31 @@ class TestGithubServiceGetTeamNames(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_team_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_names()
         self.assertEqual(len(repos), 1)
         self.assertEqual(repos[0], "test_team")
 
+    def test_returns_teams_from_every_page_over_one_session(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        first_page = {
+            "organization": {
+                "teams": {
+                    "edges": [{"node": {"slug": "first_team"}}],
+                    "pageInfo": {"hasNextPage": True, "endCursor": "first_cursor"},
+                }
+            }
+        }
+        session = mock_graphql_session(github_service, first_page, self.return_data)
+        teams = github_service.get_team_names()
+        self.assertEqual(teams, ["first_team", "test_team"])
+        self.assertEqual(session.execute.call_args_list[1].kwargs["variable_values"]["after_cursor"], "first_cursor")
+        github_service.github_client_gql_api.connect_async.assert_awaited_once()
+
     def test_nothing_to_return(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["teams"]["edges"] = None
-        github_service.get_paginated_list_of_team_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_names()
         self.assertEqual(len(repos), 0)
 
@@ -530,9 +857,7 @@ class TestGithubServiceGetTeamUserNames(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_team_user_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_user_names("some-team")
         self.assertEqual(len(repos), 1)
         self.assertEqual(repos[0], "test_person")
@@ -540,9 +865,7 @@ class TestGithubServiceGetTeamUserNames(unittest.TestCase):
     def test_nothing_to_return(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["team"]["members"]["edges"] = None
-        github_service.get_paginated_list_of_team_user_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_team_user_names("some-team")
         self.assertEqual(len(repos), 0)
 
@@ -575,9 +898,7 @@ class TestGithubServiceCheckCircleCIConfigInRepos(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_circleci_config_check = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.check_circleci_config_in_repos()
         self.assertEqual(len(repos), 1)
         self.assertEqual(repos[0], "test_repository")
@@ -585,18 +906,14 @@ class TestGithubServiceCheckCircleCIConfigInRepos(unittest.TestCase):
     def test_no_circleci_config(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["repositories"]["edges"][0]["node"]["object"] = None
-        github_service.get_paginated_circleci_config_check = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.check_circleci_config_in_repos()
         self.assertEqual(len(repos), 0)
 
     def test_nothing_to_return(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["repositories"]["edges"] = None
-        github_service.get_paginated_circleci_config_check = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.check_circleci_config_in_repos()
         self.assertEqual(len(repos), 0)
 
@@ -675,9 +992,7 @@ class TestGithubServiceGetOrgRepoNames(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_org_repository_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_org_repo_names()
         self.assertEqual(len(repos), 1)
         self.assertEqual(repos[0], "test_repository")
@@ -686,9 +1001,7 @@ class TestGithubServiceGetOrgRepoNames(unittest.TestCase):
         github_service = GithubService("", ORGANISATION_NAME)
 
         self.return_data["organization"]["repositories"]["edges"][0]["node"]["isDisabled"] = True
-        github_service.get_paginated_list_of_org_repository_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_org_repo_names()
         self.assertEqual(len(repos), 0)
         self.return_data["organization"]["repositories"]["edges"][0]["node"]["isDisabled"] = False
@@ -696,9 +1009,7 @@ class TestGithubServiceGetOrgRepoNames(unittest.TestCase):
     def test_nothing_to_return(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["repositories"]["edges"] = None
-        github_service.get_paginated_list_of_org_repository_names = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         repos = github_service.get_org_repo_names()
         self.assertEqual(len(repos), 0)
 
@@ -765,12 +1076,7 @@ class TestGithubServiceGetActiveReposAndOutsideCollaborators(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_unlocked_unarchived_repos_and_their_first_100_outside_collaborators = MagicMock(
-            return_value=self.return_data
-        )
-        github_service.get_outside_collaborators_login_names = MagicMock(
-            return_value=self.all_outside_collaborators
-        )
+        mock_graphql_session(github_service, self.return_data)
         active_repos_and_ocs = github_service.get_active_repos_and_outside_collaborators()
         response = [
             {'repository': 'repo1', 'public': False, 'outside_collaborators': ['outside_collab_1', 'outside_collab_2']},
@@ -782,12 +1088,7 @@ class TestGithubServiceGetActiveReposAndOutsideCollaborators(unittest.TestCase):
     def test_ignores_disabled_repo_outside_collaborators(self):
         github_service = GithubService("", ORGANISATION_NAME)
         self.return_data["organization"]["repositories"]["nodes"][1]["isDisabled"] = True
-        github_service.get_paginated_list_of_unlocked_unarchived_repos_and_their_first_100_outside_collaborators = MagicMock(
-            return_value=self.return_data
-        )
-        github_service.get_outside_collaborators_login_names = MagicMock(
-            return_value=self.all_outside_collaborators
-        )
+        mock_graphql_session(github_service, self.return_data)
         active_repos_and_ocs = github_service.get_active_repos_and_outside_collaborators()
         response = [
             {'repository': 'repo1', 'public': False, 'outside_collaborators': ['outside_collab_1', 'outside_collab_2']}
@@ -795,17 +1096,68 @@ class TestGithubServiceGetActiveReposAndOutsideCollaborators(unittest.TestCase):
         self.assertEqual(len(active_repos_and_ocs), 1)
         self.assertEqual(active_repos_and_ocs, response)
 
-    def test_outside_collaborators_has_next_page_raises_error(self):
-        github_service = GithubService("", ORGANISATION_NAME)
-        self.return_data["organization"]["repositories"]["nodes"][1]["collaborators"]["pageInfo"]["hasNextPage"] = True
-        github_service.get_paginated_list_of_unlocked_unarchived_repos_and_their_first_100_outside_collaborators = MagicMock(
-            return_value=self.return_data
-        )
-        github_service.get_outside_collaborators_login_names = MagicMock(
-            return_value=self.all_outside_collaborators
-        )
-        with self.assertRaises(ValueError):
-            github_service.get_active_repos_and_outside_collaborators()
+    def test_pages_outside_collaborators_of_repos_with_more_than_one_page(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        self.return_data["organization"]["repositories"]["nodes"][1]["collaborators"]["pageInfo"] = {
+            "hasNextPage": True, "endCursor": "collaborators_cursor_1"}
+        collaborator_pages = [
+            {"repo0": {"collaborators": {
+                "pageInfo": {"hasNextPage": True, "endCursor": "collaborators_cursor_2"},
+                "edges": [{"node": {"login": "outside_collab_4"}}]}}},
+            {"repo0": {"collaborators": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "edges": [{"node": {"login": "outside_collab_5"}}]}}},
+        ]
+
+        def execute(_query, variable_values):
+            if "repo0" in variable_values:
+                return collaborator_pages.pop(0)
+            return self.return_data
+
+        session = mock_graphql_session(github_service)
+        session.execute.side_effect = execute
+        active_repos_and_ocs = github_service.get_active_repos_and_outside_collaborators()
+        self.assertEqual(active_repos_and_ocs[1], {
+            'repository': 'repo2', 'public': True,
+            'outside_collaborators': ['outside_collab_3', 'outside_collab_4', 'outside_collab_5']
+        })
+        follow_up_variables = [call_args.kwargs["variable_values"] for call_args in session.execute.call_args_list[1:]]
+        self.assertEqual(follow_up_variables, [
+            {"organisation_name": ORGANISATION_NAME, "repo0": "repo2", "cursor0": "collaborators_cursor_1"},
+            {"organisation_name": ORGANISATION_NAME, "repo0": "repo2", "cursor0": "collaborators_cursor_2"},
+        ])
+
+    def test_streams_repository_pages_while_paging_outside_collaborators(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        first_page = copy.deepcopy(self.return_data)
+        first_page["organization"]["repositories"]["pageInfo"]["hasNextPage"] = True
+        first_page["organization"]["repositories"]["nodes"][0]["collaborators"]["pageInfo"] = {
+            "hasNextPage": True, "endCursor": "collaborators_cursor_1"}
+        second_page = copy.deepcopy(self.return_data)
+        for repo in second_page["organization"]["repositories"]["nodes"]:
+            repo["name"] += "_next"
+        events = []
+
+        async def execute(_query, variable_values):
+            if "repo0" in variable_values:
+                events.append("collaborators requested")
+                return {"repo0": {"collaborators": {
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "edges": [{"node": {"login": "outside_collab_4"}}]}}}
+            await asyncio.sleep(0.01)
+            events.append(f"repositories after {variable_values['after_cursor']} returned")
+            return first_page if variable_values["after_cursor"] is None else second_page
+
+        session = mock_graphql_session(github_service)
+        session.execute.side_effect = execute
+        active_repos_and_ocs = github_service.get_active_repos_and_outside_collaborators()
+        self.assertEqual(events, [
+            "repositories after None returned", "collaborators requested",
+            "repositories after repo_1_end_cursor returned"
+        ])
+        self.assertEqual(len(active_repos_and_ocs), 4)
+        self.assertEqual(active_repos_and_ocs[0]["outside_collaborators"],
+                         ['outside_collab_1', 'outside_collab_2', 'outside_collab_4'])
 
 
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
@@ -832,43 +1184,68 @@ class TestGithubServiceFetchAllRepositories(unittest.TestCase):
             }
         }
 
-    def test_returning_correct_data(self):
+    @staticmethod
+    def create_github_service() -> GithubService:
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_repositories_per_type = MagicMock(
-            return_value=self.return_data
-        )
+        github_service.github_client_gql_api.execute.return_value = {"search": {"repositoryCount": 1}}
+        return github_service
+
+    def test_returning_correct_data(self):
+        github_service = self.create_github_service()
+        mock_graphql_session(github_service, *[self.return_data] * 3)
         repos = github_service.fetch_all_repositories_in_org()
         self.assertEqual(len(repos), 3)
         self.assertEqual(repos[0]["name"], "test_repository")
         self.assertFalse("unexpected_data" in repos[0])
 
     def test_nothing_to_return(self):
-        github_service = GithubService("", ORGANISATION_NAME)
+        github_service = self.create_github_service()
         self.return_data["search"]["repos"] = None
-        github_service.get_paginated_list_of_repositories_per_type = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, *[self.return_data] * 3)
         repos = github_service.fetch_all_repositories_in_org()
         self.assertEqual(len(repos), 0)
 
     def test_ignore_locked_repo(self):
-        github_service = GithubService("", ORGANISATION_NAME)
+        github_service = self.create_github_service()
         self.return_data["search"]["repos"][0]["repo"]["isLocked"] = True
-        github_service.get_paginated_list_of_repositories_per_type = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, *[self.return_data] * 3)
         repos = github_service.fetch_all_repositories_in_org()
         self.assertEqual(len(repos), 0)
 
     def test_ignore_disabled_repo(self):
-        github_service = GithubService("", ORGANISATION_NAME)
+        github_service = self.create_github_service()
         self.return_data["search"]["repos"][0]["repo"]["isDisabled"] = True
-        github_service.get_paginated_list_of_repositories_per_type = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, *[self.return_data] * 3)
         repos = github_service.fetch_all_repositories_in_org()
         self.assertEqual(len(repos), 0)
 
+    def test_streams_each_visibility_over_one_session(self):
+        github_service = self.create_github_service()
+        session = mock_graphql_session(github_service, *[self.return_data] * 3)
+
+        repos = github_service.stream_all_repositories_in_org()
+        self.assertEqual("test_repository", next(repos)["name"])
+        self.assertEqual(2, len(list(repos)))
+
+        github_service.github_client_gql_api.connect_async.assert_awaited_once()
+        github_service.github_client_gql_api.close_async.assert_awaited_once()
+        self.assertEqual(
+            {f"org:{ORGANISATION_NAME}, archived:false, is:{repo_type}" for repo_type in ["public", "private", "internal"]},
+            {execute_call.kwargs["variable_values"]["the_query"] for execute_call in session.execute.call_args_list})
+
+    @patch.object(GithubService, "plan_repository_search_shards")
+    def test_dedupes_repositories_found_by_more_than_one_shard(self, mock_plan_repository_search_shards):
+        mock_plan_repository_search_shards.side_effect = lambda search_query: [
+            f"{search_query} created:2008-01-01..2015-12-31", f"{search_query} created:2016-01-01..*"]
+        github_service = self.create_github_service()
+        session = mock_graphql_session(github_service, *[self.return_data] * 6)
+
+        repos = github_service.fetch_all_repositories_in_org()
+
+        # One copy for each of the public, private and internal searches
+        self.assertEqual(3, len(repos))
+        self.assertEqual(6, session.execute.await_count)
+
 
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
@@ -990,6 +1367,75 @@ class TestGithubServiceGetUserOrgEmailAddress(unittest.TestCase):
         self.assertEqual(response, None)
 
 
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__")
+@patch("github.Github.__new__", new=MagicMock)
+class TestGithubServiceGetUserOrgEmailAddresses(unittest.TestCase):
+    @staticmethod
+    def create_response(*emails: list[str] | None, cost: int = 1) -> dict:
+        response = {"rateLimit": {"cost": cost, "remaining": 4000, "resetAt": "2023-02-01T01:00:00Z"}}
+        for index, user_emails in enumerate(emails):
+            response[f"user{index}"] = None if user_emails is None else {
+                "organizationVerifiedDomainEmails": user_emails}
+        return response
+
+    def test_returns_emails_of_all_users_in_one_query(self, mock_gql_client):
+        mock_gql_client.return_value.execute.return_value = self.create_response(["email1"], [], ["email3", "other"])
+        github_service = GithubService("", ORGANISATION_NAME)
+        response = github_service.get_user_org_email_addresses(["user1", "user2", "user3"])
+        self.assertEqual({"user1": "email1", "user2": None, "user3": "email3"}, response)
+        github_service.github_client_gql_api.execute.assert_called_once()
+        self.assertEqual({"organisation_name": ORGANISATION_NAME, "user0": "user1", "user1": "user2",
+                          "user2": "user3"},
+                         github_service.github_client_gql_api.execute.call_args.kwargs["variable_values"])
+
+    def test_splits_users_into_batches(self, mock_gql_client):
+        mock_gql_client.return_value.execute.side_effect = [
+            self.create_response(["email1"], ["email2"]), self.create_response(["email3"])]
+        github_service = GithubService("", ORGANISATION_NAME)
+        response = github_service.get_user_org_email_addresses(["user1", "user2", "user3"], batch_size=2)
+        self.assertEqual({"user1": "email1", "user2": "email2", "user3": "email3"}, response)
+        self.assertEqual(2, github_service.github_client_gql_api.execute.call_count)
+
+    def test_shrinks_batches_when_query_costs_more_than_one_point(self, mock_gql_client):
+        mock_gql_client.return_value.execute.side_effect = [
+            self.create_response(["email1"], ["email2"], ["email3"], ["email4"], cost=2),
+            self.create_response(["email5"], ["email6"])]
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.get_user_org_email_addresses([f"user{index}" for index in range(1, 7)], batch_size=4)
+        self.assertEqual(
+            {"organisation_name": ORGANISATION_NAME, "user0": "user5", "user1": "user6"},
+            github_service.github_client_gql_api.execute.call_args.kwargs["variable_values"])
+
+    def test_halves_batch_when_query_times_out(self, mock_gql_client):
+        mock_gql_client.return_value.execute.side_effect = [
+            TransportServerError("Bad gateway", 502),
+            self.create_response(["email1"]),
+            self.create_response(["email2"])]
+        github_service = GithubService("", ORGANISATION_NAME)
+        response = github_service.get_user_org_email_addresses(["user1", "user2"])
+        self.assertEqual({"user1": "email1", "user2": "email2"}, response)
+
+    def test_maps_unknown_users_to_none(self, mock_gql_client):
+        mock_gql_client.return_value.execute.side_effect = TransportQueryError(
+            "Could not resolve to a User", errors=[{"type": "NOT_FOUND", "path": ["user1"]}],
+            data=self.create_response(["email1"], None))
+        github_service = GithubService("", ORGANISATION_NAME)
+        response = github_service.get_user_org_email_addresses(["user1", "user2"])
+        self.assertEqual({"user1": "email1", "user2": None}, response)
+
+    def test_raises_query_errors_for_a_single_user(self, mock_gql_client):
+        mock_gql_client.return_value.execute.side_effect = TransportQueryError(
+            "Something went wrong", errors=[{"type": "INTERNAL"}])
+        github_service = GithubService("", ORGANISATION_NAME)
+        self.assertRaises(TransportQueryError, github_service.get_user_org_email_addresses, ["user1"])
+
+    def test_returns_empty_dict_for_no_users(self, mock_gql_client):
+        github_service = GithubService("", ORGANISATION_NAME)
+        self.assertEqual({}, github_service.get_user_org_email_addresses([]))
+        mock_gql_client.return_value.execute.assert_not_called()
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__")
@@ -1107,6 +1553,61 @@ class TestDormantUser(unittest.TestCase):
         expected_url = f"https://api.github.com/enterprises/{ENTERPRISE_NAME}/audit-log?phrase=actor%3Asome-user"
         mock_get.assert_called_once_with(expected_url, timeout=10)
 
+    def test_stream_enterprise_audit_log_follows_next_links(self):
+        github_service = GithubService("", ORGANISATION_NAME, enterprise_name=ENTERPRISE_NAME)
+        next_url = f"https://api.github.com/enterprises/{ENTERPRISE_NAME}/audit-log?per_page=100&after=cursor1"
+        first_page = MagicMock(status_code=200, links={"next": {"url": next_url}})
+        first_page.json.return_value = [{"actor": "user1"}, {"actor": "user2"}]
+        last_page = MagicMock(status_code=200, links={})
+        last_page.json.return_value = [{"actor": "user3"}]
+        github_service.github_client_rest_api.get = MagicMock(side_effect=[first_page, last_page])
+
+        events = list(github_service.stream_enterprise_audit_log("created:>=2023-01-01"))
+
+        self.assertEqual(["user1", "user2", "user3"], [event["actor"] for event in events])
+        github_service.github_client_rest_api.get.assert_has_calls([
+            call(f"https://api.github.com/enterprises/{ENTERPRISE_NAME}/audit-log",
+                 params={"phrase": "created:>=2023-01-01", "per_page": 100}, timeout=10),
+            call(next_url, params=None, timeout=10),
+        ])
+
+    def test_stream_enterprise_audit_log_failure(self):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_rest_api.get = MagicMock(return_value=MagicMock(status_code=403))
+        with self.assertRaises(ValueError):
+            list(github_service.stream_enterprise_audit_log("created:>=2023-01-01"))
+
+    @patch.object(GithubService, "stream_enterprise_audit_log")
+    def test_get_last_audit_log_activity_dates(self, mock_stream_enterprise_audit_log):
+        mock_stream_enterprise_audit_log.return_value = iter([
+            {"actor": "User1", "@timestamp": datetime(2023, 1, 20).timestamp() * 1000.0},
+            {"actor": "user2", "@timestamp": datetime(2023, 1, 15).timestamp() * 1000.0},
+            {"actor": "user1", "@timestamp": datetime(2023, 1, 10).timestamp() * 1000.0},
+            {"@timestamp": datetime(2023, 1, 5).timestamp() * 1000.0},
+        ])
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        result = github_service.get_last_audit_log_activity_dates(datetime(2023, 1, 1))
+
+        self.assertEqual({"user1": datetime(2023, 1, 20), "user2": datetime(2023, 1, 15)}, result)
+        mock_stream_enterprise_audit_log.assert_called_once_with("created:>=2023-01-01")
+
+    @patch.object(GithubService, "is_user_dormant_since_date")
+    @patch.object(GithubService, "get_last_audit_log_activity_dates")
+    def test_check_dormant_users_scans_audit_log_once_for_many_users(
+            self, mock_get_last_audit_log_activity_dates, mock_is_user_dormant_since_date):
+        since_date = datetime(2023, 1, 1, 12)
+        mock_get_last_audit_log_activity_dates.return_value = {
+            "user1": datetime(2023, 1, 20), "user2": datetime(2023, 1, 1, 6)}
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.GITHUB_AUDIT_LOG_BULK_SCAN_MIN_USERS = 3
+
+        result = github_service.check_dormant_users_audit_activity_since_date(["User1", "user2", "user3"], since_date)
+
+        self.assertEqual(["user2", "user3"], result)
+        mock_get_last_audit_log_activity_dates.assert_called_once_with(since_date)
+        mock_is_user_dormant_since_date.assert_not_called()
+
     @patch('requests.get')
     def test_enterprise_audit_activity_for_user_failure(self, mock_get):
         # Mock `requests.get` to return a response with status code 404
@@ -1257,6 +1758,11 @@ class TestReportOnInactiveUsers(unittest.TestCase):
 
         self.inactivity_months = 18
 
+    def __serve_repositories(self, mock_github_client_core_api):
+        repositories = {f"{ORGANISATION_NAME}/{repo.name}": repo for repo in self.repositories}
+        mock_github_client_core_api.return_value.get_repo.side_effect = \
+            lambda full_name, **_: repositories[full_name]
+
     def test_identify_inactive_users_in_a_team(self, _mock_github_client_core_api):
 
         github_service = GithubService("", ORGANISATION_NAME)
@@ -1271,10 +1777,16 @@ class TestReportOnInactiveUsers(unittest.TestCase):
         self.assertEqual(2, len(inactive_users))
         self.assertEqual("user1", inactive_users[0].login)
 
-    def test_identify_no_inactive_users_in_a_team(self, _mock_github_client_core_api):
+    def test_identify_no_inactive_users_in_a_team(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
         self.commit = Mock()
+        self.commit.author.login = "user1"
         self.commit.commit.author.date = datetime.now()
-        self.repository1.get_commits.return_value = [self.commit]
+        commit_by_user2 = Mock()
+        commit_by_user2.author.login = "user2"
+        commit_by_user2.commit.author.date = datetime.now()
+        self.repository1.get_commits.return_value = [self.commit, commit_by_user2]
+        self.repository2.get_commits.return_value = []
 
         github_service = GithubService("", ORGANISATION_NAME)
         github_service._get_repositories_managed_by_team = Mock(
@@ -1299,6 +1811,117 @@ class TestReportOnInactiveUsers(unittest.TestCase):
         self.assertEqual(2, len(inactive_users))
         self.assertEqual("user1", inactive_users[0].login)
 
+    def test_identify_inactive_users_reads_each_repository_once(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
+        github_service = GithubService("", ORGANISATION_NAME)
+        self.repository1.get_commits.return_value = []
+        self.repository2.get_commits.return_value = []
+
+        github_service._identify_inactive_users(self.users, self.repositories, self.inactivity_months)
+
+        self.repository1.get_commits.assert_called_once()
+        self.repository2.get_commits.assert_called_once()
+
+    @freeze_time("2024-06-01")
+    def test_build_last_commit_index_keeps_latest_commit_per_author(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
+
+        def create_commit(login: str | None, commit_date: datetime) -> Mock:
+            commit = Mock()
+            commit.author = Mock(login=login) if login else None
+            commit.commit.author.date = commit_date
+            return commit
+
+        self.repository1.get_commits.return_value = [
+            create_commit("user1", datetime(2024, 5, 1, tzinfo=timezone.utc)),
+            create_commit("user2", datetime(2024, 3, 1, tzinfo=timezone.utc)),
+            create_commit(None, datetime(2024, 5, 1, tzinfo=timezone.utc)),
+        ]
+        self.repository2.get_commits.return_value = [
+            create_commit("user1", datetime(2024, 2, 1, tzinfo=timezone.utc)),
+            create_commit("user2", datetime(2024, 4, 1)),
+        ]
+        github_service = GithubService("", ORGANISATION_NAME)
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        last_commit_index = github_service.build_last_commit_index(["repo1", "repo2"], since)
+
+        self.assertEqual({
+            "user1": datetime(2024, 5, 1, tzinfo=timezone.utc),
+            "user2": datetime(2024, 4, 1, tzinfo=timezone.utc),
+        }, last_commit_index)
+        self.repository1.get_commits.assert_called_once_with(since=since)
+        mock_github_client_core_api.return_value.get_repo.assert_has_calls([
+            call(f"{ORGANISATION_NAME}/repo1", lazy=True), call(f"{ORGANISATION_NAME}/repo2", lazy=True)],
+            any_order=True)
+
+    def test_build_last_commit_index_treats_empty_repositories_as_having_no_commits(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
+        self.repository1.get_commits.side_effect = GithubException(status=409, data="Git Repository is empty.")
+        self.repository2.get_commits.return_value = []
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        last_commit_index = github_service.build_last_commit_index(["repo1", "repo2"], datetime.now())
+
+        self.assertEqual({}, last_commit_index)
+
+    def test_build_last_commit_index_fails_when_a_history_cannot_be_read(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
+        self.repository1.get_commits.side_effect = GithubException(status=500, data="Server Error")
+        self.repository2.get_commits.return_value = []
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        with self.assertLogs(level='ERROR') as cm:
+            self.assertRaises(GithubException, github_service.build_last_commit_index, ["repo1", "repo2"],
+                              datetime.now())
+
+        self.assertEqual("ERROR:root:An exception occurred while getting commits in repo repo1", cm.output[0])
+
+    def test_inactive_users_are_not_reported_when_a_history_cannot_be_read(self, mock_github_client_core_api):
+        self.__serve_repositories(mock_github_client_core_api)
+        self.repository1.get_commits.side_effect = ConnectionError
+        self.repository2.get_commits.return_value = []
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        self.assertRaises(ConnectionError, github_service._identify_inactive_users,
+                          self.users, self.repositories, self.inactivity_months)
+
+    def test_build_last_commit_index_reads_repositories_through_the_client_of_the_worker(
+            self, mock_github_client_core_api):
+        # Each get_repo call records the thread that created the client and the thread that called it
+        get_repo_threads = []
+
+        def create_client(*_, **__):
+            client = MagicMock()
+            client_thread = threading.get_ident()
+            client.get_repo.side_effect = lambda *_, **__: get_repo_threads.append(
+                (client_thread, threading.get_ident())) or Mock(get_commits=Mock(return_value=[]))
+            return client
+
+        mock_github_client_core_api.side_effect = create_client
+        github_service = GithubService("", ORGANISATION_NAME)
+
+        github_service.build_last_commit_index([f"repo{index}" for index in range(20)], datetime.now())
+
+        self.assertEqual(20, len(get_repo_threads))
+        for client_thread, calling_thread in get_repo_threads:
+            self.assertEqual(client_thread, calling_thread)
+            self.assertNotEqual(threading.get_ident(), calling_thread)
+
+    @freeze_time("2024-06-01")
+    def test_user_is_inactive_from_last_commit_index(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        last_commit_index = {"user1": datetime(2024, 5, 1, tzinfo=timezone.utc),
+                             "user2": datetime(2022, 5, 1, tzinfo=timezone.utc)}
+
+        self.assertFalse(github_service._is_user_inactive(
+            self.user1, self.repositories, self.inactivity_months, last_commit_index))
+        self.assertTrue(github_service._is_user_inactive(
+            self.user2, self.repositories, self.inactivity_months, last_commit_index))
+        self.assertTrue(github_service._is_user_inactive(
+            Mock(login="user3"), self.repositories, self.inactivity_months, last_commit_index))
+        self.repository1.get_commits.assert_not_called()
+
     def test_get_users_from_team_found(self, mock_github_client_core_api):
 
         mock_github_client_core_api.return_value.get_organization().get_members.return_value = [
@@ -1494,7 +2117,7 @@ class TestNewOwnerDetected(unittest.TestCase):
             }
         }
 
-        github_service.github_client_gql_api.execute.return_value = return_value
+        mock_graphql_session(github_service, return_value)
 
         result = github_service.audit_log_member_changes("2023-12-01")
 
@@ -1521,7 +2144,7 @@ class TestNewOwnerDetected(unittest.TestCase):
             }
         }
 
-        github_service.github_client_gql_api.execute.return_value = return_value
+        mock_graphql_session(github_service, return_value)
 
         result = github_service.check_for_audit_log_new_members("2023-12-01")
 
@@ -1535,6 +2158,17 @@ class TestNewOwnerDetected(unittest.TestCase):
         self.assertEqual(result[1]['userLogin'], 'new_member2')
 
 
+def create_repository_visibilities_page(repositories: list[tuple[str, str]]) -> dict:
+    return {
+        "organization": {
+            "repositories": {
+                "nodes": [{"name": name, "visibility": visibility} for name, visibility in repositories],
+                "pageInfo": {"hasNextPage": False, "endCursor": None}
+            }
+        }
+    }
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__")
@@ -1620,48 +2254,47 @@ class TestGHAMinutesQuotaOperations(unittest.TestCase):
 
         assert not mock_modify_gha_minutes_quota_threshold.called
 
-    def test_get_all_private_internal_repos_names(self,  _mock_github_client_rest_api, mock_github_client_core_api):
+    def test_get_all_private_internal_repos_names(self, _mock_github_client_rest_api, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        mock_graphql_session(github_service, create_repository_visibilities_page([
+            ("repo1", "INTERNAL"), ("repo2", "PRIVATE"), ("repo3", "PUBLIC")
+        ]))
 
-        def create_mock_repo(name: str, archived: bool, visibility: str, ):
-            mock_repo = MagicMock()
-            mock_repo.name = name
-            mock_repo.visibility = visibility
-            mock_repo.archived = archived
+        repos = github_service.get_all_private_internal_repos_names("test_org")
 
-            return mock_repo
+        self.assertEqual(repos, ["repo1", "repo2"])
 
+    def test_lists_billable_repositories_of_each_organisation_concurrently(self, _mock_github_client_rest_api,
+                                                                           _mock_github_client_core_api):
         github_service = GithubService("", ORGANISATION_NAME)
-        mock_org = MagicMock()
+        pages = {
+            "test_org1": create_repository_visibilities_page([("repo1", "PRIVATE"), ("repo2", "PUBLIC")]),
+            "test_org2": create_repository_visibilities_page([("repo1", "INTERNAL")]),
+        }
+        session = mock_graphql_session(github_service)
+        session.execute.side_effect = lambda query, variable_values: pages[variable_values["organisation_name"]]
 
-        mock_repos = [
-            create_mock_repo(name="repo1", archived=False, visibility="internal"),
-            create_mock_repo(name="repo2", archived=False, visibility="private"),
-            create_mock_repo(name="repo3", archived=False, visibility="public"),
-            create_mock_repo(name="repo4", archived=True, visibility="private")
-        ]
-        mock_github_client_core_api.return_value.get_organization.return_value = mock_org
-        mock_org.get_repos.return_value = mock_repos
-        repos = github_service.get_all_private_internal_repos_names("test_org")
+        repos = github_service.get_private_internal_repository_names_by_organisation(["test_org1", "test_org2"])
 
-        self.assertEqual(repos, ["repo1", "repo2"])
+        self.assertEqual({"test_org1": ["repo1"], "test_org2": ["repo1"]}, repos)
+        github_service.github_client_gql_api.connect_async.assert_awaited_once()
 
     @patch.object(GithubService, "get_all_organisations_in_enterprise")
-    @patch.object(GithubService, "get_all_private_internal_repos_names")
+    @patch.object(GithubService, "get_private_internal_repository_names_by_organisation")
     @patch("datetime.datetime")
     @patch.object(GithubService, "get_current_month_gha_minutes_for_enterprise")
     def test_calculate_total_minutes_enterprise(self, mock_get_current_month_gha_minutes_for_enterprise,
                                                 mock_datetime,
-                                                mock_get_all_private_internal_repos_names,
+                                                mock_get_private_internal_repository_names_by_organisation,
                                                 mock_get_all_organisations_in_enterprise,
                                                 _mock_github_client_rest_api,
                                                 _mock_github_client_core_api):
         github_service = GithubService("", ORGANISATION_NAME)
 
         mock_get_all_organisations_in_enterprise.return_value = ['test_org1', 'test_org2']
-        mock_repos = {
+        mock_get_private_internal_repository_names_by_organisation.return_value = {
             "test_org1": ["repo1", "repo2"],
             "test_org2": ["repo3"]}
-        mock_get_all_private_internal_repos_names.side_effect = lambda org: mock_repos[org]
         mock_datetime.now.return_value = datetime(2025, 1, 29)
         mock_get_current_month_gha_minutes_for_enterprise.return_value = {
             "usageItems": [
@@ -1686,20 +2319,21 @@ class TestGHAMinutesQuotaOperations(unittest.TestCase):
             github_service.calculate_total_minutes_enterprise(), 185)
 
     @patch.object(GithubService, "get_all_organisations_in_enterprise")
-    @patch.object(GithubService, "get_all_private_internal_repos_names")
+    @patch.object(GithubService, "get_private_internal_repository_names_by_organisation")
     @patch("datetime.datetime")
     @patch.object(GithubService, "get_current_month_gha_minutes_for_enterprise")
     @patch("logging.error")
     def test_calculate_total_minutes_enterprise_error_case(self, mock_logging_error,
                                                            mock_get_current_month_gha_minutes_for_enterprise,
-                                                           mock_datetime, mock_get_all_private_internal_repos_names,
+                                                           mock_datetime,
+                                                           mock_get_private_internal_repository_names_by_organisation,
                                                            mock_get_all_organisations_in_enterprise,
                                                            _mock_github_client_rest_api,
                                                            _mock_github_client_core_api):
         github_service = GithubService("", ORGANISATION_NAME)
 
         mock_get_all_organisations_in_enterprise.return_value = ['test_org1']
-        mock_get_all_private_internal_repos_names.return_value = ['repo1']
+        mock_get_private_internal_repository_names_by_organisation.return_value = {'test_org1': ['repo1']}
         mock_datetime.now.return_value = datetime(2025, 1, 29)
         mock_get_current_month_gha_minutes_for_enterprise.side_effect = Exception("Billing usage report error")
 
@@ -1710,6 +2344,41 @@ class TestGHAMinutesQuotaOperations(unittest.TestCase):
         mock_logging_error.assert_called_once()
         self.assertIn("Failed to retrieve or process billing data", mock_logging_error.call_args[0][0])
 
+    @freeze_time("2025-01-02 04:30")
+    @patch.object(GithubService, "get_all_organisations_in_enterprise")
+    @patch.object(GithubService, "get_private_internal_repository_names_by_organisation")
+    def test_calculate_total_minutes_enterprise_from_ledger(self, mock_get_private_internal_repository_names_by_organisation,
+                                                            mock_get_all_organisations_in_enterprise,
+                                                            mock_github_client_rest_api,
+                                                            _mock_github_client_core_api):
+        ledger = GhaUsageLedger(os.path.join(tempfile.mkdtemp(), "gha_usage.db"))
+        github_service = GithubService("", ORGANISATION_NAME, gha_usage_ledger=ledger)
+        mock_get_all_organisations_in_enterprise.return_value = ['test_org1']
+        mock_get_private_internal_repository_names_by_organisation.return_value = {'test_org1': ['repo1']}
+        usage_items = {
+            1: [{"product": "actions", "unitType": "Minutes", "sku": "Actions Linux", "quantity": 100,
+                 "organizationName": "test_org1", "repositoryName": "repo1"},
+                {"product": "actions", "unitType": "Minutes", "sku": "Actions Linux", "quantity": 50,
+                 "organizationName": "test_org1", "repositoryName": "public-repo"}],
+            2: [{"product": "actions", "unitType": "Minutes", "sku": "Actions Linux", "quantity": 20,
+                 "organizationName": "test_org1", "repositoryName": "repo1"}],
+        }
+        mock_github_client_rest_api.return_value.get.side_effect = lambda url, params, headers: MagicMock(
+            status_code=200, json=lambda: {"usageItems": usage_items[params["day"]]})
+
+        self.assertEqual(120, github_service.calculate_total_minutes_enterprise())
+
+        # Neither day is settled yet, so the second run fetches both again and takes the late reported usage
+        usage_items[2][0]["quantity"] = 30
+        self.assertEqual(130, github_service.calculate_total_minutes_enterprise())
+        self.assertEqual(4, mock_github_client_rest_api.return_value.get.call_count)
+        self.assertNotIn("hour", mock_github_client_rest_api.return_value.get.call_args.kwargs["params"])
+
+    def test_get_gha_usage_items_raises_on_error(self, mock_github_client_rest_api, _mock_github_client_core_api):
+        mock_github_client_rest_api.return_value.get.return_value = MagicMock(status_code=500)
+        github_service = GithubService("", ORGANISATION_NAME)
+        self.assertRaises(ValueError, github_service.get_gha_usage_items, date(2025, 1, 1))
+
     @patch.object(GithubService, "_get_repository_variable")
     @patch.object(GithubService, "reset_alerting_threshold_if_first_day_of_month")
     @patch.object(GithubService, "calculate_total_minutes_enterprise")
@@ -1796,19 +2465,36 @@ class TestGetOldPOCRepositories(unittest.TestCase):
 
         self.assertEqual(20, response)
 
+    @freeze_time("2024-10-24")
     @patch.object(GithubService, "calculate_repo_age")
-    @patch.object(GithubService, "get_paginated_list_of_repositories_per_topic")
-    def test_get_old_poc_repositories_if_exist(self, mock_get_paginated_list_of_repositories_per_topic, mock_calculate_repo_age, _mock_github_client_core_api):
-        mock_get_paginated_list_of_repositories_per_topic.return_value = {'search': {'repos': [{'repo': {'name': 'operations-engineering-metadata-poc', 'isDisabled': False, 'isLocked': False, 'hasIssuesEnabled': True, 'repositoryTopics': {'edges': [{'node': {'topic': {'name': 'operations-engineering'}}}, {'node': {'topic': {'name': 'poc'}}}]}, 'collaborators': {'totalCount': 0}}}, {'repo': {'name': 'operations-engineering-unit-test-generator-poc', 'isDisabled': False, 'isLocked': False, 'hasIssuesEnabled': True, 'repositoryTopics': {'edges': [{'node': {'topic': {'name': 'operations-engineering'}}}, {'node': {'topic': {'name': 'poc'}}}]}, 'collaborators': {'totalCount': 0}}},], 'pageInfo': {'hasNextPage': False, 'endCursor': 'Y3Vyc29yOjQ='}}}
-        mock_calculate_repo_age.return_value = 30
+    @patch.object(GithubService, "stream_repositories_per_topic")
+    def test_get_old_poc_repositories_if_exist(self, mock_stream_repositories_per_topic, mock_calculate_repo_age, _mock_github_client_core_api):
+        mock_stream_repositories_per_topic.return_value = iter([{'name': 'operations-engineering-metadata-poc', 'createdAt': '2024-09-24T00:00:00Z', 'isDisabled': False, 'isLocked': False, 'hasIssuesEnabled': True, 'repositoryTopics': {'edges': [{'node': {'topic': {'name': 'operations-engineering'}}}, {'node': {'topic': {'name': 'poc'}}}]}, 'collaborators': {'totalCount': 0}}, {'name': 'operations-engineering-unit-test-generator-poc', 'createdAt': '2024-08-25T00:00:00Z', 'isDisabled': False, 'isLocked': False, 'hasIssuesEnabled': True, 'repositoryTopics': {'edges': [{'node': {'topic': {'name': 'operations-engineering'}}}, {'node': {'topic': {'name': 'poc'}}}]}, 'collaborators': {'totalCount': 0}}, {'name': 'new-poc', 'createdAt': '2024-10-20T00:00:00Z', 'isDisabled': False, 'isLocked': False, 'hasIssuesEnabled': True, 'repositoryTopics': {'edges': [{'node': {'topic': {'name': 'poc'}}}]}, 'collaborators': {'totalCount': 0}}])
 
         response = GithubService("", ORGANISATION_NAME).get_old_poc_repositories()
 
-        self.assertEqual({"operations-engineering-metadata-poc": 30, "operations-engineering-unit-test-generator-poc": 30}, response)
+        self.assertEqual({"operations-engineering-metadata-poc": 30, "operations-engineering-unit-test-generator-poc": 60}, response)
+        mock_stream_repositories_per_topic.assert_called_once_with("poc")
+        mock_calculate_repo_age.assert_not_called()
+
+    @freeze_time("2024-10-24")
+    def test_get_old_poc_repositories_pages_through_topic_search(self, mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.plan_repository_search_shards = Mock(side_effect=lambda search_query: [search_query])
+        mock_graphql_session(github_service, *[
+            {"search": {"repos": [{"repo": {"name": name, "createdAt": "2024-01-01T00:00:00Z"}}],
+                        "pageInfo": {"hasNextPage": has_next_page, "endCursor": name}}}
+            for name, has_next_page in [("poc1", True), ("poc2", False)]
+        ])
 
-    @patch.object(GithubService, "get_paginated_list_of_repositories_per_topic")
-    def test_get_old_poc_repositories_if_not_exist(self, mock_get_paginated_list_of_repositories_per_topic, _mock_github_client_core_api):
-        mock_get_paginated_list_of_repositories_per_topic.return_value = {'search': {'repos': [], 'pageInfo': {'hasNextPage': False, 'endCursor': 'Y3Vyc29yOjQ='}}}
+        response = github_service.get_old_poc_repositories()
+
+        self.assertEqual({"poc1": 297, "poc2": 297}, response)
+        mock_github_client_core_api.return_value.get_repo.assert_not_called()
+
+    @patch.object(GithubService, "stream_repositories_per_topic")
+    def test_get_old_poc_repositories_if_not_exist(self, mock_stream_repositories_per_topic, _mock_github_client_core_api):
+        mock_stream_repositories_per_topic.return_value = iter([])
 
         response = GithubService("", ORGANISATION_NAME).get_old_poc_repositories()
 
@@ -1838,7 +2524,7 @@ class TestUserRemovalEvents(unittest.TestCase):
             }
         }
 
-        github_service.github_client_gql_api.execute.return_value = return_value
+        mock_graphql_session(github_service, return_value)
 
         result = github_service.get_user_removal_events("2023-12-01", "admin_user")
 
@@ -1852,6 +2538,118 @@ class TestUserRemovalEvents(unittest.TestCase):
         self.assertEqual(result[1]['userLogin'], 'removed_user2')
 
 
+def create_audit_log_page(nodes: list[dict], end_cursor: str | None, has_next_page: bool = False) -> dict:
+    return {
+        "organization": {
+            "auditLog": {
+                "edges": [{"node": node} for node in nodes],
+                "pageInfo": {"endCursor": end_cursor, "hasNextPage": has_next_page}
+            }
+        }
+    }
+
+
+ADD_MEMBER_ENTRY = {"id": "1", "action": "org.add_member", "createdAt": "2023-12-06T10:32:07.832Z",
+                    "actorLogin": "admin_user", "operationType": "CREATE", "permission": "ADMIN",
+                    "userLogin": "new_member"}
+UPDATE_MEMBER_ENTRY = {"id": "2", "action": "org.update_member", "createdAt": "2023-12-07T10:32:07.832Z",
+                       "actorLogin": "admin_user", "operationType": "MODIFY", "permission": "ADMIN",
+                       "permissionWas": "READ", "userLogin": "member"}
+REMOVE_MEMBER_ENTRY = {"id": "3", "action": "org.remove_member", "createdAt": "2023-12-08T10:32:07.832Z",
+                       "actorLogin": "admin_user", "userLogin": "removed_user"}
+
+
+@freeze_time("2023-12-10")
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("services.github_service.Github")
+class TestGithubServiceSyncAuditLog(unittest.TestCase):
+    def setUp(self):
+        self.audit_log_store = AuditLogStore(os.path.join(tempfile.mkdtemp(), "audit_log.db"))
+
+    def test_first_sync_searches_from_since_date(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME, audit_log_store=self.audit_log_store)
+        session = mock_graphql_session(
+            github_service,
+            create_audit_log_page([ADD_MEMBER_ENTRY, {}], "cursor1", has_next_page=True),
+            create_audit_log_page([UPDATE_MEMBER_ENTRY], "cursor2"),
+        )
+
+        self.assertEqual(2, github_service.sync_audit_log("2023-12-01"))
+
+        variable_values = session.execute.call_args_list[0].kwargs["variable_values"]
+        self.assertEqual(
+            "action:org.add_member action:org.update_member action:org.remove_member created:>=2023-12-01",
+            variable_values["query_string"])
+        self.assertIsNone(variable_values["cursor"])
+        self.assertEqual("cursor2", self.audit_log_store.get_sync_state(ORGANISATION_NAME)["end_cursor"])
+
+    def test_later_sync_resumes_after_saved_cursor(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME, audit_log_store=self.audit_log_store)
+        mock_graphql_session(github_service, create_audit_log_page([ADD_MEMBER_ENTRY], "cursor1"))
+        github_service.sync_audit_log("2023-12-01")
+        session = mock_graphql_session(github_service, create_audit_log_page([REMOVE_MEMBER_ENTRY], "cursor2"))
+
+        self.assertEqual(1, github_service.sync_audit_log("2023-12-05"))
+
+        variable_values = session.execute.call_args.kwargs["variable_values"]
+        self.assertEqual("cursor1", variable_values["cursor"])
+        self.assertTrue(variable_values["query_string"].endswith("created:>=2023-12-01"))
+
+    def test_sync_from_earlier_date_searches_again(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME, audit_log_store=self.audit_log_store)
+        mock_graphql_session(github_service, create_audit_log_page([ADD_MEMBER_ENTRY], "cursor1"))
+        github_service.sync_audit_log("2023-12-05")
+        session = mock_graphql_session(github_service, create_audit_log_page([ADD_MEMBER_ENTRY], "cursor3"))
+
+        self.assertEqual(0, github_service.sync_audit_log("2023-11-01"))
+
+        variable_values = session.execute.call_args.kwargs["variable_values"]
+        self.assertIsNone(variable_values["cursor"])
+        self.assertTrue(variable_values["query_string"].endswith("created:>=2023-11-01"))
+        self.assertEqual("2023-11-01", self.audit_log_store.get_sync_state(ORGANISATION_NAME)["covered_since"])
+
+    def test_rejected_cursor_searches_again_from_last_stored_entry(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME, audit_log_store=self.audit_log_store)
+        mock_graphql_session(github_service, create_audit_log_page([ADD_MEMBER_ENTRY], "cursor1"))
+        github_service.sync_audit_log("2023-12-01")
+        session = mock_graphql_session(
+            github_service,
+            TransportQueryError("Invalid cursor"),
+            create_audit_log_page([ADD_MEMBER_ENTRY, REMOVE_MEMBER_ENTRY], "cursor2"),
+        )
+
+        self.assertEqual(1, github_service.sync_audit_log("2023-12-01"))
+
+        variable_values = session.execute.call_args.kwargs["variable_values"]
+        self.assertIsNone(variable_values["cursor"])
+        self.assertTrue(variable_values["query_string"].endswith("created:>=2023-12-06"))
+        self.assertEqual("2023-12-01", self.audit_log_store.get_sync_state(ORGANISATION_NAME)["covered_since"])
+
+    def test_audit_log_methods_answer_from_store(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME, audit_log_store=self.audit_log_store)
+        mock_graphql_session(
+            github_service, create_audit_log_page([ADD_MEMBER_ENTRY, UPDATE_MEMBER_ENTRY, REMOVE_MEMBER_ENTRY], "c1"))
+        github_service.sync_audit_log("2023-12-01")
+        mock_graphql_session(github_service, *[create_audit_log_page([], None)] * 5)
+
+        # Newest first, like the entries read from the audit log itself
+        self.assertEqual([
+            {key: value for key, value in UPDATE_MEMBER_ENTRY.items() if key != "id"},
+            {key: value for key, value in ADD_MEMBER_ENTRY.items() if key != "id"},
+        ], github_service.audit_log_member_changes("2023-12-01"))
+        self.assertEqual([
+            {"action": "org.add_member", "createdAt": "2023-12-06T10:32:07.832Z",
+             "actorLogin": "admin_user", "userLogin": "new_member"}
+        ], github_service.check_for_audit_log_new_members("2023-12-01"))
+        self.assertEqual([
+            {"action": "org.remove_member", "createdAt": "2023-12-08T10:32:07.832Z",
+             "actorLogin": "admin_user", "userLogin": "removed_user"}
+        ], github_service.get_user_removal_events("2023-12-01", "admin_user"))
+        self.assertEqual([], github_service.get_user_removal_events("2023-12-01", "other_admin"))
+        self.assertEqual([], github_service.check_for_audit_log_new_members("2023-12-07"))
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__")
@@ -1913,6 +2711,87 @@ class TestGithubServiceGetCurrentContributorsForRepo(unittest.TestCase):
         self.assertEqual(response, expected)
 
 
+def create_history(logins: list[str | None], has_next_page: bool = False, end_cursor: str | None = None,
+                   total_count: int | None = None) -> dict:
+    return {"defaultBranchRef": {"target": {"history": {
+        "totalCount": len(logins) if total_count is None else total_count,
+        "pageInfo": {"hasNextPage": has_next_page, "endCursor": end_cursor},
+        "nodes": [{"author": {"user": {"login": login} if login else None}} for login in logins],
+    }}}}
+
+
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("github.Github.__new__")
+class TestGithubServiceBuildContributorIndex(unittest.TestCase):
+    def test_returns_commit_authors_per_repo_from_one_query(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.return_value = {
+            "repo0": create_history(["c1", "c2", "c1"]), "repo1": create_history(["c3", None])}
+        response = github_service.build_contributor_index(["repo1", "repo2"])
+        self.assertEqual({"repo1": {"c1", "c2"}, "repo2": {"c3"}}, response)
+        github_service.github_client_gql_api.execute.assert_called_once()
+
+    def test_pages_only_repos_with_more_history(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.side_effect = [
+            {"repo0": create_history(["c1"]), "repo1": create_history(["c2"], True, "cursor1")},
+            {"repo0": create_history(["c3"])},
+        ]
+        response = github_service.build_contributor_index(["repo1", "repo2"])
+        self.assertEqual({"repo1": {"c1"}, "repo2": {"c2", "c3"}}, response)
+        self.assertEqual(
+            {"organisation_name": ORGANISATION_NAME, "since": None, "repo0": "repo2", "cursor0": "cursor1"},
+            github_service.github_client_gql_api.execute.call_args.kwargs["variable_values"])
+
+    def test_batches_repos(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.GITHUB_GQL_REPOSITORY_BATCH_SIZE = 2
+        github_service.github_client_gql_api.execute.side_effect = [
+            {"repo0": create_history(["c1"]), "repo1": create_history(["c2"])},
+            {"repo0": create_history(["c3"])},
+        ]
+        response = github_service.build_contributor_index(["repo1", "repo2", "repo3"])
+        self.assertEqual({"repo1": {"c1"}, "repo2": {"c2"}, "repo3": {"c3"}}, response)
+
+    def test_passes_since_date(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.return_value = {"repo0": create_history(["c1"])}
+        github_service.build_contributor_index(["repo1"], since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(
+            "2024-01-01T00:00:00+00:00",
+            github_service.github_client_gql_api.execute.call_args.kwargs["variable_values"]["since"])
+
+    def test_falls_back_to_rest_for_long_histories(self, mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.return_value = {
+            "repo0": create_history(["c1"], True, "cursor1", total_count=50000)}
+        mock_github_client_core_api.return_value.get_repo.return_value.get_contributors.return_value = [
+            MagicMock(login="c1"), MagicMock(login="c2"), MagicMock(login=None)]
+        response = github_service.build_contributor_index(["repo1"])
+        self.assertEqual({"repo1": {"c1", "c2"}}, response)
+        github_service.github_client_gql_api.execute.assert_called_once()
+        mock_github_client_core_api.return_value.get_repo.assert_called_once_with(f"{ORGANISATION_NAME}/repo1")
+
+    def test_does_not_fall_back_to_rest_with_since_date(self, mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.side_effect = [
+            {"repo0": create_history(["c1"], True, "cursor1", total_count=50000)},
+            {"repo0": create_history(["c2"])},
+        ]
+        response = github_service.build_contributor_index(["repo1"], since=datetime(2024, 1, 1))
+        self.assertEqual({"repo1": {"c1", "c2"}}, response)
+        mock_github_client_core_api.return_value.get_repo.assert_not_called()
+
+    def test_handles_empty_and_missing_repos(self, _mock_github_client_core_api):
+        github_service = GithubService("", ORGANISATION_NAME)
+        github_service.github_client_gql_api.execute.side_effect = TransportQueryError(
+            "Could not resolve to a Repository", errors=[{"type": "NOT_FOUND", "path": ["repo1"]}],
+            data={"repo0": {"defaultBranchRef": None}, "repo1": None})
+        response = github_service.build_contributor_index(["repo1", "repo2"])
+        self.assertEqual({"repo1": set(), "repo2": set()}, response)
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__")
@@ -1921,15 +2800,17 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         self.active_repos = ["repo1", "repo2"]
         self.current_members = [Mock(NamedUser, login="c1"), Mock(NamedUser, login="c2")]
 
+    @staticmethod
+    def create_history_response(*logins_per_repo: list[str | None]) -> dict:
+        return {f"repo{index}": create_history(logins) for index, logins in enumerate(logins_per_repo)}
+
     def test_returns_current_contributors(self, mock_github_client_core_api):
         github_service = GithubService("", ORGANISATION_NAME)
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c1"), MagicMock(login="c2")])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c2")]))
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            ["c1", "c2"], ["c2"])
         response = github_service.get_current_contributors_for_active_repos()
         expected = [{'repository': 'repo1', 'contributors': {'c1', 'c2'}}, {'repository': 'repo2', 'contributors': {'c2'}}]
         self.assertEqual(response, expected)
@@ -1940,10 +2821,8 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c1"), MagicMock(login="c2"), MagicMock(login="c3")])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c2"), MagicMock(login="c4")]))
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            ["c1", "c2", "c3"], ["c2", "c4"])
         response = github_service.get_current_contributors_for_active_repos()
         expected = [{'repository': 'repo1', 'contributors': {'c1', 'c2'}}, {'repository': 'repo2', 'contributors': {'c2'}}]
         self.assertEqual(response, expected)
@@ -1954,10 +2833,8 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c1"), MagicMock(login="c3")])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c2"), MagicMock(login="c1")]))
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            ["c1", "c3"], ["c2", "c1"])
         response = github_service.get_current_contributors_for_active_repos()
         expected = [{'repository': 'repo2', 'contributors': {'c1', 'c2'}}, {'repository': 'repo1', 'contributors': {'c1'}}]
         self.assertEqual(response, expected)
@@ -1968,10 +2845,8 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c1"), MagicMock(login="c3")])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login=None)])),
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            ["c1", "c3"], [None])
         response = github_service.get_current_contributors_for_active_repos()
         expected = [{'repository': 'repo1', 'contributors': {'c1'}}]
         self.assertEqual(response, expected)
@@ -1982,10 +2857,8 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c1"), MagicMock(login="c3")])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c3"), MagicMock(login="c4")])),
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            ["c1", "c3"], ["c3", "c4"])
         response = github_service.get_current_contributors_for_active_repos()
         expected = [{'repository': 'repo1', 'contributors': {'c1'}}]
         self.assertEqual(response, expected)
@@ -1996,10 +2869,8 @@ class TestGithubServiceGetCurrentContributorsForActiveRepos(unittest.TestCase):
         github_service.get_active_repositories = MagicMock(return_value=self.active_repos)
 
         mock_github_client_core_api.return_value.get_organization.return_value.get_members.return_value = self.current_members
-        mock_github_client_core_api.return_value.get_repo.side_effect = [
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login=None), MagicMock(login=None)])),
-            MagicMock(get_contributors=MagicMock(return_value=[MagicMock(login="c4"), MagicMock(login="c5")])),
-        ]
+        github_service.github_client_gql_api.execute.return_value = self.create_history_response(
+            [None, None], ["c4", "c5"])
         response = github_service.get_current_contributors_for_active_repos()
         expected = []
         self.assertEqual(response, expected)
@@ -2148,6 +3019,76 @@ class TestGithubServiceGetPaginatedListOfUnlockedUnarchivedRepos(unittest.TestCa
         )
 
 
+def create_inventory_page(repositories: list[tuple[str, str]], has_next_page: bool = False,
+                          end_cursor: str | None = None) -> dict:
+    return {
+        "organization": {
+            "repositories": {
+                "nodes": [
+                    {"id": f"id-{name}", "name": name, "isArchived": False, "isLocked": False, "isDisabled": False,
+                     "updatedAt": updated_at, "pushedAt": updated_at}
+                    for name, updated_at in repositories
+                ],
+                "pageInfo": {"hasNextPage": has_next_page, "endCursor": end_cursor}
+            }
+        }
+    }
+
+
+@freeze_time("2024-01-10")
+@patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
+@patch("gql.Client.__new__", new=MagicMock)
+@patch("github.Github.__new__", new=MagicMock)
+class TestGithubServiceSyncRepositoryInventory(unittest.TestCase):
+    def setUp(self):
+        self.repository_inventory_store = RepositoryInventoryStore(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+
+    def create_synced_github_service(self) -> GithubService:
+        github_service = GithubService(
+            "", ORGANISATION_NAME, repository_inventory_store=self.repository_inventory_store)
+        mock_graphql_session(github_service, create_inventory_page(
+            [("repo2", "2024-01-05T00:00:00Z"), ("repo1", "2024-01-01T00:00:00Z")]))
+        github_service.sync_repository_inventory()
+        return github_service
+
+    def test_first_sync_lists_every_repository(self):
+        self.create_synced_github_service()
+        self.assertEqual(["repo1", "repo2"], self.repository_inventory_store.get_repository_names(ORGANISATION_NAME))
+
+    def test_later_sync_stops_at_watermark(self):
+        github_service = self.create_synced_github_service()
+        session = mock_graphql_session(
+            github_service,
+            create_inventory_page([("repo3", "2024-01-09T00:00:00Z"), ("repo2", "2024-01-05T00:00:00Z"),
+                                   ("repo1", "2024-01-01T00:00:00Z")], has_next_page=True, end_cursor="cursor1"),
+        )
+
+        self.assertEqual(2, github_service.sync_repository_inventory())
+
+        session.execute.assert_awaited_once()
+        self.assertEqual(["repo1", "repo2", "repo3"],
+                         self.repository_inventory_store.get_repository_names(ORGANISATION_NAME))
+
+    def test_full_sync_drops_deleted_repositories(self):
+        github_service = self.create_synced_github_service()
+        mock_graphql_session(github_service, create_inventory_page([("repo2", "2024-01-05T00:00:00Z")]))
+        github_service.sync_repository_inventory(full=True)
+        self.assertEqual(["repo2"], self.repository_inventory_store.get_repository_names(ORGANISATION_NAME))
+
+    def test_takes_full_sync_once_last_one_is_stale(self):
+        github_service = self.create_synced_github_service()
+        mock_graphql_session(github_service, create_inventory_page([("repo2", "2024-01-05T00:00:00Z")]))
+        with freeze_time("2024-01-20"):
+            github_service.sync_repository_inventory()
+        self.assertEqual(["repo2"], self.repository_inventory_store.get_repository_names(ORGANISATION_NAME))
+
+    def test_repository_listings_answer_from_inventory(self):
+        github_service = self.create_synced_github_service()
+        mock_graphql_session(github_service, *[create_inventory_page([])] * 2)
+        self.assertEqual(["repo1", "repo2"], github_service.get_org_repo_names())
+        self.assertEqual(["repo1", "repo2"], github_service.get_active_repositories())
+
+
 @patch("gql.transport.aiohttp.AIOHTTPTransport.__new__", new=MagicMock)
 @patch("gql.Client.__new__", new=MagicMock)
 @patch("github.Github.__new__", new=MagicMock)
@@ -2180,9 +3121,7 @@ class TestGithubServiceGetActiveRepositories(unittest.TestCase):
 
     def test_returns_correct_data(self):
         github_service = GithubService("", ORGANISATION_NAME)
-        github_service.get_paginated_list_of_unlocked_unarchived_repos = MagicMock(
-            return_value=self.return_data
-        )
+        mock_graphql_session(github_service, self.return_data)
         active_repositories = github_service.get_active_repositories()
         self.assertEqual(len(active_repositories), 2)
         self.assertEqual(set(active_repositories), {"repository_1", "repository_3"})
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+import pandas as pd
+
+from services.github_service import GithubService
+from services.organisation_snapshot_store import (OrganisationSnapshotStore,
+                                                  repositories_to_frame)
+
+ORGANISATION_NAME = "moj-analytical-services"
+REPOSITORY = {
+    "name": "repo1",
+    "url": "https://github.com/moj-analytical-services/repo1",
+    "description": None,
+    "isPrivate": True,
+    "isDisabled": False,
+    "isLocked": False,
+    "hasIssuesEnabled": True,
+    "pushedAt": "2024-01-02T03:04:05Z",
+    "defaultBranchRef": {"name": "main"},
+    "licenseInfo": None,
+    "collaborators": {"totalCount": 2},
+    "repositoryTopics": {"edges": [{"node": {"topic": {"name": "poc"}}}]},
+}
+
+
+def create_github_service() -> Mock:
+    github_service = Mock(GithubService)
+    github_service.organisation_name = ORGANISATION_NAME
+    github_service.stream_all_repositories_in_org.return_value = iter([REPOSITORY])
+    github_service.get_github_member_list.return_value = [
+        {"username": "user1", "email": "user1@justice.gov.uk"}, {"username": "user2", "email": None}]
+    github_service.get_team_names.return_value = ["team1", "team2"]
+    github_service.get_team_user_names.side_effect = lambda team: {"team1": ["user1", "user2"], "team2": []}[team]
+    github_service.get_active_repos_and_outside_collaborators.return_value = [
+        {"repository": "repo1", "public": False, "outside_collaborators": ["collaborator1"]}]
+    return github_service
+
+
+class TestRepositoriesToFrame(unittest.TestCase):
+    def test_flattens_repositories_into_typed_columns(self):
+        frame = repositories_to_frame([REPOSITORY])
+        self.assertEqual("string", frame["name"].dtype)
+        self.assertEqual("boolean", frame["is_private"].dtype)
+        self.assertEqual("Int64", frame["direct_collaborators"].dtype)
+        self.assertEqual(pd.Timestamp("2024-01-02T03:04:05Z"), frame["pushed_at"][0])
+        self.assertEqual("main", frame["default_branch"][0])
+        self.assertTrue(pd.isna(frame["license"][0]))
+        self.assertEqual(["poc"], frame["topics"][0])
+
+    def test_empty_organisation_keeps_columns(self):
+        frame = repositories_to_frame([])
+        self.assertEqual(0, len(frame))
+        self.assertIn("pushed_at", frame.columns)
+
+
+class TestOrganisationSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.store = OrganisationSnapshotStore(self.snapshot_dir)
+
+    def test_snapshot_organisation_writes_every_table(self):
+        run_id = self.store.snapshot_organisation(create_github_service(), "20240101T000000Z")
+
+        self.assertEqual(["20240101T000000Z"], self.store.list_runs(ORGANISATION_NAME))
+        self.assertEqual(["repo1"], list(self.store.read(ORGANISATION_NAME, "repositories", run_id)["name"]))
+        self.assertEqual(2, len(self.store.read(ORGANISATION_NAME, "members")))
+        team_members = self.store.read(ORGANISATION_NAME, "team_members")
+        self.assertEqual([("team1", "user1"), ("team1", "user2")],
+                         list(zip(team_members["team"], team_members["username"])))
+        self.assertEqual(["collaborator1"], list(self.store.read(ORGANISATION_NAME, "outside_collaborators")["username"]))
+
+    def test_read_outside_collaborator_index(self):
+        self.store.snapshot_organisation(create_github_service(), "20240101T000000Z")
+
+        index = self.store.read_outside_collaborator_index(ORGANISATION_NAME)
+
+        self.assertEqual(["repo1"], index.get_collaborator_repositories("collaborator1"))
+        self.assertEqual(1, index.get_private_repository_count("collaborator1"))
+
+    def test_read_defaults_to_latest_run_and_selects_columns(self):
+        self.store.write(ORGANISATION_NAME, "20240101T000000Z", "members", pd.DataFrame({"username": ["old"], "email": [None]}))
+        self.store.write(ORGANISATION_NAME, "20240201T000000Z", "members", pd.DataFrame({"username": ["new"], "email": [None]}))
+
+        frame = self.store.read(ORGANISATION_NAME, "members", columns=["username"])
+
+        self.assertEqual(["username"], list(frame.columns))
+        self.assertEqual(["new"], list(frame["username"]))
+
+    def test_snapshot_taken_again_with_same_run_id_replaces_it(self):
+        self.store.snapshot_organisation(create_github_service(), "20240101T000000Z")
+        github_service = create_github_service()
+        github_service.get_github_member_list.return_value = [{"username": "user3", "email": None}]
+
+        self.store.snapshot_organisation(github_service, "20240101T000000Z")
+
+        self.assertEqual(["20240101T000000Z"], self.store.list_runs(ORGANISATION_NAME))
+        self.assertEqual(["user3"], list(self.store.read(ORGANISATION_NAME, "members")["username"]))
+
+    def test_failed_snapshot_is_not_listed(self):
+        github_service = create_github_service()
+        github_service.get_active_repos_and_outside_collaborators.side_effect = ValueError
+        self.assertRaises(ValueError, self.store.snapshot_organisation, github_service, "20240101T000000Z")
+        self.assertEqual([], self.store.list_runs(ORGANISATION_NAME))
+
+    def test_read_without_snapshots_raises(self):
+        self.assertRaises(ValueError, self.store.read, ORGANISATION_NAME, "members")
+
+    def test_parquet_round_trip(self):
+        self.store.snapshot_organisation(create_github_service(), "20240101T000000Z")
+        self.assertTrue(os.path.exists(os.path.join(
+            self.snapshot_dir, ORGANISATION_NAME, "20240101T000000Z", "repositories.parquet")))
+        repositories = self.store.read(ORGANISATION_NAME, "repositories")
+        self.assertEqual("boolean", repositories["is_private"].dtype)
+        self.assertEqual(pd.Timestamp("2024-01-02T03:04:05Z"), repositories["pushed_at"][0])
+        self.assertEqual(["poc"], list(repositories["topics"][0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from services.outside_collaborator_index import OutsideCollaboratorIndex
+
+ACTIVE_REPOS_AND_OUTSIDE_COLLABORATORS = [
+    {"repository": "repo1", "public": True, "outside_collaborators": ["collaborator1", "collaborator2"]},
+    {"repository": "repo2", "public": False, "outside_collaborators": ["collaborator1"]},
+    {"repository": "repo3", "public": False, "outside_collaborators": ["collaborator1", "collaborator3"]},
+]
+
+
+class TestOutsideCollaboratorIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = OutsideCollaboratorIndex.from_active_repos(ACTIVE_REPOS_AND_OUTSIDE_COLLABORATORS)
+
+    def test_maps_collaborators_to_repositories(self):
+        self.assertEqual(["repo1", "repo2", "repo3"], sorted(self.index.get_collaborator_repositories("collaborator1")))
+        self.assertEqual(["repo3"], self.index.get_collaborator_repositories("collaborator3"))
+        self.assertEqual([], self.index.get_collaborator_repositories("unknown"))
+
+    def test_maps_repositories_to_collaborators(self):
+        self.assertEqual(["collaborator1", "collaborator2"], self.index.get_repository_collaborators("repo1"))
+        self.assertEqual([], self.index.get_repository_collaborators("unknown"))
+
+    def test_counts_public_and_private_repositories_per_collaborator(self):
+        self.assertEqual(1, self.index.get_public_repository_count("collaborator1"))
+        self.assertEqual(2, self.index.get_private_repository_count("collaborator1"))
+        self.assertEqual(0, self.index.get_private_repository_count("collaborator2"))
+        self.assertEqual(0, self.index.get_public_repository_count("unknown"))
+
+    def test_lists_collaborators_with_public_access(self):
+        self.assertEqual(["collaborator1", "collaborator2"], self.index.get_collaborators_with_public_access())
+
+    def test_has_access(self):
+        self.assertTrue(self.index.has_access("collaborator3", "repo3"))
+        self.assertFalse(self.index.has_access("collaborator3", "repo1"))
+        self.assertFalse(self.index.has_access("unknown", "repo1"))
+        self.assertIn("collaborator2", self.index)
+        self.assertNotIn("unknown", self.index)
+
+    def test_unknown_repository_is_not_public(self):
+        self.assertTrue(self.index.is_public("repo1"))
+        self.assertFalse(self.index.is_public("unknown"))
+
+    def test_ignores_repeated_pairs(self):
+        self.index.add("repo1", True, "collaborator1")
+        self.assertEqual(1, self.index.get_public_repository_count("collaborator1"))
+        self.assertEqual(5, len(self.index))
+
+    def test_round_trips_through_rows(self):
+        rows = self.index.to_rows()
+        self.assertEqual({"repository": "repo1", "public": True, "username": "collaborator1"}, rows[0])
+
+        index = OutsideCollaboratorIndex.from_rows(rows)
+
+        self.assertEqual(self.index.get_collaborators(), index.get_collaborators())
+        self.assertEqual(self.index.get_repositories(), index.get_repositories())
+        self.assertEqual(2, index.get_private_repository_count("collaborator1"))
+        self.assertFalse(index.is_public("repo2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
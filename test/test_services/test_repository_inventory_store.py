@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from services.repository_inventory_store import RepositoryInventoryStore
+
+ORGANISATION_NAME = "moj-analytical-services"
+
+
+def create_repository(repository_id: str, name: str, updated_at: str, is_archived: bool = False,
+                      is_locked: bool = False, is_disabled: bool = False) -> dict:
+    return {"id": repository_id, "name": name, "isArchived": is_archived, "isLocked": is_locked,
+            "isDisabled": is_disabled, "updatedAt": updated_at, "pushedAt": None}
+
+
+class TestRepositoryInventoryStore(unittest.TestCase):
+    def setUp(self):
+        self.store = RepositoryInventoryStore(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+
+    def test_has_no_sync_state_before_first_sync(self):
+        self.assertIsNone(self.store.get_sync_state(ORGANISATION_NAME))
+
+    def test_watermark_is_newest_updated_at(self):
+        self.store.save_repositories(ORGANISATION_NAME, [
+            create_repository("1", "repo1", "2024-01-02T00:00:00Z"),
+            create_repository("2", "repo2", "2024-01-03T00:00:00Z"),
+        ], full=True)
+        self.store.save_repositories(ORGANISATION_NAME, [])
+        self.assertEqual("2024-01-03T00:00:00Z", self.store.get_sync_state(ORGANISATION_NAME)["watermark"])
+
+    def test_incremental_save_merges_by_id(self):
+        self.store.save_repositories(ORGANISATION_NAME, [
+            create_repository("1", "repo1", "2024-01-02T00:00:00Z"),
+            create_repository("2", "repo2", "2024-01-02T00:00:00Z"),
+        ], full=True)
+        full_synced_at = self.store.get_sync_state(ORGANISATION_NAME)["full_synced_at"]
+        self.store.save_repositories(ORGANISATION_NAME, [
+            create_repository("1", "repo1-renamed", "2024-01-03T00:00:00Z"),
+            create_repository("3", "repo3", "2024-01-03T00:00:00Z"),
+        ])
+        self.assertEqual(["repo1-renamed", "repo2", "repo3"], self.store.get_repository_names(ORGANISATION_NAME))
+        self.assertEqual(full_synced_at, self.store.get_sync_state(ORGANISATION_NAME)["full_synced_at"])
+
+    def test_full_save_drops_repositories_not_listed(self):
+        self.store.save_repositories(ORGANISATION_NAME, [
+            create_repository("1", "repo1", "2024-01-02T00:00:00Z"),
+            create_repository("2", "deleted", "2024-01-02T00:00:00Z"),
+        ], full=True)
+        self.store.save_repositories(ORGANISATION_NAME, [create_repository("1", "repo1", "2024-01-02T00:00:00Z")],
+                                     full=True)
+        self.assertEqual(["repo1"], self.store.get_repository_names(ORGANISATION_NAME))
+
+    def test_repository_names_leave_out_inactive_repositories_by_default(self):
+        self.store.save_repositories(ORGANISATION_NAME, [
+            create_repository("1", "active", "2024-01-02T00:00:00Z"),
+            create_repository("2", "archived", "2024-01-02T00:00:00Z", is_archived=True),
+            create_repository("3", "locked", "2024-01-02T00:00:00Z", is_locked=True),
+            create_repository("4", "disabled", "2024-01-02T00:00:00Z", is_disabled=True),
+        ], full=True)
+        self.assertEqual(["active"], self.store.get_repository_names(ORGANISATION_NAME))
+        self.assertEqual(["active", "archived"],
+                         self.store.get_repository_names(ORGANISATION_NAME, include_archived=True))
+        self.assertEqual([], self.store.get_repository_names("other-org"))
+
+
+if __name__ == "__main__":
+    unittest.main()